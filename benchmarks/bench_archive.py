@@ -0,0 +1,56 @@
+"""
+Benchmark of decoding data archive records with a record plan, one record at a time
+and all at once with NumPy.
+
+Run with: python -m benchmarks.bench_archive
+"""
+
+import random
+import timeit
+
+from elgas import archive, parser
+from tests.fixtures import parameter_data
+
+# Three months of records with a 15 minute archive period.
+RECORD_COUNT = 90 * 24 * 4
+
+
+def make_records(plan: archive.ArchiveRecordPlan) -> bytes:
+    out = bytearray()
+    for index in range(RECORD_COUNT):
+        values = list()
+        for channel in plan.channels:
+            if channel.format in ("f", "d"):
+                values.append(random.random() * 1000)
+            else:
+                values.append(random.getrandbits(8 * channel.size))
+        out += plan.record_struct.pack(700_000_000 + index * 900, *values)
+    return bytes(out)
+
+
+def main():
+    parameters = parser.ScadaParameterParser().parse(parameter_data)
+    plan = archive.ArchiveRecordPlan.from_parameters(parameters)
+    data = make_records(plan)
+
+    one_by_one = min(
+        timeit.repeat(lambda: list(plan.iter_records(data)), number=1, repeat=3)
+    )
+    print(
+        f"{RECORD_COUNT} records ({len(data) // 1024} KB) one by one: "
+        f"{one_by_one * 1e3:.1f} ms"
+    )
+    try:
+        archive._require_numpy()
+    except ImportError:
+        print("NumPy not installed, skipping columns")
+        return
+    columns = min(timeit.repeat(lambda: plan.to_columns(data), number=1, repeat=3))
+    print(
+        f"{RECORD_COUNT} records ({len(data) // 1024} KB) to columns: "
+        f"{columns * 1e3:.1f} ms ({one_by_one / columns:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
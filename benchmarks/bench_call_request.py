@@ -0,0 +1,32 @@
+"""
+Benchmark of decoding bursts of call to dispatch registrations.
+
+Run with: python -m benchmarks.bench_call_request
+"""
+
+import timeit
+
+from elgas import application, frames, utils
+from tests.fixtures import call_to_dispatch_frame as escaped_call_frame
+
+BURST_SIZE = 1000
+
+
+def main():
+    application_data = frames.Request.from_bytes(
+        utils.return_characters(escaped_call_frame)
+    ).data
+
+    def burst():
+        for _ in range(BURST_SIZE):
+            application.CallRequest.from_bytes(application_data)
+
+    per_burst = min(timeit.repeat(burst, number=1, repeat=5))
+    print(
+        f"CallRequest burst of {BURST_SIZE}: {per_burst * 1e3:.1f} ms, "
+        f"{BURST_SIZE / per_burst:,.0f} registrations/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
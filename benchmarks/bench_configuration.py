@@ -0,0 +1,51 @@
+"""
+Benchmark of looking up parameter objects by archive address, with a linear scan of
+the parsed list and with a `Configuration`.
+
+Run with: python -m benchmarks.bench_configuration
+"""
+
+import timeit
+
+from elgas import archive, configuration, constants, parser
+from tests.fixtures import parameter_data
+
+NUMBER = 10_000
+
+
+def main():
+    parameters = parser.ScadaParameterParser().parse(parameter_data)
+    plan = archive.ArchiveRecordPlan.from_parameters(parameters)
+    addresses = [channel.address for channel in plan.channels]
+
+    def scan():
+        for address in addresses:
+            next(
+                item
+                for item in parameters
+                if getattr(item, "address_in_data_archive_record", 0) == address
+            )
+
+    build = min(
+        timeit.repeat(
+            lambda: configuration.Configuration(parameters), number=100, repeat=3
+        )
+    )
+    print(f"Build configuration of {len(parameters)} objects: {build * 1e4:.1f} us")
+
+    config = configuration.Configuration(parameters)
+
+    def indexed():
+        for address in addresses:
+            config.in_archive(constants.Archive.DATA, address)
+
+    linear = min(timeit.repeat(scan, number=NUMBER, repeat=3)) / NUMBER
+    lookup = min(timeit.repeat(indexed, number=NUMBER, repeat=3)) / NUMBER
+    print(
+        f"Look up {len(addresses)} archive columns: scan {linear * 1e6:.1f} us, "
+        f"indexed {lookup * 1e6:.1f} us ({linear / lookup:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark of opening the stored parameters of a fleet at start: JSON from the
+serializer, loaded completely, and mapped parameter containers, decoded on use.
+
+Reports the growth of the resident memory of the process, so it only runs on
+systems with /proc.
+
+Run with: python -m benchmarks.bench_container [devices]
+"""
+
+import gc
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from elgas import container, parser
+from elgas.parameters import serializer
+from tests.fixtures import parameter_data
+
+DEVICES = 10_000
+
+
+def resident() -> int:
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * 4096
+
+
+def measure(name, function):
+    gc.collect()
+    before = resident()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    grown = (resident() - before) / 1e6
+    print(f"{name}: {elapsed:.2f} s, resident memory +{grown:.1f} MB")
+    return result
+
+
+def main():
+    devices = int(sys.argv[1]) if len(sys.argv) > 1 else DEVICES
+    parameters = parser.ScadaParameterParser().parse(parameter_data)
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        for device in range(devices):
+            (root / f"{device}.json").write_text(serializer.to_json(parameters))
+            container.write(root / f"{device}.elgp", parameter_data)
+        json_size = (root / "0.json").stat().st_size
+        container_size = (root / "0.elgp").stat().st_size
+        print(
+            f"{devices:,} devices, {json_size:,} bytes of JSON or "
+            f"{container_size:,} bytes of container per device"
+        )
+
+        loaded = measure(
+            "load JSON",
+            lambda: [
+                serializer.from_json((root / f"{device}.json").read_bytes())
+                for device in range(devices)
+            ],
+        )
+        del loaded
+        opened = measure(
+            "map containers",
+            lambda: [
+                container.ParameterContainer.open(root / f"{device}.elgp")
+                for device in range(devices)
+            ],
+        )
+        measure(
+            "look up the system parameters",
+            lambda: [item.parameters.system_parameters for item in opened],
+        )
+        for item in opened:
+            item.close()
+
+
+if __name__ == "__main__":
+    main()
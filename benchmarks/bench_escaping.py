@@ -0,0 +1,81 @@
+"""
+Benchmark of escaping and returning of reserved characters in ELGAS frames.
+
+Run with: python -m benchmarks.bench_escaping
+"""
+
+import random
+import timeit
+
+from elgas import utils
+
+FRAME_SIZES = [1024, 16 * 1024, 64 * 1024]
+
+
+def make_frame(size: int, seed: int = 0) -> bytes:
+    """
+    Random frame payload where the reserved characters show up as often as in random
+    binary data, terminated with the end char.
+    """
+    rng = random.Random(seed)
+    payload = bytes(rng.getrandbits(8) for _ in range(size - 1))
+    return payload.replace(b"\x0d", b"\x00") + b"\x0d"
+
+
+def legacy_return_characters(data: bytes) -> bytes:
+    """The previous byte by byte implementation, kept for comparison."""
+    in_data = bytearray(data)
+    out = bytearray()
+    while in_data:
+        byte = in_data.pop(0)
+        if byte == 0x1B:
+            next_byte = in_data.pop(0)
+            if next_byte == 0x0E:
+                out.append(0x0D)
+            elif next_byte == 0x1B:
+                out.append(0x1B)
+            elif next_byte == 0x0F:
+                out.append(0x8D)
+            else:
+                out.append(byte)
+                out.append(next_byte)
+        else:
+            out.append(byte)
+    return bytes(out)
+
+
+def time_per_call(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    for size in FRAME_SIZES:
+        frame = make_frame(size)
+        escaped = utils.escape_characters(frame)
+        assert utils.return_characters(escaped) == frame
+        number = max(1, (256 * 1024) // size)
+
+        escape = time_per_call(lambda: utils.escape_characters(frame), number)
+        unescape = time_per_call(lambda: utils.return_characters(escaped), number)
+
+        buffer = bytearray()
+
+        def incremental():
+            buffer.clear()
+            returner = utils.CharacterReturner()
+            for start in range(0, len(escaped), 4096):
+                returner.feed(escaped[start : start + 4096], buffer)
+
+        chunked = time_per_call(incremental, number)
+        legacy = time_per_call(lambda: legacy_return_characters(escaped), 1)
+
+        print(
+            f"{size // 1024:>3} KB  escape {escape * 1e6:9.1f} us  "
+            f"return {unescape * 1e6:9.1f} us  "
+            f"return (4 KB chunks) {chunked * 1e6:9.1f} us  "
+            f"legacy return {legacy * 1e6:11.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
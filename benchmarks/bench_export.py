@@ -0,0 +1,58 @@
+"""
+Benchmark of exporting data archive records to Arrow, through a dict per record and
+with record batches made from the columns.
+
+Run with: python -m benchmarks.bench_export
+"""
+
+import timeit
+
+import pyarrow as pa
+
+from benchmarks.bench_archive import RECORD_COUNT, make_records
+from elgas import application, archive, export, parser
+from tests.fixtures import parameter_data
+
+# Records per archive response, as read with large requests.
+RECORDS_PER_PAGE = 1000
+
+
+def main():
+    parameters = parser.ScadaParameterParser().parse(parameter_data)
+    plan = archive.ArchiveRecordPlan.from_parameters(parameters)
+    data = make_records(plan)
+    page_size = RECORDS_PER_PAGE * plan.record_length
+    pages = [
+        application.ReadArchiveResponse(
+            archive=plan.archive,
+            oldest_record_id=1 + start // plan.record_length,
+            data=data[start : start + page_size],
+        )
+        for start in range(0, len(data), page_size)
+    ]
+    schema = export.arrow_schema(plan)
+
+    # The decoded records have no record id.
+    record_schema = schema.remove(0)
+
+    def from_records():
+        return [
+            pa.RecordBatch.from_pylist(
+                list(plan.iter_records(page.data)), schema=record_schema
+            )
+            for page in pages
+        ]
+
+    def from_columns():
+        return [export.to_record_batch(plan, page, schema) for page in pages]
+
+    slow = min(timeit.repeat(from_records, number=1, repeat=3))
+    fast = min(timeit.repeat(from_columns, number=1, repeat=3))
+    print(
+        f"{RECORD_COUNT} records in {len(pages)} batches: dicts {slow * 1e3:.1f} ms, "
+        f"columns {fast * 1e3:.1f} ms ({slow / fast:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark of the memory used by the parameters of many devices, as kept by a fleet
+that caches the configuration of each device.
+
+Run with: python -m benchmarks.bench_memory [devices]
+
+10,000 configurations of the 26 objects in the test parameters used 148.8 MB (572
+bytes per object) with attrs classes with a `__dict__` and 81.2 MB (312 bytes per
+object) with slotted, frozen classes, interned texts and shared gas compositions
+(Python 3.11, 64 bit).
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from elgas import parser
+from tests.fixtures import parameter_data
+
+DEVICES = 10_000
+
+
+def main():
+    devices = int(sys.argv[1]) if len(sys.argv) > 1 else DEVICES
+    # Each device has its own copy of the data, like when read from the devices.
+    datas = [bytes(bytearray(parameter_data)) for _ in range(devices)]
+    scada_parser = parser.ScadaParameterParser()
+    scada_parser.parse(parameter_data)
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    configurations = [scada_parser.parse(data) for data in datas]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    objects = sum(len(configuration) for configuration in configurations)
+    print(
+        f"{devices:,} configurations, {objects:,} objects: {used / 1e6:.1f} MB, "
+        f"{used / objects:.0f} bytes per object, parsed in {elapsed:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
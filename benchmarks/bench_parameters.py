@@ -0,0 +1,44 @@
+"""
+Benchmark of parsing the SCADA parameter objects read from a device, all at once
+and as an index that decodes only the objects looked up.
+
+Run with: python -m benchmarks.bench_parameters
+"""
+
+import timeit
+
+from elgas import parser
+from tests.fixtures import parameter_data
+
+REPEAT = 1000
+
+
+def main():
+    scada_parser = parser.ScadaParameterParser()
+    object_count = len(scada_parser.parse(parameter_data))
+
+    def run():
+        for _ in range(REPEAT):
+            scada_parser.parse(parameter_data)
+
+    per_parse = min(timeit.repeat(run, number=1, repeat=5)) / REPEAT
+    print(
+        f"Parse {object_count} parameter objects ({len(parameter_data)} bytes): "
+        f"{per_parse * 1e6:.1f} us, {object_count / per_parse:,.0f} objects/s"
+    )
+
+    def index():
+        for _ in range(REPEAT):
+            parameters = scada_parser.index(parameter_data)
+            parameters.by_id(3)
+            parameters.system_parameters
+
+    per_index = min(timeit.repeat(index, number=1, repeat=5)) / REPEAT
+    print(
+        f"Index and look up 2 objects: {per_index * 1e6:.1f} us "
+        f"({per_parse / per_index:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
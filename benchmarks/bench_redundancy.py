@@ -0,0 +1,92 @@
+"""
+Benchmark of the frame redundancy bytes (LRC, checksum, DRC), the CRC16 used in
+encrypted frames and bulk validation of captured frames.
+
+Run with: python -m benchmarks.bench_redundancy
+"""
+
+import random
+import timeit
+
+from elgas import constants, frames, utils
+
+SIZES = [1024, 16 * 1024, 64 * 1024]
+FRAME_COUNT = 10000
+
+
+def separate_redundancy(data: bytes):
+    return (
+        utils.calculate_lrc(data),
+        utils.calculate_checksum(data),
+        utils.calculate_drc(data),
+    )
+
+
+def bytewise_crc(data: bytes) -> int:
+    crc = 0xFFFF
+    for byte in data:
+        crc = (crc >> 8) ^ utils.crc16_table[(crc ^ byte) & 0xFF]
+    return ((crc << 8) & 0xFF00) | (crc >> 8)
+
+
+def time_per_call(function, *args) -> float:
+    number = 5
+    return min(timeit.repeat(lambda: function(*args), number=number, repeat=5)) / number
+
+
+def captured_frames():
+    out = list()
+    for _ in range(FRAME_COUNT):
+        data = bytes(random.getrandbits(8) for _ in range(random.randint(0, 120)))
+        frame = frames.Response(
+            service=constants.ServiceNumber.READ_ARCHIVES,
+            destination_address_1=1,
+            destination_address_2=0,
+            source_address_1=2,
+            source_address_2=0,
+            data=data,
+        ).to_bytes()
+        out.append(utils.escape_characters(frame))
+    return out
+
+
+def main():
+    for size in SIZES:
+        data = bytes(random.getrandbits(8) for _ in range(size))
+        separate = time_per_call(separate_redundancy, data)
+        single = time_per_call(utils.calculate_redundancy, data)
+        print(
+            f"Redundancy {size // 1024:>3} KB: separate {separate * 1e6:9.1f} us, "
+            f"single pass {single * 1e6:8.1f} us ({separate / single:.0f}x)"
+        )
+        bytewise = time_per_call(bytewise_crc, data)
+        sliced = time_per_call(utils.calculate_crc, data)
+        print(
+            f"CRC16      {size // 1024:>3} KB: bytewise {bytewise * 1e6:9.1f} us, "
+            f"sliced      {sliced * 1e6:8.1f} us ({bytewise / sliced:.1f}x)"
+        )
+
+    try:
+        from elgas import bulk
+
+        bulk._require_numpy()
+    except ImportError:
+        print("NumPy not installed, skipping bulk validation")
+        return
+
+    wire = captured_frames()
+
+    def one_by_one():
+        for frame in wire:
+            frames.Response.from_bytes(utils.return_characters(frame))
+
+    single = time_per_call(one_by_one)
+    vectorized = time_per_call(bulk.validate_frames, wire)
+    print(
+        f"Validate {FRAME_COUNT} frames: one by one {single * 1e3:.1f} ms, "
+        f"bulk {vectorized * 1e3:.1f} ms ({single / vectorized:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
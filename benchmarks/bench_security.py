@@ -0,0 +1,82 @@
+"""
+Benchmark of receiving archive frames in plain text and encrypted. The encrypted
+frames are decrypted one by one with a new cipher per frame, as CipherContext used
+to, with the cached cipher of the context and all at once with decrypt_many.
+
+Run with: python -m benchmarks.bench_security
+"""
+
+import timeit
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from elgas import constants, frames, security, utils
+
+FRAME_COUNT = 2000
+KEY = bytes(range(16))
+# Archive responses with ten records of 28 bytes.
+DATA = b"\x00" * 6 + bytes(range(256))[:280]
+
+
+def make_frames(response_class, data) -> list:
+    return [
+        response_class(
+            service=constants.ServiceNumber.READ_ARCHIVES,
+            destination_address_1=0,
+            destination_address_2=0,
+            source_address_1=0,
+            source_address_2=0,
+            data=data,
+        ).to_bytes()
+        for _ in range(FRAME_COUNT)
+    ]
+
+
+def new_cipher_per_frame(context: security.CipherContext, in_data: bytes) -> bytes:
+    decryptor = Cipher(
+        algorithms.AES(context.key), modes.CBC(initialization_vector=context.key)
+    ).decryptor()
+    decrypted = decryptor.update(in_data[3:]) + decryptor.finalize()
+    for_crc = bytearray(in_data[:3]) + decrypted[:-2]
+    assert utils.calculate_crc(for_crc).to_bytes(2, "big") == decrypted[-2:]
+    return decrypted[: int.from_bytes(in_data[:2], "little")]
+
+
+def main():
+    context = security.CipherContext(security.EncryptionKeyId.ADMINISTRATOR, KEY)
+    plain_frames = make_frames(frames.Response, DATA)
+    encrypted_frames = make_frames(frames.EncryptedResponse, context.encrypt(DATA))
+
+    def plain():
+        for frame in plain_frames:
+            frames.ResponseFactory.from_bytes(frame)
+
+    def legacy():
+        for frame in encrypted_frames:
+            response = frames.ResponseFactory.from_bytes(frame)
+            response.data = new_cipher_per_frame(context, response.data)
+
+    def cached():
+        for frame in encrypted_frames:
+            response = frames.ResponseFactory.from_bytes(frame)
+            response.data = context.decrypt(response.data)
+
+    def batch():
+        responses = [frames.ResponseFactory.from_bytes(f) for f in encrypted_frames]
+        decrypted = context.decrypt_many(response.data for response in responses)
+        for response, data in zip(responses, decrypted):
+            response.data = data
+
+    print(f"{FRAME_COUNT} archive frames of {len(plain_frames[0])} bytes")
+    for name, function in (
+        ("plain text", plain),
+        ("encrypted, new cipher per frame", legacy),
+        ("encrypted, cached cipher", cached),
+        ("encrypted, decrypt_many", batch),
+    ):
+        elapsed = min(timeit.repeat(function, number=1, repeat=5))
+        print(f"{name:>32}: {FRAME_COUNT / elapsed:10.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
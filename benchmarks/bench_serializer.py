@@ -0,0 +1,70 @@
+"""
+Benchmark of storing and loading device configurations with the marshmallow schemas
+and with the compiled serializers, as a service does for its whole fleet at start.
+
+Run with: python -m benchmarks.bench_serializer [devices]
+"""
+
+import json
+import sys
+import time
+
+from elgas import parser
+from elgas.parameters import serializer
+from elgas.parameters.factory import ParameterSchemaFactory
+from tests.fixtures import parameter_data
+
+DEVICES = 10_000
+# Marshmallow is too slow to run for the whole fleet, it is timed for a sample.
+SAMPLE = 200
+
+
+def schema_load(stored):
+    return [
+        ParameterSchemaFactory.by_parameter_id(item["parameter_type"])().load(
+            item["data"]
+        )
+        for item in stored["objects"]
+    ]
+
+
+def schema_dump(parameters):
+    return [
+        ParameterSchemaFactory.by_parameter_id(item.object_type)().dump(item)
+        for item in parameters
+    ]
+
+
+def timed(function, argument, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        function(argument)
+    return time.perf_counter() - start
+
+
+def main():
+    devices = int(sys.argv[1]) if len(sys.argv) > 1 else DEVICES
+    parameters = parser.ScadaParameterParser().parse(parameter_data)
+    text = serializer.to_json(parameters)
+    stored = json.loads(text)
+
+    sample = min(SAMPLE, devices)
+    slow_dump = timed(schema_dump, parameters, sample) / sample * devices
+    slow_load = timed(schema_load, stored, sample) / sample * devices
+    fast_dump = timed(serializer.dump_configuration, parameters, devices)
+    fast_load = timed(serializer.load_configuration, stored, devices)
+    from_json = timed(serializer.from_json, text, devices)
+
+    print(f"{devices:,} configurations of {len(parameters)} objects")
+    print(
+        f"dump: marshmallow {slow_dump:.2f} s (estimated), serializer "
+        f"{fast_dump:.2f} s ({slow_dump / fast_dump:.0f}x)"
+    )
+    print(
+        f"load: marshmallow {slow_load:.2f} s (estimated), serializer "
+        f"{fast_load:.2f} s ({slow_load / fast_load:.0f}x), from JSON {from_json:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
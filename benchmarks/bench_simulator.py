@@ -0,0 +1,84 @@
+"""
+Load test of the fleet poller and the call to dispatching server against simulated
+devices on this machine.
+
+Run with: python -m benchmarks.bench_simulator [units]
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+import structlog
+
+from elgas import async_client, call_to_dispatch, fleet, simulator
+from tests.fixtures import parameter_data
+
+LATENCY = 0.05
+
+
+async def poll(units: int):
+    link = simulator.Link(latency=LATENCY, bytes_per_second=10_000)
+    async with simulator.DeviceSimulator.with_units(
+        units, parameter_data, link=link
+    ) as simulated:
+        targets = [
+            fleet.DeviceTarget(
+                name=device.station_id,
+                host=host,
+                port=port,
+                password="000000",
+                password_id=801,
+            )
+            for device, (host, port) in zip(simulated.devices, simulated.addresses)
+        ]
+        poller = fleet.FleetPoller(max_sessions=units, max_sessions_per_host=units)
+        failed = 0
+        async for result in poller.results(
+            targets, [fleet.ReadTime(), fleet.ReadInstantaneousValues()]
+        ):
+            failed += not result.ok
+        summary = poller.summary
+    print(
+        f"Polled {summary.devices} units ({failed} failed jobs) with {LATENCY * 1e3:.0f}"
+        f" ms latency: {summary.devices_per_minute:,.0f} devices/minute, "
+        f"{summary.bytes_per_second:,.0f} bytes/s"
+    )
+
+
+async def calls(units: int):
+    async def handler(call, transport):
+        client = async_client.AsyncElgasClient(
+            transport=transport, password="000000", password_id=801
+        )
+        await client.read_time()
+
+    server = call_to_dispatch.CallToDispatchServer(handler)
+    listening = await server.start("127.0.0.1", 0)
+    port = listening.sockets[0].getsockname()[1]
+    devices = [
+        simulator.SimulatedDevice(parameter_data, address_1=address)
+        for address in range(1, units + 1)
+    ]
+    async with listening:
+        start = time.perf_counter()
+        answered = await simulator.call_burst(devices, "127.0.0.1", port)
+        elapsed = time.perf_counter() - start
+    print(
+        f"Call burst of {units} units: {answered} answered in {elapsed:.2f} s, "
+        f"{answered / elapsed:,.0f} calls/s"
+    )
+
+
+def main():
+    units = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    structlog.configure(
+        wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING)
+    )
+    asyncio.run(poll(units))
+    asyncio.run(calls(units))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Benchmark of decoding instantaneous values with a snapshot plan, as done on every
+poll of a device.
+
+Run with: python -m benchmarks.bench_snapshot
+"""
+
+import timeit
+
+from elgas import parser, snapshot
+from tests.fixtures import make_response, parameter_data
+
+NUMBER = 10_000
+
+
+def main():
+    parameters = parser.ScadaParameterParser().parse(parameter_data)
+    build = min(
+        timeit.repeat(
+            lambda: snapshot.SnapshotPlan.from_parameters(parameters),
+            number=100,
+            repeat=3,
+        )
+    )
+    print(f"Build plan: {build / 100 * 1e6:.1f} us")
+
+    plan = snapshot.SnapshotPlan.from_parameters(parameters)
+    response = make_response(
+        plan, list(range(len(plan.channels))), bit_orders=(656, 670)
+    )
+    decode = min(timeit.repeat(lambda: plan.decode(response), number=NUMBER, repeat=3))
+    print(f"Decode {len(response.data)} bytes: {decode / NUMBER * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
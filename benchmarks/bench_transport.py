@@ -0,0 +1,105 @@
+"""
+Benchmark of receiving archive sized frames with the blocking transports, over a
+local socket pair and a pty. The reads are counted to show the number of system
+calls, and compared with reading one byte per call as the transports used to do.
+
+Run with: python -m benchmarks.bench_transport
+"""
+
+import os
+import socket
+import threading
+import time
+
+import serial
+
+from elgas import transport, utils
+
+FRAME_COUNT = 50
+# A response with about 10 KB of archive records.
+FRAME = (
+    utils.escape_characters(
+        b"\x02\xfe\x86\x93" + bytes(range(256)) * 40 + b"\x00\x00\x00\x0d"
+    )[:-1]
+    + b"\x0d"
+)
+
+
+class CountingSocket(socket.socket):
+    reads = 0
+
+    def recv(self, size, *args):
+        self.reads += 1
+        return super().recv(size, *args)
+
+
+class CountingSerial(serial.Serial):
+    reads = 0
+
+    def read(self, size=1):
+        self.reads += 1
+        return super().read(size)
+
+
+def one_byte_at_a_time(receiving):
+    """How recv_until used to read"""
+    line = bytearray()
+    while True:
+        c = receiving._recv_chunk_one()
+        line += c
+        if line[-1:] == b"\x0d":
+            return bytes(line)
+
+
+def run(receiving, send, counter, legacy: bool):
+    sender = threading.Thread(target=lambda: [send(FRAME) for _ in range(FRAME_COUNT)])
+    counter.reads = 0
+    start = time.perf_counter()
+    sender.start()
+    for _ in range(FRAME_COUNT):
+        frame = one_byte_at_a_time(receiving) if legacy else receiving.recv_until()
+        assert frame == FRAME
+    elapsed = time.perf_counter() - start
+    sender.join()
+    return elapsed, counter.reads
+
+
+def report(name, receiving, send, counter, read_one):
+    receiving._recv_chunk_one = read_one
+    legacy_time, legacy_reads = run(receiving, send, counter, legacy=True)
+    chunked_time, chunked_reads = run(receiving, send, counter, legacy=False)
+    size = FRAME_COUNT * len(FRAME) // 1024
+    print(
+        f"{name}, {size} KB: one byte per read {legacy_time * 1e3:.1f} ms "
+        f"({legacy_reads} reads), chunked {chunked_time * 1e3:.1f} ms "
+        f"({chunked_reads} reads, {legacy_time / chunked_time:.0f}x)"
+    )
+
+
+def main():
+    ours, theirs = socket.socketpair()
+    counting = CountingSocket(fileno=ours.detach())
+    tcp = transport.BlockingTcpTransport(host="localhost", port=0)
+    tcp.tcp_socket = counting
+    report("socketpair", tcp, theirs.sendall, counting, lambda: counting.recv(1))
+    counting.close()
+    theirs.close()
+
+    controller, device_side = os.openpty()
+    port = CountingSerial(port=os.ttyname(device_side), baudrate=9600, timeout=1)
+    pty = transport.SerialTransport(port=port.port, baud_rate=9600)
+    pty.serial_port = port
+
+    def send(data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(controller, view) :]
+
+    report("pty", pty, send, port, lambda: port.read(1))
+    port.close()
+    os.close(controller)
+    os.close(device_side)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Micro-benchmarks of the hot paths of the protocol stack, to catch performance
+regressions. Each benchmark times one operation on synthetic payloads of realistic
+size and reports the time per call. Results are written as JSON and can be compared
+with a stored baseline.
+
+Run with:
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline results.json --threshold 0.2
+
+With a baseline the run fails if a benchmark is more than `threshold` (a fraction)
+slower than in the baseline. Baselines are only comparable on the same machine.
+"""
+
+import argparse
+import json
+import platform
+import random
+import re
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import *
+
+from benchmarks.bench_archive import make_records
+from benchmarks.bench_escaping import make_frame
+from elgas import (
+    application,
+    archive,
+    constants,
+    frames,
+    parser,
+    security,
+    snapshot,
+    utils,
+)
+from elgas.parameters import serializer
+from tests.fixtures import call_to_dispatch_frame as escaped_call_frame
+from tests.fixtures import make_pdu, make_response, parameter_data
+
+# Name to a function that prepares the payload and returns the operation to time.
+BENCHMARKS: Dict[str, Callable[[], Callable[[], Any]]] = dict()
+
+REPEAT = 5
+
+
+def benchmark(name: str):
+    def register(setup: Callable[[], Callable[[], Any]]):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def make_payload(size: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+def make_response_frame(data: bytes) -> frames.Response:
+    return frames.Response(
+        service=constants.ServiceNumber.READ_ARCHIVES,
+        destination_address_1=1,
+        destination_address_2=0,
+        source_address_1=2,
+        source_address_2=0,
+        data=data,
+    )
+
+
+@benchmark("frames.request_to_bytes")
+def request_to_bytes():
+    request = frames.Request(
+        service=constants.ServiceNumber.READ_ARCHIVES,
+        destination_address_1=2,
+        destination_address_2=0,
+        source_address_1=1,
+        source_address_2=0,
+        data=make_payload(64),
+    )
+    return request.to_bytes
+
+
+@benchmark("frames.request_from_bytes")
+def request_from_bytes():
+    data = frames.Request(
+        service=constants.ServiceNumber.READ_ARCHIVES,
+        destination_address_1=2,
+        destination_address_2=0,
+        source_address_1=1,
+        source_address_2=0,
+        data=make_payload(64),
+    ).to_bytes()
+    return lambda: frames.Request.from_bytes(data)
+
+
+@benchmark("frames.response_to_bytes_1k")
+def response_to_bytes():
+    return make_response_frame(make_payload(1024)).to_bytes
+
+
+@benchmark("frames.response_from_bytes_1k")
+def response_from_bytes():
+    data = make_response_frame(make_payload(1024)).to_bytes()
+    return lambda: frames.ResponseFactory.from_bytes(data)
+
+
+@benchmark("utils.escape_characters_16k")
+def escape_characters():
+    frame = make_frame(16 * 1024)
+    return lambda: utils.escape_characters(frame)
+
+
+@benchmark("utils.return_characters_16k")
+def return_characters():
+    escaped = utils.escape_characters(make_frame(16 * 1024))
+    return lambda: utils.return_characters(escaped)
+
+
+@benchmark("utils.calculate_crc_1k")
+def calculate_crc():
+    data = make_payload(1024)
+    return lambda: utils.calculate_crc(data)
+
+
+@benchmark("utils.calculate_redundancy_1k")
+def calculate_redundancy():
+    data = make_payload(1024)
+    return lambda: utils.calculate_redundancy(data)
+
+
+@benchmark("parser.parse_parameters")
+def parse_parameters():
+    scada_parser = parser.ScadaParameterParser()
+    return lambda: scada_parser.parse(parameter_data)
+
+
+@benchmark("serializer.dump_configuration")
+def dump_configuration():
+    parameters = parser.ScadaParameterParser().parse(parameter_data)
+    return lambda: serializer.dump_configuration(parameters)
+
+
+@benchmark("serializer.load_configuration")
+def load_configuration():
+    stored = serializer.dump_configuration(
+        parser.ScadaParameterParser().parse(parameter_data)
+    )
+    return lambda: serializer.load_configuration(stored)
+
+
+@benchmark("application.call_request_from_bytes")
+def call_request_from_bytes():
+    data = frames.Request.from_bytes(utils.return_characters(escaped_call_frame)).data
+    return lambda: application.CallRequest.from_bytes(data)
+
+
+@benchmark("security.encrypt_256")
+def encrypt():
+    context = security.CipherContext(security.EncryptionKeyId.ADMINISTRATOR, bytes(16))
+    data = make_payload(256)
+    return lambda: context.encrypt(data)
+
+
+@benchmark("security.decrypt_256")
+def decrypt():
+    context = security.CipherContext(security.EncryptionKeyId.ADMINISTRATOR, bytes(16))
+    encrypted = context.encrypt(make_payload(256))
+    return lambda: context.decrypt(encrypted)
+
+
+@benchmark("archive.iter_records_1000")
+def iter_archive_records():
+    plan = archive.ArchiveRecordPlan.from_parameters(
+        parser.ScadaParameterParser().parse(parameter_data)
+    )
+    random.seed(0)
+    data = make_records(plan)[: 1000 * plan.record_length]
+    return lambda: list(plan.iter_records(data))
+
+
+@benchmark("application.instantaneous_values_from_bytes")
+def instantaneous_values_from_bytes():
+    plan = snapshot.SnapshotPlan.from_parameters(
+        parser.ScadaParameterParser().parse(parameter_data)
+    )
+    pdu = make_pdu(plan, list(range(len(plan.channels))))
+    return lambda: application.ReadInstantaneousValuesResponse.from_bytes(pdu)
+
+
+@benchmark("snapshot.decode")
+def decode_snapshot():
+    plan = snapshot.SnapshotPlan.from_parameters(
+        parser.ScadaParameterParser().parse(parameter_data)
+    )
+    response = make_response(plan, list(range(len(plan.channels))), (656, 670))
+    return lambda: plan.decode(response)
+
+
+def time_per_call(operation: Callable[[], Any]) -> float:
+    """
+    Best time of `REPEAT` runs, with the number of calls per run chosen so that a
+    run takes at least 0.2 seconds.
+    """
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+    return min(timer.repeat(number=number, repeat=REPEAT)) / number
+
+
+def run(pattern: str = "") -> Dict[str, Any]:
+    results = dict()
+    for name, setup in BENCHMARKS.items():
+        if not re.search(pattern, name):
+            continue
+        seconds = time_per_call(setup())
+        results[name] = {"seconds_per_call": seconds, "calls_per_second": 1 / seconds}
+        print(f"{name:<48} {seconds * 1e6:12.2f} us", file=sys.stderr)
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Names of the benchmarks more than `threshold` slower than in the baseline.
+    Benchmarks not in both are ignored.
+    """
+    regressions = list()
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        change = result["seconds_per_call"] / before["seconds_per_call"] - 1
+        print(f"{name:<48} {change:+8.1%}", file=sys.stderr)
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    arguments = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arguments.add_argument("--output", help="Write the results as JSON to a file")
+    arguments.add_argument("--baseline", help="JSON results to compare with")
+    arguments.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed slowdown against the baseline, as a fraction (default 0.1)",
+    )
+    arguments.add_argument(
+        "--filter", default="", help="Only run benchmarks matching this regex"
+    )
+    options = arguments.parse_args(args)
+
+    current = run(options.filter)
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(current, file, indent=2, sort_keys=True)
+    else:
+        json.dump(current, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(current, baseline, options.threshold)
+        if regressions:
+            print(
+                f"Slower than baseline by more than {options.threshold:.0%}: "
+                f"{', '.join(regressions)}",
+                file=sys.stderr,
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -54,17 +54,14 @@ class ReadInstantaneousValuesResponse:
 
     @classmethod
     def from_bytes(cls, in_bytes: bytes):
-        data = in_bytes
-        current_time, is_dst, supports_dst = utils.bytes_to_datetime(data[:6])
-        data = data[6:]
-        parameter_crc = data[-2:]
-        data = data[:-2]
-        summary_status = data[-8:]
-        data = data[:-8]
-        status = data[-8:]
-        data = data[:-8]
-        data_access = data[-1]
-        data = data[:-1]
+        reader = utils.ByteReader(in_bytes)
+        current_time, is_dst, supports_dst = reader.bcd_datetime()
+        # The rest of the fields are at the end of the message, after the values.
+        data = reader.take(reader.remaining - 19)
+        data_access = reader.u8()
+        status = reader.take(8)
+        summary_status = reader.take(8)
+        parameter_crc = reader.take(2)
         return cls(
             data=data,
             current_time=current_time,
@@ -110,12 +107,12 @@ class ReadTimeResponse:
 
     @classmethod
     def from_bytes(cls, in_bytes: bytes):
-        time_data = in_bytes[:6]
-        data_access_result = in_bytes[6:7]
-        extra_data = in_bytes[7:-2]
-        # crc = in_bytes[-2:]
+        reader = utils.ByteReader(in_bytes)
+        device_time, is_dst, supports_dst = reader.bcd_datetime()
+        data_access_result = reader.take(1)
+        extra_data = reader.take(max(reader.remaining - 2, 0))
+        # crc = reader.rest()
         # TODO: Check CRC
-        device_time, is_dst, supports_dst = utils.bytes_to_datetime(time_data)
         return cls(
             time=device_time,
             data_access_result=data_access_result,
@@ -203,10 +200,11 @@ class ReadDeviceParametersResponse:
 
     @classmethod
     def from_bytes(cls, in_bytes: bytes):
-        object_number = int.from_bytes(in_bytes[:2], "little")
-        object_amount = int.from_bytes(in_bytes[2:4], "little")
-        is_end = bool(in_bytes[4])
-        data = in_bytes[5:]
+        reader = utils.ByteReader(in_bytes)
+        object_number = reader.u16()
+        object_amount = reader.u16()
+        is_end = bool(reader.u8())
+        data = reader.rest()
         return cls(
             object_number=object_number,
             object_amount=object_amount,
@@ -252,9 +250,10 @@ class ReadArchiveByTimeResponse:
 
     @classmethod
     def from_bytes(cls, in_bytes: bytes):
-        archive = constants.Archive(in_bytes[0])
-        oldest_record_id = int.from_bytes(in_bytes[1:4], "little")
-        data = in_bytes[5:]
+        reader = utils.ByteReader(in_bytes)
+        archive = constants.Archive(reader.u8())
+        oldest_record_id = reader.u32()
+        data = reader.rest()
         return cls(
             archive=archive,
             oldest_record_id=oldest_record_id,
@@ -295,9 +294,10 @@ class ReadArchiveResponse:
 
     @classmethod
     def from_bytes(cls, in_bytes: bytes):
-        archive = constants.Archive(in_bytes[0])
-        oldest_record_id = int.from_bytes(in_bytes[1:4], "little")
-        data = in_bytes[5:]
+        reader = utils.ByteReader(in_bytes)
+        archive = constants.Archive(reader.u8())
+        oldest_record_id = reader.u32()
+        data = reader.rest()
         return cls(
             archive=archive,
             oldest_record_id=oldest_record_id,
@@ -345,41 +345,32 @@ class CallRequest:
         """
         Datetimes are number of seconds since "2000-01-01T00:00:00"
         """
-        base_date = datetime.fromisoformat("2000-01-01T00:00:00")
-        data = bytearray(in_bytes)
-        length = int.from_bytes(utils.pop_many(data, 2), "little")
-        version = data.pop(0)
-        guid = bytes(utils.pop_many(data, 16))
-        station_id = utils.pretty_text(utils.pop_many(data, 17))
-        sim_id = str(utils.from_bcd(utils.pop_many(data, 10)))
-        modem_id = str(utils.from_bcd(utils.pop_many(data, 8)))
-        protocol = constants.Protocol(data.pop(0))
-        address_1 = int.from_bytes(utils.pop_many(data, 2), "little")
-        address_2 = data.pop(0)
-        signal_strength = data.pop(0)
-        connections = int.from_bytes(utils.pop_many(data, 4), "little")
-        last_connection = base_date + timedelta(
-            seconds=int.from_bytes(utils.pop_many(data, 4), "little")
-        )
-        connection_errors = int.from_bytes(utils.pop_many(data, 4), "little")
-        last_connection_error_time = base_date + timedelta(
-            seconds=int.from_bytes(utils.pop_many(data, 4), "little")
-        )
-        resets = int.from_bytes(utils.pop_many(data, 4), "little")
-        last_reset_time = base_date + timedelta(
-            seconds=int.from_bytes(utils.pop_many(data, 4), "little")
-        )
-        tcp_data = int.from_bytes(utils.pop_many(data, 4), "little")
-        all_data = int.from_bytes(utils.pop_many(data, 4), "little")
-        serial_number = str(int.from_bytes(utils.pop_many(data, 4), "little"))
-        ip_address = utils.parse_ip_address(utils.pop_many(data, 4))
-        last_modem_error_time = base_date + timedelta(
-            seconds=int.from_bytes(utils.pop_many(data, 4), "little")
-        )
-        last_modem_error = data.pop(0)
-        modem_battery_capacity = int.from_bytes(utils.pop_many(data, 2), "little")
-        modem_battery_voltage = int.from_bytes(utils.pop_many(data, 2), "little")
-        firmware_version = utils.pretty_text(utils.pop_many(data, 33))
+        reader = utils.ByteReader(in_bytes)
+        length = reader.u16()
+        version = reader.u8()
+        guid = reader.take(16)
+        station_id = reader.text(17)
+        sim_id = str(reader.bcd(10))
+        modem_id = str(reader.bcd(8))
+        protocol = constants.Protocol(reader.u8())
+        address_1 = reader.u16()
+        address_2 = reader.u8()
+        signal_strength = reader.u8()
+        connections = reader.u32()
+        last_connection = reader.seconds_since_2000()
+        connection_errors = reader.u32()
+        last_connection_error_time = reader.seconds_since_2000()
+        resets = reader.u32()
+        last_reset_time = reader.seconds_since_2000()
+        tcp_data = reader.u32()
+        all_data = reader.u32()
+        serial_number = str(reader.u32())
+        ip_address = utils.parse_ip_address(reader.view(4))
+        last_modem_error_time = reader.seconds_since_2000()
+        last_modem_error = reader.u8()
+        modem_battery_capacity = reader.u16()
+        modem_battery_voltage = reader.u16()
+        firmware_version = reader.text(33)
 
         return cls(
             station_id=station_id,
@@ -408,6 +399,46 @@ class CallRequest:
             protocol=protocol,
         )
 
+    def to_bytes(self) -> bytes:
+        """
+        Encode the call as a device sends it, used to simulate devices.
+        """
+
+        def seconds_since_2000(timestamp: datetime) -> bytes:
+            seconds = int((timestamp - utils.BASE_DATE).total_seconds())
+            return seconds.to_bytes(4, "little")
+
+        def text(value: str, amount: int) -> bytes:
+            return value.encode("latin-1")[: amount - 1].ljust(amount, b"\x00")
+
+        out = bytearray()
+        out.append(self.version)
+        out.extend(self.guid)
+        out.extend(text(self.station_id, 17))
+        out.extend(bytes.fromhex(f"{int(self.sim_card_id):020d}"))
+        out.extend(bytes.fromhex(f"{int(self.modem_id):016d}"))
+        out.append(self.protocol)
+        out.extend(self.address_1.to_bytes(2, "little"))
+        out.append(self.address_2)
+        out.append(self.signal_strength)
+        out.extend(self.connections.to_bytes(4, "little"))
+        out.extend(seconds_since_2000(self.last_connection_time))
+        out.extend(self.connection_errors.to_bytes(4, "little"))
+        out.extend(seconds_since_2000(self.last_connection_error_time))
+        out.extend(self.resets.to_bytes(4, "little"))
+        out.extend(seconds_since_2000(self.last_reset_time))
+        out.extend(self.tcp_data.to_bytes(4, "little"))
+        out.extend(self.all_data.to_bytes(4, "little"))
+        out.extend(int(self.serial_number).to_bytes(4, "little"))
+        out.extend(bytes(int(part) for part in self.ip_address.split(".")))
+        out.extend(seconds_since_2000(self.last_modem_error_time))
+        out.append(self.last_modem_error)
+        out.extend(self.modem_battery_capacity.to_bytes(2, "little"))
+        out.extend(self.modem_battery_voltage.to_bytes(2, "little"))
+        out.extend(text(self.firmware_version, 33))
+        # The length includes itself.
+        return (len(out) + 2).to_bytes(2, "little") + bytes(out)
+
 
 @attr.s(auto_attribs=True)
 class CallResponse:
@@ -0,0 +1,387 @@
+"""
+Decoding of archive records using the parameters read from the device.
+
+The archive responses only hold raw records. Where each value is in a record is
+given by the parameter objects: every value object has its address in the data, daily
+and monthly archive records, and the system parameters have the length of the
+records. A record starts with the time it was stored, as seconds since 2000-01-01.
+
+Records also hold flags: the error bits of the objects, the states of binary objects
+and the status words of diagnostics objects. Their bit orders count from the start of
+the record and they are decoded into one boolean per flag, named after the object.
+
+An `ArchiveRecordPlan` is built once from the parameters and can then decode the
+records of any number of responses, one by one with `iter_records` or all at once into
+NumPy arrays with `to_array` and `to_columns`. NumPy is an optional dependency, install
+it with `pip install elgas[numpy]`.
+"""
+import struct
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import *
+
+import attr
+
+from elgas import constants, utils
+from elgas.parameters.diagnostics import Diagnostics
+from elgas.parameters.system_parameters import SystemParameters
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+ADDRESS_ATTRIBUTES = {
+    constants.Archive.DATA: "address_in_data_archive_record",
+    constants.Archive.DAILY: "address_in_daily_archive_record",
+    constants.Archive.MONTHLY: "address_in_monthly_archive_record",
+    constants.Archive.BILLING: "address_in_billing_archive_record",
+}
+
+RECORD_LENGTH_ATTRIBUTES = {
+    constants.Archive.DATA: "data_archive_record_length",
+    constants.Archive.DAILY: "daily_archive_record_length",
+    constants.Archive.MONTHLY: "monthly_archive_record_length",
+    constants.Archive.BILLING: "billing_archive_record_length",
+    constants.Archive.BINARY: "binary_archive_record_length",
+}
+
+# Attributes with the bit order of the error flag of an object in the records. Some
+# object types name it with and some without "_record".
+ERROR_BIT_ATTRIBUTES = {
+    constants.Archive.DATA: (
+        "error_bit_order_in_data_archive",
+        "error_bit_order_in_data_archive_record",
+    ),
+    constants.Archive.BINARY: (
+        "error_bit_order_in_binary_archive",
+        "error_bit_order_in_binary_archive_record",
+    ),
+}
+
+# Attributes with the bit order of the state of a binary object in the records.
+STATE_BIT_ATTRIBUTES = {
+    constants.Archive.DATA: "bit_order_in_data_archive_record",
+    constants.Archive.BINARY: "bit_order_in_binary_archive_record",
+}
+
+# Attributes of the system parameters with the bit order of the error of the device.
+SYSTEM_ERROR_BIT_ATTRIBUTES = {
+    constants.Archive.DATA: "data_archive_record_error_bit_order",
+    constants.Archive.BINARY: "binary_archive_record_error_bit_order",
+}
+
+SYSTEM_ERROR_NAME = "System error"
+
+TIMESTAMP_FORMAT = "I"
+
+NUMPY_FORMATS = {"H": "<u2", "I": "<u4", "Q": "<u8", "f": "<f4", "d": "<f8"}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "NumPy is needed to decode archive records into arrays. "
+            "Install it with `pip install elgas[numpy]`"
+        )
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class ValueChannel:
+    """
+    A value in a record, at `address` from the start of the record.
+
+    Values stored as integers are scaled with the digit of the parameter object, and
+    the offset if it has one. Floating point values are stored as they are.
+    """
+
+    name: str
+    address: int
+    format: str
+    parameter: Any = attr.ib(eq=False, repr=False)
+
+    @property
+    def size(self) -> int:
+        return struct.calcsize("<" + self.format)
+
+    @property
+    def is_scaled(self) -> bool:
+        return (
+            self.format in ("H", "I")
+            and getattr(self.parameter, "digit", None) is not None
+        )
+
+    @property
+    def digit(self) -> float:
+        return self.parameter.digit
+
+    @property
+    def value_offset(self) -> float:
+        return getattr(self.parameter, "offset", 0.0)
+
+    def scale(self, raw):
+        if self.is_scaled:
+            return raw * self.digit + self.value_offset
+        return raw
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class BitChannel:
+    """A flag, at `bit_order` bits from the start of the data it is in"""
+
+    name: str
+    bit_order: int
+
+
+def record_timestamp(data: bytes, offset: int = 0) -> datetime:
+    """When the record at offset in the data was stored"""
+    (timestamp,) = struct.unpack_from("<" + TIMESTAMP_FORMAT, data, offset)
+    return utils.BASE_DATE + timedelta(seconds=timestamp)
+
+
+def unique_names(parameters: List[Any]) -> List[str]:
+    """Names of the parameter objects, with the id added to names used twice"""
+    names = [parameter.name for parameter in parameters]
+    duplicated = {name for name, count in Counter(names).items() if count > 1}
+    return [
+        f"{parameter.name} ({parameter.id})" if parameter.name in duplicated else name
+        for name, parameter in zip(names, parameters)
+    ]
+
+
+@attr.s(auto_attribs=True)
+class ArchiveRecordPlan:
+    """
+    Where the values are in the records of an archive.
+    """
+
+    archive: constants.Archive
+    record_length: int
+    channels: List[ValueChannel]
+    flag_channels: List[BitChannel] = attr.ib(factory=list)
+    record_struct: struct.Struct = attr.ib(init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        for channel in self.flag_channels:
+            if channel.bit_order >= self.record_length * 8:
+                raise ValueError(
+                    f"{channel.name} at bit {channel.bit_order} is outside the "
+                    f"{self.record_length} byte {self.archive.name} archive records"
+                )
+        self.channels = sorted(self.channels, key=lambda channel: channel.address)
+        position = struct.calcsize("<" + TIMESTAMP_FORMAT)
+        record_format = "<" + TIMESTAMP_FORMAT
+        for channel in self.channels:
+            if channel.address < position:
+                raise ValueError(
+                    f"{channel.name} at address {channel.address} overlaps the value "
+                    f"before it in the {self.archive.name} archive record"
+                )
+            record_format += f"{channel.address - position}x{channel.format}"
+            position = channel.address + channel.size
+        if position > self.record_length:
+            raise ValueError(
+                f"Values need {position} bytes but {self.archive.name} archive records "
+                f"are {self.record_length} bytes"
+            )
+        record_format += f"{self.record_length - position}x"
+        self.record_struct = struct.Struct(record_format)
+
+    @classmethod
+    def from_parameters(
+        cls,
+        parameters: Iterable[Any],
+        archive: constants.Archive = constants.Archive.DATA,
+    ) -> "ArchiveRecordPlan":
+        """
+        Build the plan from the parameter objects read from the device, as returned
+        by `ScadaParameterParser.parse`. Objects with address 0 are not in the archive,
+        and flags with bit order 0 are not in it either.
+        """
+        if archive not in RECORD_LENGTH_ATTRIBUTES:
+            raise ValueError(f"Records of the {archive.name} archive are not supported")
+
+        parameters = list(parameters)
+        system_parameters = next(
+            (item for item in parameters if isinstance(item, SystemParameters)), None
+        )
+        if system_parameters is None:
+            raise ValueError("Parameters do not include the system parameters")
+        record_length = getattr(system_parameters, RECORD_LENGTH_ATTRIBUTES[archive])
+
+        address_attribute = ADDRESS_ATTRIBUTES.get(archive)
+        in_archive = [
+            item
+            for item in parameters
+            if address_attribute is not None
+            and getattr(item, "value_format", None)
+            and getattr(item, address_attribute, 0)
+        ]
+        channels = [
+            ValueChannel(
+                name=name,
+                address=getattr(item, address_attribute),
+                format=item.value_format,
+                parameter=item,
+            )
+            for name, item in zip(unique_names(in_archive), in_archive)
+        ]
+        return cls(
+            archive=archive,
+            record_length=record_length,
+            channels=channels,
+            flag_channels=find_flag_channels(
+                parameters, archive, system_parameters, channels
+            ),
+        )
+
+    def record_count(self, data: bytes) -> int:
+        count, rest = divmod(len(data), self.record_length)
+        if rest:
+            raise ValueError(
+                f"Archive data of {len(data)} bytes is not a whole number of "
+                f"{self.record_length} byte records"
+            )
+        return count
+
+    def timestamp_at(self, data: bytes, index: int) -> datetime:
+        """When the record at index in the data was stored"""
+        return record_timestamp(data, index * self.record_length)
+
+    def records_until(self, data: bytes, end: datetime) -> int:
+        """
+        Number of records at the start of the data that were stored at or before end.
+        """
+        last = int((end - utils.BASE_DATE).total_seconds())
+        for index, (timestamp,) in enumerate(
+            struct.iter_unpack(f"<{TIMESTAMP_FORMAT}{self.record_length - 4}x", data)
+        ):
+            if timestamp > last:
+                return index
+        return self.record_count(data)
+
+    @property
+    def flag_bytes(self) -> Tuple[int, int]:
+        """(start, end) of the bytes of the records holding the flags"""
+        if not self.flag_channels:
+            return 0, 0
+        bit_orders = [channel.bit_order for channel in self.flag_channels]
+        return min(bit_orders) // 8, max(bit_orders) // 8 + 1
+
+    def iter_records(self, data: bytes) -> Iterator[Dict[str, Any]]:
+        """
+        Decode the records one by one into dicts of timestamp, scaled values and
+        flags.
+        """
+        self.record_count(data)
+        scaling = [
+            (channel.name, channel.digit, channel.value_offset)
+            if channel.is_scaled
+            else (channel.name, None, None)
+            for channel in self.channels
+        ]
+        flags_start, flags_end = self.flag_bytes
+        flags = [
+            (channel.name, channel.bit_order - flags_start * 8)
+            for channel in self.flag_channels
+        ]
+        view = memoryview(data)
+        for index, (timestamp, *values) in enumerate(
+            self.record_struct.iter_unpack(data)
+        ):
+            record = {"timestamp": utils.BASE_DATE + timedelta(seconds=timestamp)}
+            for (name, digit, offset), value in zip(scaling, values):
+                record[name] = value if digit is None else value * digit + offset
+            if flags:
+                start = index * self.record_length
+                bits = int.from_bytes(
+                    view[start + flags_start : start + flags_end], "little"
+                )
+                for name, bit in flags:
+                    record[name] = bool(bits >> bit & 1)
+            yield record
+
+    @property
+    def dtype(self) -> "np.dtype":
+        _require_numpy()
+        return np.dtype(
+            {
+                "names": ["timestamp"] + [channel.name for channel in self.channels],
+                "formats": [NUMPY_FORMATS[TIMESTAMP_FORMAT]]
+                + [NUMPY_FORMATS[channel.format] for channel in self.channels],
+                "offsets": [0] + [channel.address for channel in self.channels],
+                "itemsize": self.record_length,
+            }
+        )
+
+    def to_array(self, data: bytes) -> "np.ndarray":
+        """
+        All records as a structured array of the raw values. The array is a view on
+        the data, nothing is copied.
+        """
+        _require_numpy()
+        return np.frombuffer(data, dtype=self.dtype, count=self.record_count(data))
+
+    def to_columns(self, data: bytes) -> Dict[str, "np.ndarray"]:
+        """
+        All records as one array per value, with scaled values, the timestamps as
+        datetime64 and the flags as booleans.
+        """
+        records = self.to_array(data)
+        columns = {
+            "timestamp": np.datetime64(utils.BASE_DATE, "s")
+            + records["timestamp"].astype("timedelta64[s]")
+        }
+        for channel in self.channels:
+            raw = records[channel.name]
+            if channel.is_scaled:
+                columns[channel.name] = raw * channel.digit + channel.value_offset
+            else:
+                columns[channel.name] = np.ascontiguousarray(raw)
+        if self.flag_channels:
+            record_bytes = np.frombuffer(
+                data, dtype=np.uint8, count=len(records) * self.record_length
+            ).reshape(len(records), self.record_length)
+            for channel in self.flag_channels:
+                byte, bit = divmod(channel.bit_order, 8)
+                columns[channel.name] = (record_bytes[:, byte] >> bit & 1).astype(bool)
+        return columns
+
+
+def find_flag_channels(
+    parameters: List[Any],
+    archive: constants.Archive,
+    system_parameters: SystemParameters,
+    channels: List[ValueChannel],
+) -> List[BitChannel]:
+    """
+    The flags in the records of archive: the error of the device, the error and
+    state of each object, named "<name> error" and "<name> state", and the 64 bits of
+    the status words of diagnostics objects, named "<name> bit <n>".
+    """
+    flag_channels = list()
+    system_error = getattr(
+        system_parameters, SYSTEM_ERROR_BIT_ATTRIBUTES.get(archive, ""), 0
+    )
+    if system_error:
+        flag_channels.append(BitChannel(SYSTEM_ERROR_NAME, system_error))
+
+    error_attributes = ERROR_BIT_ATTRIBUTES.get(archive, ())
+    state_attribute = STATE_BIT_ATTRIBUTES.get(archive, "")
+    named = [item for item in parameters if hasattr(item, "name")]
+    for name, item in zip(unique_names(named), named):
+        for attribute in error_attributes:
+            error_bit_order = getattr(item, attribute, 0)
+            if error_bit_order:
+                flag_channels.append(BitChannel(f"{name} error", error_bit_order))
+        bit_order = getattr(item, state_attribute, 0)
+        if bit_order:
+            flag_channels.append(BitChannel(f"{name} state", bit_order))
+
+    for channel in channels:
+        if isinstance(channel.parameter, Diagnostics):
+            flag_channels.extend(
+                BitChannel(f"{channel.name} bit {bit}", channel.address * 8 + bit)
+                for bit in range(channel.size * 8)
+            )
+    return flag_channels
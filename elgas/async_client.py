@@ -0,0 +1,299 @@
+import asyncio
+import datetime
+from typing import *
+
+import attr
+import structlog
+
+from elgas import (
+    application,
+    async_transport,
+    cache,
+    connection,
+    constants,
+    exceptions,
+    parser,
+    state,
+    utils,
+)
+from elgas.archive import ArchiveRecordPlan
+from elgas.client import (
+    create_connection,
+    reaches_end,
+    system_parameter_crc,
+    trim_archive_page,
+)
+from elgas.snapshot import Snapshot, SnapshotPlanCache
+
+LOG = structlog.get_logger("async_client")
+
+T = TypeVar("T")
+
+
+@attr.s(auto_attribs=True)
+class AsyncElgasClient:
+    """
+    Elgas client for asyncio, with the same operations as `ElgasClient`.
+
+    Every operation must finish within `timeout` seconds, or the timeout passed to
+    the operation. Operations reading many pages, like `read_parameters`, have one
+    deadline for all of them. When a deadline is exceeded `DeadlineExceeded` is raised
+    and the transport is disconnected, as a late response would be taken as the
+    response to the next request. The same is done when an operation is cancelled.
+    """
+
+    transport: async_transport.AsyncElgasTransport
+    password: str = attr.ib(converter=utils.to_secret_str)
+    password_id: int
+    encryption_key: Optional[bytes] = attr.ib(
+        converter=utils.to_secret_byte, default=None
+    )
+    encryption_key_id: Optional[int] = attr.ib(default=None)
+    device_id: Optional[str] = attr.ib(default=None)
+    configuration_cache: Optional[cache.ConfigurationCache] = attr.ib(default=None)
+    snapshot_plans: SnapshotPlanCache = attr.ib(factory=SnapshotPlanCache, repr=False)
+    timeout: Optional[float] = attr.ib(default=30)
+    elgas_connection: connection.ElgasConnection = attr.ib(
+        default=attr.Factory(create_connection, takes_self=True)
+    )
+
+    def __attrs_post_init__(self):
+        if self.configuration_cache is not None and self.device_id is None:
+            raise ValueError("A device_id is needed to use a configuration cache")
+
+    async def connect(self, timeout: Optional[float] = None):
+        await self.with_deadline(self.transport.connect(), timeout, "connect")
+
+    async def disconnect(self):
+        await self.transport.disconnect()
+
+    async def _abort(self):
+        """
+        Drop the connection after an unfinished operation so that no response to it
+        can be received later.
+        """
+        self.elgas_connection = create_connection(self)
+        try:
+            await self.transport.disconnect()
+        except exceptions.CommunicationError:
+            LOG.info("Error when disconnecting after unfinished operation")
+
+    async def with_deadline(
+        self, operation: Awaitable[T], timeout: Optional[float], name: str
+    ) -> T:
+        """
+        Run an operation on the client, aborting the session if it does not finish
+        within the timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(operation, timeout)
+        except asyncio.TimeoutError as e:
+            LOG.info("Deadline exceeded", operation=name, timeout=timeout)
+            await self._abort()
+            raise exceptions.DeadlineExceeded(
+                f"{name} did not finish within {timeout} seconds"
+            ) from e
+        except asyncio.CancelledError:
+            await self._abort()
+            raise
+
+    async def request(self, event) -> Any:
+        """Send a request and wait for the response to it"""
+        data = self.elgas_connection.send(event)
+        await self.transport.send(data)
+        while True:
+            response = self.elgas_connection.next_event()
+            if response is state.NEED_DATA:
+                self.elgas_connection.receive_data(await self.transport.recv())
+                continue
+            return response
+
+    async def read_instantaneous_values(
+        self, timeout: Optional[float] = None
+    ) -> application.ReadInstantaneousValuesResponse:
+        LOG.info("Reading instantaneous values")
+        request = application.ReadInstantaneousValuesRequest(password=self.password)
+        response = await self.with_deadline(
+            self.request(request), timeout, "read_instantaneous_values"
+        )
+        LOG.info("Received instantaneous values")
+        return response
+
+    async def read_snapshot(self, timeout: Optional[float] = None) -> Snapshot:
+        """
+        Read and decode the instantaneous values. The parameters are only read when
+        there is no plan for the parameter CRC in the response yet.
+        """
+        response = await self.read_instantaneous_values(timeout)
+        parameter_crc = int.from_bytes(response.parameter_crc, "little")
+        plan = self.snapshot_plans.get(parameter_crc)
+        if plan is None:
+            LOG.info("No snapshot plan for parameters", parameter_crc=parameter_crc)
+            plan = self.snapshot_plans.plan_for(await self.read_parameters(0, timeout))
+        return plan.decode(response)
+
+    async def read_time(self, timeout: Optional[float] = None) -> datetime.datetime:
+        LOG.info("Reading device time")
+        response: application.ReadTimeResponse = await self.with_deadline(
+            self.request(application.ReadTimeRequest()), timeout, "read_time"
+        )
+        LOG.info("Got device time", time=response.time.isoformat())
+        return response.time
+
+    async def write_time(
+        self,
+        device_time: datetime.datetime,
+        cryout: bool = False,
+        timeout: Optional[float] = None,
+    ):
+        LOG.info("Writing time to device", time=device_time.isoformat())
+        request = application.WriteTimeRequest(
+            password=self.password, device_time=device_time, cryout=cryout
+        )
+        await self.with_deadline(self.request(request), timeout, "write_time")
+        LOG.info("Finished writing time to device")
+
+    async def read_parameter_crc(self, timeout: Optional[float] = None) -> int:
+        response = await self.read_instantaneous_values(timeout)
+        return int.from_bytes(response.parameter_crc, "little")
+
+    async def read_parameters(
+        self, read_from: int = 0, timeout: Optional[float] = None
+    ) -> List[Any]:
+        if self.configuration_cache is not None and read_from == 0:
+            return await self.with_deadline(
+                self._read_cached_parameters(), timeout, "read_parameters"
+            )
+        data = await self.read_parameter_data(read_from, timeout)
+        return parser.ScadaParameterParser().parse(data)
+
+    async def _read_cached_parameters(self) -> List[Any]:
+        response = await self.request(
+            application.ReadInstantaneousValuesRequest(password=self.password)
+        )
+        key = cache.CacheKey(
+            self.device_id, int.from_bytes(response.parameter_crc, "little")
+        )
+        data = self.configuration_cache.get(key)
+        if data is not None:
+            LOG.info("Using cached parameters", parameter_crc=key.parameter_crc)
+            return parser.ScadaParameterParser().parse(data)
+
+        LOG.info("Parameters not in cache", parameter_crc=key.parameter_crc)
+        data = await self._read_parameter_data(0)
+        parsed = parser.ScadaParameterParser().parse(data)
+        parameter_crc = system_parameter_crc(parsed)
+        if parameter_crc is not None:
+            self.configuration_cache.set(
+                cache.CacheKey(self.device_id, parameter_crc), data
+            )
+        return parsed
+
+    async def read_parameter_data(
+        self, read_from: int = 0, timeout: Optional[float] = None
+    ) -> bytes:
+        return await self.with_deadline(
+            self._read_parameter_data(read_from), timeout, "read_parameter_data"
+        )
+
+    async def _read_parameter_data(self, read_from: int) -> bytes:
+        LOG.info(f"Reading device parameters", read_from=read_from)
+        should_stop = False
+        total_parameter_data = b""
+        object_count = read_from
+        while not should_stop:
+            LOG.info("Requesting device parameters", object_count=object_count)
+            request = application.ReadDeviceParametersRequest(
+                password=self.password, object_count=object_count, buffer_length=1024
+            )
+            response: application.ReadDeviceParametersResponse = await self.request(
+                request
+            )
+            LOG.info("Received device parameters", object_amount=response.object_amount)
+            total_parameter_data += response.data
+            should_stop = response.is_end
+            object_count += response.object_amount
+
+        LOG.debug("Received total parameters data", data=total_parameter_data)
+        return total_parameter_data
+
+    async def read_archive(
+        self,
+        archive: constants.Archive,
+        amount: int,
+        oldest_record_id: int,
+        timeout: Optional[float] = None,
+    ) -> application.ReadArchiveResponse:
+        request = application.ReadArchiveRequest(
+            password=self.password,
+            archive=archive,
+            amount=amount,
+            oldest_record_id=oldest_record_id,
+        )
+        return await self.with_deadline(self.request(request), timeout, "read_archive")
+
+    async def read_archive_by_time(
+        self,
+        archive: constants.Archive,
+        amount: int,
+        oldest_timestamp: datetime.datetime,
+        timeout: Optional[float] = None,
+    ) -> application.ReadArchiveByTimeResponse:
+        request = application.ReadArchiveByTimeRequest(
+            password=self.password,
+            archive=archive,
+            amount=amount,
+            oldest_timestamp=oldest_timestamp,
+        )
+        return await self.with_deadline(
+            self.request(request), timeout, "read_archive_by_time"
+        )
+
+    async def iter_archive_pages(
+        self,
+        plan: ArchiveRecordPlan,
+        start: Union[int, datetime.datetime],
+        end: Optional[Union[int, datetime.datetime]] = None,
+        amount: int = 10,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[
+        Union[application.ReadArchiveResponse, application.ReadArchiveByTimeResponse]
+    ]:
+        """
+        Like `ElgasClient.iter_archive_pages`. The deadline applies to each request.
+        """
+        if isinstance(start, datetime.datetime):
+            response = await self.read_archive_by_time(
+                plan.archive, amount, start, timeout
+            )
+        else:
+            response = await self.read_archive(plan.archive, amount, start, timeout)
+
+        while True:
+            count, keep = trim_archive_page(plan, response, end)
+            if count == 0:
+                LOG.info("No more records in archive", archive=plan.archive.name)
+                return
+            last = keep < count or reaches_end(plan, response, count, end)
+            # Taken before yielding, the response may be changed by the caller.
+            next_record_id = response.oldest_record_id + count
+            if keep:
+                yield response
+            if last:
+                return
+            response = await self.read_archive(
+                plan.archive, amount, next_record_id, timeout
+            )
+
+    async def iter_archive_records(
+        self,
+        plan: ArchiveRecordPlan,
+        start: Union[int, datetime.datetime],
+        end: Optional[Union[int, datetime.datetime]] = None,
+        amount: int = 10,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        async for page in self.iter_archive_pages(plan, start, end, amount, timeout):
+            for record in plan.iter_records(page.data):
+                yield record
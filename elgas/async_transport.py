@@ -0,0 +1,109 @@
+import asyncio
+from typing import *
+
+import attr
+import structlog
+
+from elgas import exceptions
+
+LOG = structlog.get_logger("async_transport")
+
+
+class AsyncElgasTransport(Protocol):
+    async def connect(self):
+        ...
+
+    async def disconnect(self):
+        ...
+
+    async def send(self, data: bytes):
+        ...
+
+    async def recv(self) -> bytes:
+        ...
+
+
+@attr.s(auto_attribs=True)
+class AsyncTcpTransport:
+    """
+    A TCP transport using asyncio streams.
+
+    `recv` returns whatever data is available, the connection finds the frames in it.
+    Timeouts are handled per operation by the client.
+    """
+
+    host: str
+    port: int
+    read_size: int = attr.ib(default=4096)
+    reader: Optional[asyncio.StreamReader] = attr.ib(init=False, default=None)
+    writer: Optional[asyncio.StreamWriter] = attr.ib(init=False, default=None)
+    bytes_sent: int = attr.ib(init=False, default=0)
+    bytes_received: int = attr.ib(init=False, default=0)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.host, self.port
+
+    @classmethod
+    def from_streams(
+        cls, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> "AsyncTcpTransport":
+        """
+        Transport over a connection that is already open, like one accepted by a
+        server.
+        """
+        host, port = writer.get_extra_info("peername")[:2]
+        transport = cls(host=host, port=port)
+        transport.reader = reader
+        transport.writer = writer
+        return transport
+
+    async def connect(self):
+        if self.writer:
+            raise RuntimeError(f"There is already an active socket to {self.address}")
+        try:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        except OSError as e:
+            raise exceptions.CommunicationError("Unable to connect socket") from e
+        LOG.info(f"Connected to {self.address}")
+
+    async def disconnect(self):
+        """
+        Close the connection. No-op if it is already closed.
+        """
+        if self.writer:
+            writer = self.writer
+            self.reader = None
+            self.writer = None
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except OSError as e:
+                raise exceptions.CommunicationError from e
+            LOG.info(f"Connection to {self.address} is closed")
+
+    async def send(self, data: bytes):
+        if not self.writer:
+            raise RuntimeError("TCP transport not connected.")
+        try:
+            self.writer.write(data)
+            await self.writer.drain()
+            self.bytes_sent += len(data)
+            LOG.debug(f"Sent data", data=data, transport=self)
+        except OSError as e:
+            raise exceptions.CommunicationError("Could no send data") from e
+
+    async def recv(self) -> bytes:
+        if not self.reader:
+            raise RuntimeError("TCP transport not connected.")
+        try:
+            data = await self.reader.read(self.read_size)
+        except OSError as e:
+            raise exceptions.CommunicationError("Could not receive data") from e
+        if not data:
+            raise exceptions.CommunicationError("Connection closed by remote")
+        self.bytes_received += len(data)
+        LOG.debug("Received data", data=data, transport=self)
+        return data
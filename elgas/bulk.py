@@ -0,0 +1,122 @@
+"""
+Validation of many frames at once with NumPy.
+
+Meant for offline checks of captured traffic where validating frame by frame in
+Python is too slow. All frames are concatenated into one array and the redundancy
+bytes of every frame are calculated with a few vectorized reductions.
+
+NumPy is an optional dependency, install it with `pip install elgas[numpy]`.
+"""
+from typing import *
+
+from elgas import utils
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+MIN_FRAME_LENGTH = 16  # STX + 15 bytes of header and trailer around the data.
+FRAME_TYPES = (0x84, 0x85, 0x86, 0x87)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "NumPy is needed for bulk frame validation. "
+            "Install it with `pip install elgas[numpy]`"
+        )
+
+
+def _concatenate(chunks: Sequence[bytes]) -> Tuple["np.ndarray", "np.ndarray"]:
+    lengths = np.fromiter((len(chunk) for chunk in chunks), dtype=np.intp)
+    flat = np.frombuffer(b"".join(chunks), dtype=np.uint8)
+    return flat, lengths
+
+
+def _redundancy(flat: "np.ndarray", starts: "np.ndarray", ends: "np.ndarray"):
+    """
+    LRC, checksum and DRC of the segments flat[start:end], as an array of shape
+    (segments, 3). Segments must be sorted, non-empty and not overlap.
+    """
+    bounds = np.empty(len(starts) * 2, dtype=np.intp)
+    bounds[0::2] = starts
+    bounds[1::2] = ends
+    # The reduction between two bounds at even positions is a segment, the ones at odd
+    # positions are the gaps between them and are thrown away. reduceat does not accept
+    # the end of the array as an index but a last segment reaching it is reduced to the
+    # end anyway.
+    indices = bounds[:-1] if bounds[-1] == len(flat) else bounds
+
+    # Byte i of a segment ending at `end` is rotated (end - 1 - i) % 8 times in the DRC.
+    points = np.concatenate(([0], bounds, [len(flat)]))
+    end_of_byte = np.repeat(points[1:], np.diff(points))
+    rotations = ((end_of_byte - 1 - np.arange(len(flat))) % 8).astype(np.uint16)
+    wide = flat.astype(np.uint16)
+    rotated = (((wide << rotations) | (wide >> (8 - rotations))) & 0xFF).astype(
+        np.uint8
+    )
+
+    out = np.empty((len(starts), 3), dtype=np.uint8)
+    out[:, 0] = np.bitwise_xor.reduceat(flat, indices)[0::2]
+    out[:, 1] = np.add.reduceat(wide, indices, dtype=np.uint64)[0::2] & 0xFF
+    out[:, 2] = np.bitwise_xor.reduceat(rotated, indices)[0::2]
+    return out
+
+
+def calculate_redundancy(payloads: Sequence[bytes]) -> "np.ndarray":
+    """
+    LRC, checksum and DRC of each payload, as an array of shape (len(payloads), 3).
+    Gives the same result as `utils.calculate_redundancy` on each payload.
+    """
+    _require_numpy()
+    flat, lengths = _concatenate(payloads)
+    out = np.zeros((len(lengths), 3), dtype=np.uint8)
+    present = lengths > 0
+    if present.any():
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        out[present] = _redundancy(flat, starts[present], ends[present])
+    return out
+
+
+def validate_frames(frames: Sequence[bytes], escaped: bool = True) -> "np.ndarray":
+    """
+    Check many complete frames, from STX to the end char, and return a boolean array
+    telling which of them are valid.
+
+    A frame is valid if it starts with STX and 0xFE, has a known frame type, ends with
+    the end char, has a length field matching its length and correct LRC, checksum
+    and DRC. Frames as captured on the wire are escaped, pass `escaped=False` for
+    frames where the characters are already returned.
+    """
+    _require_numpy()
+    if escaped:
+        returned = list()
+        for frame in frames:
+            try:
+                returned.append(utils.return_characters(frame))
+            except ValueError:
+                returned.append(b"")
+        frames = returned
+
+    flat, lengths = _concatenate(frames)
+    valid = lengths >= MIN_FRAME_LENGTH
+    if not valid.any():
+        return valid
+
+    ends = np.cumsum(lengths)[valid]
+    starts = ends - lengths[valid]
+    length_field = flat[starts + 4] | flat[starts + 5].astype(np.intp) << 8
+    redundancy = _redundancy(flat, starts + 1, ends - 4)
+    received = np.stack((flat[ends - 4], flat[ends - 3], flat[ends - 2]), axis=1)
+
+    valid[valid] = (
+        (flat[starts] == 0x02)
+        & (flat[starts + 1] == 0xFE)
+        & np.isin(flat[starts + 2], FRAME_TYPES)
+        & (flat[ends - 1] == 0x0D)
+        & (length_field == lengths[valid] - 1)
+        & (redundancy == received).all(axis=1)
+    )
+    return valid
@@ -0,0 +1,118 @@
+"""
+Caching of the parameters read from devices.
+
+Reading the parameters is the slowest part of a session, they are sent in many pages
+and over GPRS that can take a long time. The parameters only change when someone
+reconfigures the device, and then the parameter CRC, that the device sends with the
+instantaneous values, changes too. So parameters are cached by device and parameter
+CRC and only have to be read again when the CRC is new.
+
+The caches store the raw SCADA parameter data, parsing it is cheap compared to
+reading it from the device.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import *
+
+import attr
+import structlog
+
+LOG = structlog.get_logger("cache")
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class CacheKey:
+    """
+    Identifies a parameter set. `device` is chosen by the user of the client, for
+    example the serial number or the phone number of the device.
+    """
+
+    device: str
+    parameter_crc: int
+
+
+class ConfigurationCache(Protocol):
+    """
+    Where the clients keep the raw parameter data of devices between sessions. Any
+    object with these methods can be used, for example one storing the data in the
+    database of the application.
+    """
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        """Cached parameter data or None if the key is not in the cache"""
+        ...
+
+    def set(self, key: CacheKey, data: bytes) -> None:
+        """Store the parameter data, replacing any data stored for the key"""
+        ...
+
+
+@attr.s(auto_attribs=True)
+class MemoryConfigurationCache:
+    """
+    Keeps the parameter data of the `max_size` most recently used parameter sets in
+    memory.
+    """
+
+    max_size: int = attr.ib(default=128)
+    _items: "OrderedDict[CacheKey, bytes]" = attr.ib(
+        init=False, factory=OrderedDict, repr=False
+    )
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        data = self._items.get(key)
+        if data is not None:
+            self._items.move_to_end(key)
+        return data
+
+    def set(self, key: CacheKey, data: bytes) -> None:
+        self._items[key] = bytes(data)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+
+@attr.s(auto_attribs=True)
+class FileConfigurationCache:
+    """
+    Stores the parameter data in a directory, one file per parameter set, so it is
+    kept between runs and can be shared by several processes.
+    """
+
+    directory: Path = attr.ib(converter=Path)
+
+    def __attrs_post_init__(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: CacheKey) -> Path:
+        # The device id is made safe to use in a file name, which can map different
+        # ids to the same name, so a hash of the id itself is added to the name too.
+        device = re.sub(r"[^A-Za-z0-9_.-]", "_", key.device)
+        digest = hashlib.sha256(key.device.encode("utf-8")).hexdigest()[:12]
+        return self.directory / f"{device}-{digest}-{key.parameter_crc:04x}.bin"
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        try:
+            return self.path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: CacheKey, data: bytes) -> None:
+        # Written to a temporary file first so that readers never see half a file.
+        path = self.path(key)
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        LOG.debug("Stored parameters in cache", path=str(path))
@@ -0,0 +1,125 @@
+"""
+Server for call to dispatching.
+
+Devices with a GPRS modem can be set to connect to a server when they wake up and
+register with a `CallRequest`. The server answers with a `CallResponse` and can then
+read the device over the same connection until the call window of the modem closes.
+
+`CallToDispatchServer` accepts the connections, handles the registration and hands
+the connection to a handler as an `AsyncTcpTransport`, ready to be used with an
+`AsyncElgasClient`. The number of sessions is bounded. A connection that does not get
+a session within `wait_for_session` seconds is closed, the modem will call again later.
+"""
+import asyncio
+from typing import *
+
+import attr
+import structlog
+
+from elgas import application, async_transport, constants, exceptions, frames, utils
+
+LOG = structlog.get_logger("call_to_dispatch")
+
+Handler = Callable[
+    [application.CallRequest, async_transport.AsyncTcpTransport], Awaitable[None]
+]
+
+
+async def read_call(reader: asyncio.StreamReader) -> frames.Request:
+    """
+    Read the call to dispatching frame sent by the device.
+    """
+    try:
+        escaped = await reader.readuntil(b"\x0d")
+    except asyncio.IncompleteReadError as e:
+        raise exceptions.CommunicationError("Connection closed before call") from e
+    try:
+        request = frames.Request.from_bytes(utils.return_characters(escaped))
+    except ValueError as e:
+        raise exceptions.FramingError(str(e)) from e
+    if request.service != constants.ServiceNumber.CALL:
+        raise exceptions.LocalElgasProtocolError(
+            f"Expected a call to dispatching, got {request.service!r}"
+        )
+    return request
+
+
+def call_response(request: frames.Request) -> bytes:
+    """The escaped frame answering a call to dispatching"""
+    response = frames.Response(
+        service=constants.ServiceNumber.CALL,
+        destination_address_1=request.source_address_1,
+        destination_address_2=request.source_address_2,
+        source_address_1=request.destination_address_1,
+        source_address_2=request.destination_address_2,
+        data=application.CallResponse().to_bytes(),
+    )
+    return utils.escape_characters(response.to_bytes())
+
+
+@attr.s(auto_attribs=True)
+class CallToDispatchServer:
+    """
+    Accepts calls from devices and runs `handler` for each of them.
+
+    At most `max_sessions` connections are handled at a time. The device must send its
+    call within `call_timeout` seconds and the handler must finish within
+    `session_timeout` seconds, after that the connection is closed.
+    """
+
+    handler: Handler
+    max_sessions: int = attr.ib(default=1000)
+    wait_for_session: float = attr.ib(default=5.0)
+    call_timeout: float = attr.ib(default=10.0)
+    session_timeout: Optional[float] = attr.ib(default=300.0)
+    backlog: int = attr.ib(default=1024)
+    active_sessions: int = attr.ib(init=False, default=0)
+    calls: int = attr.ib(init=False, default=0)
+    rejected: int = attr.ib(init=False, default=0)
+    _slots: Optional[asyncio.Semaphore] = attr.ib(init=False, default=None, repr=False)
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        """
+        Start listening. Use the returned server to close it or serve forever.
+        """
+        self._slots = asyncio.Semaphore(self.max_sessions)
+        server = await asyncio.start_server(
+            self.handle_connection, host, port, backlog=self.backlog
+        )
+        LOG.info("Listening for calls", host=host, port=port)
+        return server
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        peer = writer.get_extra_info("peername")
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.wait_for_session)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            LOG.info("No free session, closing connection", peer=peer)
+            writer.close()
+            return
+
+        self.active_sessions += 1
+        transport = async_transport.AsyncTcpTransport.from_streams(reader, writer)
+        try:
+            request = await asyncio.wait_for(read_call(reader), self.call_timeout)
+            call = application.CallRequest.from_bytes(request.data)
+            self.calls += 1
+            LOG.info("Received call", peer=peer, station_id=call.station_id)
+            await transport.send(call_response(request))
+            await asyncio.wait_for(self.handler(call, transport), self.session_timeout)
+        except asyncio.TimeoutError:
+            LOG.info("Call session timed out", peer=peer)
+        except (exceptions.ElgasError, ValueError) as e:
+            LOG.info("Call session failed", peer=peer, error=repr(e))
+        except Exception:
+            LOG.exception("Error in call handler", peer=peer)
+        finally:
+            self.active_sessions -= 1
+            self._slots.release()
+            try:
+                await transport.disconnect()
+            except exceptions.CommunicationError:
+                pass
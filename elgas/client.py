@@ -4,14 +4,99 @@ from typing import *
 import attr
 import structlog
 
-from elgas import application, connection, constants, parser, state, transport, utils
+from elgas import (
+    application,
+    cache,
+    connection,
+    constants,
+    parser,
+    state,
+    transport,
+    utils,
+)
+from elgas.archive import ArchiveRecordPlan
+from elgas.parameters.system_parameters import SystemParameters
+from elgas.snapshot import Snapshot, SnapshotPlanCache
 
 LOG = structlog.get_logger("client")
 
 
+def create_connection(client) -> connection.ElgasConnection:
+    return connection.ElgasConnection(
+        password=client.password,
+        password_id=client.password_id,
+        destination_address_1=0,
+        destination_address_2=0,
+        source_address_1=0,
+        source_address_2=0,
+        encryption_key=client.encryption_key,
+        encryption_key_id=client.encryption_key_id,
+    )
+
+
+def system_parameter_crc(parameters: List[Any]) -> Optional[int]:
+    system_parameters = next(
+        (item for item in parameters if isinstance(item, SystemParameters)), None
+    )
+    if system_parameters is None:
+        return None
+    return system_parameters.parameter_crc
+
+
+def trim_archive_page(
+    plan: ArchiveRecordPlan,
+    response: Union[
+        application.ReadArchiveResponse, application.ReadArchiveByTimeResponse
+    ],
+    end: Optional[Union[int, datetime.datetime]],
+) -> Tuple[int, int]:
+    """
+    Remove the records after end from the response. Returns the number of records
+    the device sent and the number kept.
+    """
+    count = plan.record_count(response.data)
+    if isinstance(end, datetime.datetime):
+        keep = plan.records_until(response.data, end)
+    elif end is not None:
+        keep = max(0, min(count, end - response.oldest_record_id + 1))
+    else:
+        keep = count
+    if keep < count:
+        response.data = response.data[: keep * plan.record_length]
+    return count, keep
+
+
+def reaches_end(
+    plan: ArchiveRecordPlan,
+    response: Union[
+        application.ReadArchiveResponse, application.ReadArchiveByTimeResponse
+    ],
+    count: int,
+    end: Optional[Union[int, datetime.datetime]],
+) -> bool:
+    """
+    If the last of the `count` records in the response is at or after end, so there
+    are no more records to request.
+    """
+    if end is None or count == 0:
+        return False
+    if isinstance(end, datetime.datetime):
+        return plan.timestamp_at(response.data, count - 1) >= end
+    return response.oldest_record_id + count > end
+
+
 @attr.s(auto_attribs=True)
 class ElgasClient:
-    """Elgas client"""
+    """
+    Elgas client
+
+    With a `configuration_cache` the parameters are only read from the device when
+    its parameter CRC is not in the cache. The cache is keyed by `device_id`, which
+    must then be set.
+
+    `read_snapshot` decodes the instantaneous values with the plan for the parameter
+    CRC in the response, from `snapshot_plans`.
+    """
 
     transport: transport.ElgasTransport
     password: str = attr.ib(converter=utils.to_secret_str)
@@ -20,23 +105,17 @@ class ElgasClient:
         converter=utils.to_secret_byte, default=None
     )
     encryption_key_id: Optional[int] = attr.ib(default=None)
-    # device_configuration: List[object]
+    device_id: Optional[str] = attr.ib(default=None)
+    configuration_cache: Optional[cache.ConfigurationCache] = attr.ib(default=None)
+    snapshot_plans: SnapshotPlanCache = attr.ib(factory=SnapshotPlanCache, repr=False)
     elgas_connection: connection.ElgasConnection = attr.ib(
-        default=attr.Factory(
-            lambda self: connection.ElgasConnection(
-                password=self.password,
-                password_id=self.password_id,
-                destination_address_1=0,
-                destination_address_2=0,
-                source_address_1=0,
-                source_address_2=0,
-                encryption_key=self.encryption_key,
-                encryption_key_id=self.encryption_key_id,
-            ),
-            takes_self=True,
-        )
+        default=attr.Factory(create_connection, takes_self=True)
     )
 
+    def __attrs_post_init__(self):
+        if self.configuration_cache is not None and self.device_id is None:
+            raise ValueError("A device_id is needed to use a configuration cache")
+
     def connect(self):
         self.transport.connect()
 
@@ -66,6 +145,19 @@ class ElgasClient:
         LOG.info("Received instantaneous values")
         return response
 
+    def read_snapshot(self) -> Snapshot:
+        """
+        Read and decode the instantaneous values. The parameters are only read when
+        there is no plan for the parameter CRC in the response yet.
+        """
+        response = self.read_instantaneous_values()
+        parameter_crc = int.from_bytes(response.parameter_crc, "little")
+        plan = self.snapshot_plans.get(parameter_crc)
+        if plan is None:
+            LOG.info("No snapshot plan for parameters", parameter_crc=parameter_crc)
+            plan = self.snapshot_plans.plan_for(self.read_parameters())
+        return plan.decode(response)
+
     def read_time(self):
         LOG.info("Reading device time")
         request = application.ReadTimeRequest()
@@ -83,7 +175,43 @@ class ElgasClient:
         self.next_event()
         LOG.info("Finished writing time to device")
 
+    def read_parameter_crc(self) -> int:
+        """
+        The parameter CRC is sent with the instantaneous values. It changes when the
+        parameters of the device are changed.
+        """
+        response = self.read_instantaneous_values()
+        return int.from_bytes(response.parameter_crc, "little")
+
     def read_parameters(self, read_from: int = 0) -> List[Any]:
+        if self.configuration_cache is not None and read_from == 0:
+            return self.read_cached_parameters()
+        return parser.ScadaParameterParser().parse(self.read_parameter_data(read_from))
+
+    def read_cached_parameters(self) -> List[Any]:
+        """
+        Use the parameters in the configuration cache if the device still has the
+        same parameter CRC, else read them from the device and cache them.
+        """
+        key = cache.CacheKey(self.device_id, self.read_parameter_crc())
+        data = self.configuration_cache.get(key)
+        if data is not None:
+            LOG.info("Using cached parameters", parameter_crc=key.parameter_crc)
+            return parser.ScadaParameterParser().parse(data)
+
+        LOG.info("Parameters not in cache", parameter_crc=key.parameter_crc)
+        data = self.read_parameter_data()
+        parsed = parser.ScadaParameterParser().parse(data)
+        # Cached under the CRC of the parameters that were read, in case they were
+        # changed between reading the CRC and the parameters.
+        parameter_crc = system_parameter_crc(parsed)
+        if parameter_crc is not None:
+            self.configuration_cache.set(
+                cache.CacheKey(self.device_id, parameter_crc), data
+            )
+        return parsed
+
+    def read_parameter_data(self, read_from: int = 0) -> bytes:
         LOG.info(f"Reading device parameters", read_from=read_from)
         should_stop = False
         total_parameter_data = b""
@@ -103,8 +231,7 @@ class ElgasClient:
                 LOG.info("More parameters available", next_object_count=object_count)
 
         LOG.debug("Received total parameters data", data=total_parameter_data)
-        parsed = parser.ScadaParameterParser().parse(total_parameter_data)
-        return parsed
+        return total_parameter_data
 
     def read_archive(
         self, archive: constants.Archive, amount: int, oldest_record_id: int
@@ -131,3 +258,55 @@ class ElgasClient:
         self.send(request)
         response = self.next_event()
         return response
+
+    def iter_archive_pages(
+        self,
+        plan: ArchiveRecordPlan,
+        start: Union[int, datetime.datetime],
+        end: Optional[Union[int, datetime.datetime]] = None,
+        amount: int = 10,
+    ) -> Iterator[
+        Union[application.ReadArchiveResponse, application.ReadArchiveByTimeResponse]
+    ]:
+        """
+        Read the archive of the plan from `start` to `end`, both included, asking for
+        `amount` records per request. Start and end are record ids or timestamps.
+        Without an end the archive is read to the newest record.
+
+        The next request continues after the records the device returned, and only one
+        response is held at a time. The first response is a `ReadArchiveByTimeResponse`
+        when start is a timestamp. Responses are trimmed so they have no records after
+        end. Reading stops at the record at or after end, or when the device returns
+        no records.
+        """
+        if isinstance(start, datetime.datetime):
+            response = self.read_archive_by_time(plan.archive, amount, start)
+        else:
+            response = self.read_archive(plan.archive, amount, start)
+
+        while True:
+            count, keep = trim_archive_page(plan, response, end)
+            if count == 0:
+                LOG.info("No more records in archive", archive=plan.archive.name)
+                return
+            last = keep < count or reaches_end(plan, response, count, end)
+            # Taken before yielding, the response may be changed by the caller.
+            next_record_id = response.oldest_record_id + count
+            if keep:
+                yield response
+            if last:
+                return
+            response = self.read_archive(plan.archive, amount, next_record_id)
+
+    def iter_archive_records(
+        self,
+        plan: ArchiveRecordPlan,
+        start: Union[int, datetime.datetime],
+        end: Optional[Union[int, datetime.datetime]] = None,
+        amount: int = 10,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Decoded records from `iter_archive_pages`, one by one.
+        """
+        for page in self.iter_archive_pages(plan, start, end, amount):
+            yield from plan.iter_records(page.data)
@@ -0,0 +1,213 @@
+"""
+Indexed view of the parameters of a device.
+
+`Configuration` is built once from the parameter objects returned by
+`ScadaParameterParser.parse` (or a `ParameterSet`) and looks objects up in dicts: by
+id, by number, by type, by name and by their address or bit order in the
+instantaneous values and archive records. It also resolves the references between
+objects, like the primary counter and conversion of a standard counter.
+"""
+from collections import defaultdict
+from typing import *
+
+import attr
+
+from elgas import constants
+from elgas.archive import ADDRESS_ATTRIBUTES, unique_names
+from elgas.parameters.enumerations import ParameterObjectType
+
+# Attributes that place an object in the instantaneous values or archive records.
+ADDRESS_FIELDS = (
+    "address_in_actual_values",
+    "address_in_data_archive_record",
+    "address_in_daily_archive_record",
+    "address_in_monthly_archive_record",
+    "address_in_billing_archive_record",
+    "bit_order_in_actual_values",
+    "bit_order_in_data_archive_record",
+    "bit_order_in_binary_archive_record",
+    "error_bit_order_in_actual_values",
+    "error_bit_order_in_data_archive",
+    "error_bit_order_in_binary_archive",
+)
+
+# Objects are numbered within groups of types. A reference by number points into
+# one of these groups.
+REFERENCES: Dict[str, Tuple[ParameterObjectType, ...]] = {
+    "number_of_primary_counter": (
+        ParameterObjectType.COUNTER,
+        ParameterObjectType.DOUBLE_COUNTER,
+    ),
+    "number_of_standard_counter": (ParameterObjectType.STANDARD_COUNTER,),
+    "number_of_base_counter": (ParameterObjectType.STANDARD_COUNTER,),
+    "number_of_conversion": (ParameterObjectType.CONVERSION_COEFFICIENT,),
+    "number_of_conversion_coefficient": (ParameterObjectType.CONVERSION_COEFFICIENT,),
+    "number_of_analog_pressure": (ParameterObjectType.ANALOG_MEASURAND,),
+    "number_of_analog_temperature": (ParameterObjectType.ANALOG_MEASURAND,),
+    "number_of_primary_flow_rate": (ParameterObjectType.FLOW_RATE,),
+    "number_of_calorific_value": (ParameterObjectType.ANALOG_MEASURAND,),
+    "number_of_primary_quantity": (ParameterObjectType.ANALOG_MEASURAND,),
+}
+
+# References whose group is given by another field of the object, like the type of
+# the primary quantity of a set point. The groups in `REFERENCES` are used for
+# objects without the field.
+REFERENCE_TYPES: Dict[str, str] = {
+    "number_of_primary_quantity": "type_of_primary_quantity",
+}
+
+
+def referenced_types(item: Any, field: str) -> Tuple[ParameterObjectType, ...]:
+    """The object types a `number_of_*` field of item refers into"""
+    type_field = REFERENCE_TYPES.get(field)
+    if type_field is not None and hasattr(item, type_field):
+        try:
+            return (ParameterObjectType(getattr(item, type_field)),)
+        except ValueError:
+            return ()
+    return REFERENCES[field]
+
+
+@attr.s(auto_attribs=True)
+class Configuration(Sequence):
+    """
+    The parameter objects of a device with indexes for lookups. It is a sequence of
+    the objects, so it can be used wherever the parsed list is, like when making
+    archive and snapshot plans.
+
+    Names are the unique names used for values in records and snapshots, with the
+    id added to names used by more than one object. Lookups by the plain name give
+    the first object with it.
+    """
+
+    parameters: List[Any] = attr.ib(converter=list)
+    ids: Dict[int, Any] = attr.ib(init=False, factory=dict, repr=False)
+    names: Dict[str, Any] = attr.ib(init=False, factory=dict, repr=False)
+    numbers: Dict[Tuple[ParameterObjectType, int], Any] = attr.ib(
+        init=False, factory=dict, repr=False
+    )
+    types: DefaultDict[ParameterObjectType, List[Any]] = attr.ib(
+        init=False, factory=lambda: defaultdict(list), repr=False
+    )
+    addresses: Dict[str, Dict[int, Any]] = attr.ib(init=False, factory=dict, repr=False)
+    _unique_names: Dict[int, str] = attr.ib(init=False, factory=dict, repr=False)
+
+    def __attrs_post_init__(self):
+        self.addresses = {field: dict() for field in ADDRESS_FIELDS}
+        named = [item for item in self.parameters if hasattr(item, "name")]
+        for name, item in zip(unique_names(named), named):
+            self.names[name] = item
+            self._unique_names[id(item)] = name
+        for item in self.parameters:
+            self.types[item.object_type].append(item)
+            self.names.setdefault(getattr(item, "name", None), item)
+            parameter_id = getattr(item, "id", None)
+            if parameter_id is not None:
+                self.ids.setdefault(parameter_id, item)
+            number = getattr(item, "number", None)
+            if number is not None:
+                self.numbers.setdefault((item.object_type, number), item)
+            for field, index in self.addresses.items():
+                address = getattr(item, field, 0)
+                if address:
+                    index.setdefault(address, item)
+        self.names.pop(None, None)
+
+    def __len__(self) -> int:
+        return len(self.parameters)
+
+    def __getitem__(self, index):
+        return self.parameters[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.parameters)
+
+    @property
+    def system_parameters(self) -> Optional[Any]:
+        found = self.types.get(ParameterObjectType.SYSTEM_PARAMETER)
+        return found[0] if found else None
+
+    @property
+    def parameter_crc(self) -> Optional[int]:
+        system_parameters = self.system_parameters
+        return None if system_parameters is None else system_parameters.parameter_crc
+
+    def by_id(self, parameter_id: int) -> Optional[Any]:
+        return self.ids.get(parameter_id)
+
+    def by_name(self, name: str) -> Optional[Any]:
+        return self.names.get(name)
+
+    def by_number(
+        self,
+        number: int,
+        object_types: Union[ParameterObjectType, Iterable[ParameterObjectType]],
+    ) -> Optional[Any]:
+        """The object with the number in the first of object_types that has it"""
+        if isinstance(object_types, ParameterObjectType):
+            object_types = (object_types,)
+        for object_type in object_types:
+            item = self.numbers.get((object_type, number))
+            if item is not None:
+                return item
+        return None
+
+    def of_type(self, object_type: ParameterObjectType) -> List[Any]:
+        return self.types.get(object_type, [])
+
+    def name_of(self, item: Any) -> Optional[str]:
+        """The unique name of the object, as used in records and snapshots"""
+        return self._unique_names.get(id(item))
+
+    def at(self, field: str, address: int) -> Optional[Any]:
+        """
+        The object with `field`, one of `ADDRESS_FIELDS`, set to address. Address 0
+        means not used and gives None.
+        """
+        return self.addresses[field].get(address)
+
+    def in_actual_values(self, address: int) -> Optional[Any]:
+        """The object with its value at address in the instantaneous values"""
+        return self.at("address_in_actual_values", address)
+
+    def in_archive(self, archive: constants.Archive, address: int) -> Optional[Any]:
+        """The object with its value at address in the records of archive"""
+        return self.at(ADDRESS_ATTRIBUTES[archive], address)
+
+    def at_bit_order(self, bit_order: int) -> Optional[Any]:
+        """The binary object or error flag at bit_order in the instantaneous values"""
+        return self.at("bit_order_in_actual_values", bit_order) or self.at(
+            "error_bit_order_in_actual_values", bit_order
+        )
+
+    def reference(self, item: Any, field: str) -> Optional[Any]:
+        """The object referenced by a `number_of_*` field of item"""
+        number = getattr(item, field, None)
+        if number is None:
+            return None
+        return self.by_number(number, referenced_types(item, field))
+
+    def references(self, item: Any) -> Dict[str, Any]:
+        """All objects item refers to, by field"""
+        out = dict()
+        for field in REFERENCES:
+            referenced = self.reference(item, field)
+            if referenced is not None:
+                out[field] = referenced
+        return out
+
+    def primary_counter(self, item: Any) -> Optional[Any]:
+        return self.reference(item, "number_of_primary_counter")
+
+    def standard_counter(self, item: Any) -> Optional[Any]:
+        return self.reference(item, "number_of_standard_counter") or self.reference(
+            item, "number_of_base_counter"
+        )
+
+    def conversion(self, item: Any) -> Optional[Any]:
+        return self.reference(item, "number_of_conversion") or self.reference(
+            item, "number_of_conversion_coefficient"
+        )
+
+    def primary_quantity(self, item: Any) -> Optional[Any]:
+        return self.reference(item, "number_of_primary_quantity")
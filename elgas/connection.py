@@ -100,6 +100,8 @@ class ElgasConnection:
     # TODO: Validate that there is an encryption key id if there is an encryption key.
 
     buffer: bytearray = attr.ib(init=False, factory=bytearray)
+    # Position in buffer up to which we know there is no end char.
+    scan_position: int = attr.ib(init=False, default=0)
     elgas_state: state.ElgasState = attr.ib(factory=state.ElgasState)
     cipher_context: Optional[security.CipherContext] = attr.ib(
         default=attr.Factory(lambda self: create_cipher_context(self), takes_self=True)
@@ -140,8 +142,8 @@ class ElgasConnection:
 
     def receive_data(self, data: bytes):
         """
-        Add data into the receive buffer. Also deescape the data so correct data is in
-        the buffer.
+        Add data into the receive buffer. Data is kept escaped in the buffer and
+        characters are returned per frame when it is complete.
         After this you could call next_event
         """
         if data:
@@ -157,41 +159,86 @@ class ElgasConnection:
                 f"Added data to connection buffer", data=data, total_buffer=self.buffer
             )
 
-    def next_event(self) -> bytes:
+    def next_frame(self) -> Optional[bytes]:
+        """
+        Take the next complete frame out of the buffer and return it with the
+        characters returned. Returns None if there is no complete frame yet.
 
-        if not self.buffer:
-            LOG.debug("Buffer empty. Need more data")
-            return state.NEED_DATA
+        Only the newly received data is searched for the end char. Since the end char
+        is always escaped inside a frame the first one found ends the frame and any
+        bytes after it are kept for the next frame.
+        """
+        while True:
+            end_char_index = self.buffer.find(b"\x0d", self.scan_position)
+            if end_char_index == -1:
+                self.scan_position = len(self.buffer)
+                return None
+
+            end = end_char_index + 1
+            escaped_frame = bytes(self.buffer[:end])
+            del self.buffer[:end]
+            self.scan_position = 0
+
+            if escaped_frame == b"\x0d":
+                LOG.info("Ignoring end char received outside of a frame")
+                continue
+
+            try:
+                frame = utils.return_characters(escaped_frame)
+            except ValueError as e:
+                raise exceptions.FramingError(str(e)) from e
+
+            if len(frame) < 16 or frame[0] != 0x02:
+                raise exceptions.FramingError(
+                    f"Received data is not a frame: {escaped_frame!r}"
+                )
+            length = int.from_bytes(frame[4:6], "little")
+            if length != len(frame) - 1:  # STX is not counted
+                raise exceptions.FramingError(
+                    f"Length field says {length} bytes but frame has "
+                    f"{len(frame) - 1}: {escaped_frame!r}"
+                )
+            return frame
 
-        # do we have an end char?
-        try:
-            end_char_index = self.buffer.index(b"\x0d") + 1
-        except ValueError:
-            # No end char in buffer and we need more data.
-            LOG.debug("No end char in data. Need more data")
+    def next_event(self):
+        """
+        Return the next PDU from the received data or NEED_DATA if a complete frame
+        has not been received yet.
+        Raises FramingError if the received data is not a valid frame. The invalid
+        frame is removed from the buffer so following frames can still be read.
+        """
+        frame = self.next_frame()
+        if frame is None:
+            LOG.debug("No complete frame in buffer. Need more data")
             return state.NEED_DATA
 
-        data = self.buffer[:end_char_index]
         try:
-            response = frames.ResponseFactory.from_bytes(utils.return_characters(data))
+            response = frames.ResponseFactory.from_bytes(frame)
+        except ValueError as e:
+            raise exceptions.FramingError(str(e)) from e
 
-            LOG.debug("Received ELGAS response", response=response)
+        LOG.debug("Received ELGAS response", response=response)
 
-            if isinstance(response, frames.EncryptedResponse):
-                response.data = self.cipher_context.decrypt(response.data)
-                LOG.debug("Decrypted ELGAS response", decrypted=response)
+        if isinstance(response, frames.EncryptedResponse):
+            response.data = self.cipher_context.decrypt(response.data)
+            LOG.debug("Decrypted ELGAS response", decrypted=response)
 
-            if len(response.data) == 1:
-                raise_error(response.data)
-
-        except ValueError:
-            LOG.debug("Cannot interpret data as frame. Need more data")
-            return state.NEED_DATA
+        if len(response.data) == 1:
+            raise_error(response.data)
 
         pdu = ResponsePduFactory.from_response(response)
         LOG.info("Received PDU", pdu=pdu)
         self.elgas_state.process_event(pdu)
 
-        self.buffer = bytearray()  # clear buffer
-
         return pdu
+
+    def events(self) -> Iterator:
+        """
+        Drain all complete frames in the buffer, for when one read returned
+        several frames.
+        """
+        while True:
+            event = self.next_event()
+            if event is state.NEED_DATA:
+                return
+            yield event
@@ -0,0 +1,250 @@
+"""
+Binary files for storing the parameters of devices.
+
+A container holds the raw SCADA parameter data as read from the device together
+with an index of the objects in it and the parameter CRC, serial number and service
+version of the device, so a file can be identified and used without parsing it.
+Files are opened with `mmap` and objects are decoded from the mapped data when they
+are used, so a service can open the files of a whole fleet at start with little
+memory.
+
+Layout, all integers little endian:
+
+    header      40 bytes, see `HEADER`
+    index       8 bytes per object: object type, length and offset in the data
+    data        the SCADA parameter data
+
+The offsets of the index and data are in the header so later versions can add to
+the header. Files of a newer version than `VERSION` are rejected.
+"""
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from typing import *
+
+import attr
+import structlog
+
+from elgas.parameters.enumerations import ParameterObjectType
+from elgas.parser import ParameterSet, index_objects
+
+LOG = structlog.get_logger("container")
+
+MAGIC = b"ELGP"
+VERSION = 1
+
+# magic, version, flags, parameter CRC, service version, serial number, number of
+# objects, index offset, data offset, data length, CRC-32 of the data, reserved
+HEADER = struct.Struct("<4sHHHHIIIIII4x")
+INDEX_ENTRY = struct.Struct("<BxHI")
+
+
+class ContainerError(ValueError):
+    """Data is not a valid parameter container"""
+
+
+def pack(data: bytes) -> bytes:
+    """
+    A container for the SCADA parameter data. The device fields are taken from the
+    system parameters in it.
+    """
+    data = bytes(data)
+    entries = index_objects(memoryview(data))
+    system_parameters = ParameterSet(data, entries).system_parameters
+    if system_parameters is None:
+        parameter_crc = service_version = serial_number = 0
+    else:
+        parameter_crc = system_parameters.parameter_crc
+        service_version = system_parameters.service_version
+        serial_number = system_parameters.serial_number
+
+    index_offset = HEADER.size
+    data_offset = index_offset + INDEX_ENTRY.size * len(entries)
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        0,
+        parameter_crc,
+        service_version,
+        serial_number,
+        len(entries),
+        index_offset,
+        data_offset,
+        len(data),
+        zlib.crc32(data),
+    )
+    index = b"".join(
+        INDEX_ENTRY.pack(object_type, length, offset)
+        for object_type, offset, length in entries
+    )
+    return header + index + data
+
+
+def write(path: Union[str, Path], data: bytes) -> None:
+    """
+    Write a container for the SCADA parameter data to path. It is written to a
+    temporary file first so that readers never see half a file.
+    """
+    path = Path(path)
+    fd, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(pack(data))
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    LOG.debug("Stored parameter container", path=str(path))
+
+
+@attr.s(auto_attribs=True)
+class ParameterContainer:
+    """
+    Parameters of a device read from a container.
+
+    Opening a container only reads the header. `parameters` is a `ParameterSet` over
+    the data in the container, made from the index when it is first used, and its
+    objects are decoded on first access. When the container is opened from a file
+    the data is mapped, not read, and the container should be closed when it is not
+    used anymore. Objects already decoded stay valid after closing, objects that are
+    not decoded yet can not be decoded anymore.
+
+    The container never hands out views of the mapped file, `data` is a copy, so
+    closing it does not fail because some of the data is still in use.
+    """
+
+    version: int
+    parameter_crc: int
+    service_version: int
+    serial_number: int
+    _buffer: Union[bytes, mmap.mmap] = attr.ib(repr=False)
+    _index: Tuple[int, int] = attr.ib(repr=False)
+    _data: Tuple[int, int] = attr.ib(repr=False)
+    _data_crc: int = attr.ib(repr=False)
+    _parameters: Optional[ParameterSet] = attr.ib(init=False, default=None, repr=False)
+
+    @classmethod
+    def from_bytes(
+        cls, buffer: Union[bytes, mmap.mmap], verify: bool = False
+    ) -> "ParameterContainer":
+        """
+        Read the header of the container in buffer. The data is not copied. With
+        verify the index and the CRC-32 of the data are checked, which reads all of
+        the container.
+        """
+        if len(buffer) < HEADER.size:
+            raise ContainerError(f"{len(buffer)} bytes is too short for a container")
+        return cls._from_header(bytes(buffer[: HEADER.size]), buffer, verify)
+
+    @classmethod
+    def open(cls, path: Union[str, Path], verify: bool = False) -> "ParameterContainer":
+        """
+        Map the container file at path. The header is read from the file, so no
+        page of the mapping is touched until the parameters are used.
+        """
+        with open(path, "rb") as file:
+            header = os.pread(file.fileno(), HEADER.size, 0)
+            if len(header) < HEADER.size:
+                raise ContainerError(f"{path} is too short for a container")
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls._from_header(header, mapped, verify)
+        except BaseException:
+            mapped.close()
+            raise
+
+    @classmethod
+    def _from_header(
+        cls, header: bytes, buffer: Union[bytes, mmap.mmap], verify: bool
+    ) -> "ParameterContainer":
+        (
+            magic,
+            version,
+            _flags,
+            parameter_crc,
+            service_version,
+            serial_number,
+            count,
+            index_offset,
+            data_offset,
+            data_length,
+            data_crc,
+        ) = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ContainerError(f"Not a parameter container, magic is {magic!r}")
+        if version > VERSION:
+            raise ContainerError(
+                f"Container version {version} is newer than the supported {VERSION}"
+            )
+        index_end = index_offset + INDEX_ENTRY.size * count
+        if index_end > len(buffer) or data_offset + data_length > len(buffer):
+            raise ContainerError("Container is truncated")
+
+        container = cls(
+            version=version,
+            parameter_crc=parameter_crc,
+            service_version=service_version,
+            serial_number=serial_number,
+            buffer=buffer,
+            index=(index_offset, index_end),
+            data=(data_offset, data_offset + data_length),
+            data_crc=data_crc,
+        )
+        if verify:
+            container.verify()
+        return container
+
+    @property
+    def data(self) -> bytes:
+        """
+        A copy of the SCADA parameter data. It can not be read after the container
+        is closed.
+        """
+        start, end = self._data
+        return self._buffer[start:end]
+
+    @property
+    def parameters(self) -> ParameterSet:
+        if self._parameters is None:
+            start, end = self._index
+            data_start, data_end = self._data
+            entries = list()
+            for object_type, length, offset in INDEX_ENTRY.iter_unpack(
+                self._buffer[start:end]
+            ):
+                if offset + length > data_end - data_start:
+                    raise ContainerError(
+                        f"Index entry at offset {offset} is outside the parameter "
+                        f"data"
+                    )
+                entries.append((ParameterObjectType(object_type), offset, length))
+            # The set gets the only view of the data, released again on close.
+            view = memoryview(self._buffer)[data_start:data_end]
+            self._parameters = ParameterSet(view, entries)
+        return self._parameters
+
+    def verify(self) -> None:
+        """Check the index and the CRC-32 of the data"""
+        start, end = self._data
+        with memoryview(self._buffer) as buffer, buffer[start:end] as data:
+            crc = zlib.crc32(data)
+        if crc != self._data_crc:
+            raise ContainerError("CRC-32 of the parameter data does not match")
+        self.parameters
+
+    def close(self) -> None:
+        """Unmap the file of the container"""
+        if not isinstance(self._buffer, mmap.mmap):
+            return
+        if self._parameters is not None:
+            self._parameters.release()
+        self._buffer.close()
+
+    def __enter__(self) -> "ParameterContainer":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
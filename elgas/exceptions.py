@@ -48,3 +48,11 @@ class WrongEncryptionKeysError(ElgasError):
 class WriteError(ElgasError):
     # Bit 7
     """Write Error"""
+
+
+class FramingError(CommunicationError):
+    """Received data could not be interpreted as an ELGAS frame"""
+
+
+class DeadlineExceeded(CommunicationError):
+    """An operation did not finish before its deadline"""
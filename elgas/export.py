@@ -0,0 +1,248 @@
+"""
+Export of archive records to Apache Arrow and Parquet.
+
+Each archive response is turned into one Arrow record batch with
+`ArchiveRecordPlan.to_columns`, without going through a Python object per record. The
+schema is made from the plan: a column for the record id and the timestamp, one per
+value, scaled with the digit of its parameter object, and a boolean column per flag.
+The unit, digit, offset and decimals of each value and the bit order of each flag are
+kept in the field metadata.
+
+Batches can be written to an Arrow IPC stream with `write_stream`, or to Parquet
+files partitioned by device, archive and day with `ParquetArchiveWriter`. Both take
+the responses one at a time, like `iter_archive_pages` and `ArchiveSync.run` give
+them, so a download is never held in memory as a whole.
+
+pyarrow is an optional dependency, install it with `pip install elgas[arrow]`.
+"""
+import os
+import re
+from datetime import date, timedelta
+from pathlib import Path
+from typing import *
+
+import attr
+import structlog
+
+from elgas import application
+from elgas.archive import ArchiveRecordPlan, ValueChannel
+
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    np = pa = pq = None
+
+LOG = structlog.get_logger("export")
+
+SECONDS_PER_DAY = 24 * 60 * 60
+# Timestamps in Arrow count from the Unix epoch.
+EPOCH = date(1970, 1, 1)
+
+RAW_TYPES = {
+    "H": "uint16",
+    "I": "uint32",
+    "Q": "uint64",
+    "f": "float32",
+    "d": "float64",
+}
+
+
+def _require_arrow():
+    if pa is None:
+        raise ImportError(
+            "pyarrow is needed to export archive records. "
+            "Install it with `pip install elgas[arrow]`"
+        )
+
+
+def channel_metadata(channel: ValueChannel) -> Dict[str, str]:
+    """Description of a value, from its parameter object"""
+    parameter = channel.parameter
+    metadata = {
+        "id": str(getattr(parameter, "id", "")),
+        "unit": getattr(parameter, "unit", None) or "",
+        "address": str(channel.address),
+        "format": channel.format,
+    }
+    if channel.is_scaled:
+        metadata["digit"] = repr(channel.digit)
+        metadata["offset"] = repr(channel.value_offset)
+    decimals = getattr(parameter, "decimals", None)
+    if decimals is not None:
+        metadata["decimals"] = str(decimals)
+    return metadata
+
+
+def arrow_schema(
+    plan: ArchiveRecordPlan, metadata: Optional[Mapping[str, str]] = None
+) -> "pa.Schema":
+    """
+    The schema of the record batches of plan. Extra metadata, like the device, is
+    added to the schema metadata.
+    """
+    _require_arrow()
+    fields = [
+        pa.field("record_id", pa.uint32(), nullable=False),
+        pa.field("timestamp", pa.timestamp("s"), nullable=False),
+    ]
+    for channel in plan.channels:
+        if channel.is_scaled:
+            value_type = pa.float64()
+        else:
+            value_type = pa.type_for_alias(RAW_TYPES[channel.format])
+        fields.append(
+            pa.field(
+                channel.name,
+                value_type,
+                nullable=False,
+                metadata=channel_metadata(channel),
+            )
+        )
+    for flag in plan.flag_channels:
+        fields.append(
+            pa.field(
+                flag.name,
+                pa.bool_(),
+                nullable=False,
+                metadata={"bit_order": str(flag.bit_order)},
+            )
+        )
+    schema_metadata = {
+        "archive": plan.archive.name,
+        "record_length": str(plan.record_length),
+    }
+    schema_metadata.update(metadata or {})
+    return pa.schema(fields, metadata=schema_metadata)
+
+
+def to_record_batch(
+    plan: ArchiveRecordPlan,
+    page: application.ReadArchiveResponse,
+    schema: Optional["pa.Schema"] = None,
+) -> "pa.RecordBatch":
+    """The records of an archive response as a record batch"""
+    schema = schema or arrow_schema(plan)
+    columns = plan.to_columns(page.data)
+    count = len(columns["timestamp"])
+    record_ids = np.arange(
+        page.oldest_record_id, page.oldest_record_id + count, dtype=np.uint32
+    )
+    arrays = [record_ids, columns["timestamp"]] + [
+        columns[channel.name] for channel in plan.channels + plan.flag_channels
+    ]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(array, type=field.type) for array, field in zip(arrays, schema)],
+        schema=schema,
+    )
+
+
+def write_stream(
+    sink: Any,
+    plan: ArchiveRecordPlan,
+    pages: Iterable[application.ReadArchiveResponse],
+    metadata: Optional[Mapping[str, str]] = None,
+) -> int:
+    """
+    Write the archive responses as an Arrow IPC stream to sink, a path or file
+    object. Returns the number of records written.
+    """
+    schema = arrow_schema(plan, metadata)
+    written = 0
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for page in pages:
+            batch = to_record_batch(plan, page, schema)
+            writer.write_batch(batch)
+            written += batch.num_rows
+    return written
+
+
+def partition_value(value: str) -> str:
+    """value made safe to use in a directory name"""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", value)
+
+
+@attr.s(auto_attribs=True)
+class ParquetArchiveWriter:
+    """
+    Writes archive responses of a device to Parquet files partitioned by device,
+    archive and day, like
+
+        root/device=1234/archive=DATA/day=2022-01-01/<first record id>.parquet
+
+    so the directory can be read with `pyarrow.dataset` using hive partitioning. Files
+    are named after their first record id, exporting the same records again
+    replaces them. A file is written to a temporary file and moved in place when it
+    is finished, which is when records of a later day arrive or the writer is closed.
+    """
+
+    root: Path = attr.ib(converter=Path)
+    device: str
+    plan: ArchiveRecordPlan
+    compression: str = attr.ib(default="zstd")
+    schema: "pa.Schema" = attr.ib(init=False, repr=False)
+    _writers: Dict[int, Tuple["pq.ParquetWriter", Path, Path]] = attr.ib(
+        init=False, factory=dict, repr=False
+    )
+    written: int = attr.ib(init=False, default=0)
+
+    def __attrs_post_init__(self):
+        self.schema = arrow_schema(self.plan, {"device": self.device})
+
+    def directory(self, day: date) -> Path:
+        """Directory of the records stored on day"""
+        return (
+            self.root
+            / f"device={partition_value(self.device)}"
+            / f"archive={self.plan.archive.name}"
+            / f"day={day.isoformat()}"
+        )
+
+    def write(self, page: application.ReadArchiveResponse) -> None:
+        """Add the records of an archive response"""
+        batch = to_record_batch(self.plan, page, self.schema)
+        if not batch.num_rows:
+            return
+        days = batch.column("timestamp").to_numpy().astype("int64") // SECONDS_PER_DAY
+        starts = np.flatnonzero(np.diff(days)) + 1
+        bounds = np.concatenate(([0], starts, [len(days)]))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            day = int(days[start])
+            part = batch.slice(int(start), int(end - start))
+            self._writer(day, page.oldest_record_id + int(start)).write_batch(part)
+        self.written += batch.num_rows
+        # Records come in order, so the days before the last one are complete.
+        last = int(days[-1])
+        for day in [day for day in self._writers if day < last]:
+            self._finish(day)
+
+    def _writer(self, day: int, first_record_id: int) -> "pq.ParquetWriter":
+        found = self._writers.get(day)
+        if found is not None:
+            return found[0]
+        directory = self.directory(EPOCH + timedelta(days=day))
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{first_record_id}.parquet"
+        temporary = path.with_suffix(".parquet.tmp")
+        writer = pq.ParquetWriter(
+            str(temporary), self.schema, compression=self.compression
+        )
+        self._writers[day] = (writer, temporary, path)
+        return writer
+
+    def _finish(self, day: int) -> None:
+        writer, temporary, path = self._writers.pop(day)
+        writer.close()
+        os.replace(temporary, path)
+        LOG.debug("Wrote archive records", path=str(path))
+
+    def close(self) -> None:
+        for day in list(self._writers):
+            self._finish(day)
+
+    def __enter__(self) -> "ParquetArchiveWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,334 @@
+"""
+Polling of many devices at the same time with `AsyncElgasClient`.
+
+A `FleetPoller` runs the same jobs on every target. Each target gets one session:
+connect, run the jobs in order and disconnect. Sessions run concurrently, limited in
+total and per host, since a GPRS gateway or terminal server often only handles a few
+connections at a time. Results are delivered as they are ready, through an async
+iterator or a callback.
+"""
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import *
+
+import attr
+import structlog
+
+from elgas import async_client, async_transport, cache, exceptions
+from elgas.archive import ArchiveRecordPlan
+
+LOG = structlog.get_logger("fleet")
+
+
+@attr.s(auto_attribs=True)
+class DeviceTarget:
+    """
+    A device to poll. `name` identifies the device in results and is used as device
+    id in the parameter cache.
+    """
+
+    name: str
+    host: str
+    port: int
+    password: str = attr.ib(repr=False)
+    password_id: int
+    encryption_key: Optional[bytes] = attr.ib(default=None, repr=False)
+    encryption_key_id: Optional[int] = attr.ib(default=None)
+    destination_address_1: int = attr.ib(default=0)
+    destination_address_2: int = attr.ib(default=0)
+
+    def make_transport(self) -> async_transport.AsyncElgasTransport:
+        return async_transport.AsyncTcpTransport(host=self.host, port=self.port)
+
+    def make_client(
+        self,
+        timeout: Optional[float],
+        configuration_cache: Optional[cache.ConfigurationCache] = None,
+    ) -> async_client.AsyncElgasClient:
+        client = async_client.AsyncElgasClient(
+            transport=self.make_transport(),
+            password=self.password,
+            password_id=self.password_id,
+            encryption_key=self.encryption_key,
+            encryption_key_id=self.encryption_key_id,
+            device_id=self.name,
+            configuration_cache=configuration_cache,
+            timeout=timeout,
+        )
+        client.elgas_connection.destination_address_1 = self.destination_address_1
+        client.elgas_connection.destination_address_2 = self.destination_address_2
+        return client
+
+
+class Job(Protocol):
+    """
+    Something to do in a session, like reading the time or an archive. `run` is
+    called with the connected client and its return value is the value of the
+    `JobResult`. `name` identifies the job in logs and in `DeadlineExceeded` errors,
+    and `timeout` is the deadline for the whole job, None uses the timeout of the
+    poller.
+    """
+
+    name: ClassVar[str]
+    timeout: Optional[float]
+
+    async def run(self, client: async_client.AsyncElgasClient) -> Any:
+        ...
+
+
+@attr.s(auto_attribs=True)
+class ReadInstantaneousValues:
+    name: ClassVar[str] = "read_instantaneous_values"
+
+    timeout: Optional[float] = attr.ib(default=None, kw_only=True)
+
+    async def run(self, client):
+        return await client.read_instantaneous_values()
+
+
+@attr.s(auto_attribs=True)
+class ReadTime:
+    name: ClassVar[str] = "read_time"
+
+    timeout: Optional[float] = attr.ib(default=None, kw_only=True)
+
+    async def run(self, client):
+        return await client.read_time()
+
+
+@attr.s(auto_attribs=True)
+class ReadParameters:
+    name: ClassVar[str] = "read_parameters"
+
+    timeout: Optional[float] = attr.ib(default=None, kw_only=True)
+
+    async def run(self, client):
+        return await client.read_parameters()
+
+
+@attr.s(auto_attribs=True)
+class ReadArchive:
+    """
+    Read the records of an archive between start and end, record ids or timestamps.
+    The result is the list of decoded records.
+    """
+
+    name: ClassVar[str] = "read_archive"
+
+    plan: ArchiveRecordPlan
+    start: Union[int, datetime]
+    end: Optional[Union[int, datetime]] = attr.ib(default=None)
+    amount: int = attr.ib(default=10)
+    timeout: Optional[float] = attr.ib(default=None, kw_only=True)
+
+    async def run(self, client):
+        return [
+            record
+            async for record in client.iter_archive_records(
+                self.plan, self.start, self.end, self.amount
+            )
+        ]
+
+
+@attr.s(auto_attribs=True)
+class JobResult:
+    target: DeviceTarget
+    job: Job
+    value: Any = attr.ib(default=None)
+    error: Optional[BaseException] = attr.ib(default=None)
+    started: float = attr.ib(default=0.0, repr=False)
+    finished: float = attr.ib(default=0.0, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+@attr.s(auto_attribs=True)
+class FleetSummary:
+    devices: int = 0
+    devices_failed: int = 0
+    jobs: int = 0
+    jobs_failed: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    started: float = attr.ib(factory=time.monotonic, repr=False)
+    finished: Optional[float] = attr.ib(default=None, repr=False)
+
+    @property
+    def duration(self) -> float:
+        end = time.monotonic() if self.finished is None else self.finished
+        return end - self.started
+
+    @property
+    def devices_per_minute(self) -> float:
+        return self.devices / self.duration * 60 if self.duration else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        total = self.bytes_sent + self.bytes_received
+        return total / self.duration if self.duration else 0.0
+
+
+@attr.s(auto_attribs=True)
+class FleetPoller:
+    """
+    Runs jobs on many devices with at most `max_sessions` sessions at a time, and at
+    most `max_sessions_per_host` to the same host.
+
+    `timeout` is the deadline of each job that does not have its own. When a job fails
+    because of the communication, the session is ended and the rest of the jobs of the
+    device fail with the same error. Other errors, like a wrong password or data that
+    could not be parsed, only fail the job. If the session fails in any other way the
+    jobs without a result fail with that error.
+    """
+
+    max_sessions: int = attr.ib(default=100)
+    max_sessions_per_host: int = attr.ib(default=1)
+    timeout: Optional[float] = attr.ib(default=60)
+    configuration_cache: Optional[cache.ConfigurationCache] = attr.ib(default=None)
+    summary: FleetSummary = attr.ib(init=False, factory=FleetSummary)
+
+    async def results(
+        self, targets: Iterable[DeviceTarget], jobs: Sequence[Job]
+    ) -> AsyncIterator[JobResult]:
+        """
+        Poll the targets and yield the results as they are ready. If the iteration
+        is stopped early the sessions still running are cancelled.
+        """
+        self.summary = FleetSummary()
+        queue: asyncio.Queue = asyncio.Queue()
+        sessions = asyncio.Semaphore(self.max_sessions)
+        host_sessions: DefaultDict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.max_sessions_per_host)
+        )
+        tasks = [
+            asyncio.ensure_future(
+                self._session(target, jobs, queue, sessions, host_sessions[target.host])
+            )
+            for target in targets
+        ]
+        try:
+            for _ in range(len(tasks) * len(jobs)):
+                yield await queue.get()
+            # Let the sessions disconnect and count their bytes.
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.summary.finished = time.monotonic()
+            LOG.info(
+                "Fleet poll finished",
+                devices=self.summary.devices,
+                devices_failed=self.summary.devices_failed,
+                devices_per_minute=round(self.summary.devices_per_minute, 1),
+                bytes_per_second=round(self.summary.bytes_per_second),
+            )
+
+    async def run(
+        self,
+        targets: Iterable[DeviceTarget],
+        jobs: Sequence[Job],
+        callback: Callable[[JobResult], Any],
+    ) -> FleetSummary:
+        """
+        Poll the targets and call the callback with each result.
+        """
+        async for result in self.results(targets, jobs):
+            callback(result)
+        return self.summary
+
+    async def _session(
+        self,
+        target: DeviceTarget,
+        jobs: Sequence[Job],
+        queue: asyncio.Queue,
+        sessions: asyncio.Semaphore,
+        host_sessions: asyncio.Semaphore,
+    ):
+        # The host is waited for first so a session does not hold one of the total
+        # sessions while waiting for its host.
+        async with host_sessions, sessions:
+            LOG.info("Starting session", target=target.name)
+            remaining = list(jobs)
+            client: Optional[async_client.AsyncElgasClient] = None
+            session_error: Optional[BaseException] = None
+            try:
+                client = target.make_client(self.timeout, self.configuration_cache)
+                session_error = await self._run_jobs(client, target, remaining, queue)
+            except Exception as e:
+                # Every job must get a result, or `results` waits for it forever.
+                LOG.exception("Session failed", target=target.name)
+                session_error = e
+                for job in remaining:
+                    now = time.monotonic()
+                    self._put_result(
+                        queue,
+                        JobResult(
+                            target=target, job=job, error=e, started=now, finished=now
+                        ),
+                    )
+                remaining.clear()
+
+            if client is not None:
+                try:
+                    await client.disconnect()
+                except exceptions.CommunicationError:
+                    LOG.info("Error when disconnecting", target=target.name)
+                except Exception:
+                    LOG.exception("Error when disconnecting", target=target.name)
+                transport = client.transport
+                self.summary.bytes_sent += getattr(transport, "bytes_sent", 0)
+                self.summary.bytes_received += getattr(transport, "bytes_received", 0)
+            self.summary.devices += 1
+            self.summary.devices_failed += session_error is not None
+            LOG.info("Session finished", target=target.name, error=session_error)
+
+    async def _run_jobs(
+        self,
+        client: async_client.AsyncElgasClient,
+        target: DeviceTarget,
+        remaining: List[Job],
+        queue: asyncio.Queue,
+    ) -> Optional[BaseException]:
+        """
+        Connect and run the jobs, removing each job from remaining when its result
+        is queued. Returns the communication error that ended the session, if any.
+        """
+        session_error: Optional[BaseException] = None
+        try:
+            await client.connect()
+        except exceptions.CommunicationError as e:
+            session_error = e
+
+        while remaining:
+            job = remaining[0]
+            result = JobResult(target=target, job=job, started=time.monotonic())
+            if session_error is not None:
+                result.error = session_error
+            else:
+                try:
+                    result.value = await client.with_deadline(
+                        job.run(client), job.timeout, job.name
+                    )
+                except exceptions.CommunicationError as e:
+                    result.error = session_error = e
+                except Exception as e:
+                    LOG.exception("Job failed", target=target.name, job=job.name)
+                    result.error = e
+            result.finished = time.monotonic()
+            self._put_result(queue, result)
+            remaining.pop(0)
+        return session_error
+
+    def _put_result(self, queue: asyncio.Queue, result: JobResult) -> None:
+        self.summary.jobs += 1
+        self.summary.jobs_failed += not result.ok
+        queue.put_nowait(result)
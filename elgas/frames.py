@@ -33,15 +33,12 @@ class Request:
         out.append(self.TYPE)
         out.append(self.service)
         out.extend(self.length.to_bytes(2, "little"))
-        out.extend(self.destination_address_1.to_bytes(2, "big"))
+        out.extend(self.destination_address_1.to_bytes(2, "little"))
         out.append(self.destination_address_2)
-        out.extend(self.source_address_1.to_bytes(2, "big"))
+        out.extend(self.source_address_1.to_bytes(2, "little"))
         out.append(self.source_address_2)
         out.extend(self.data)
-        redundancy_source = out[1:]
-        out.append(utils.calculate_lrc(redundancy_source))
-        out.append(utils.calculate_checksum(redundancy_source))
-        out.append(utils.calculate_drc(redundancy_source))
+        out.extend(utils.calculate_redundancy(memoryview(out)[1:]))
         out.append(0x0D)
 
         return bytes(out)
@@ -63,23 +60,26 @@ class Request:
         source_address_1 = int.from_bytes(in_bytes[9:11], "little")
         source_address_2 = int.from_bytes(in_bytes[11:12], "little")
         data = in_bytes[12:-4]
-        redundancy_source = bytearray(in_bytes[1:-4])
+        (
+            calculated_lrc,
+            calculated_checksum,
+            calculated_drc,
+        ) = utils.calculate_redundancy(memoryview(in_bytes)[1:-4])
         lrc = in_bytes[-4]
-        calculated_lrc = utils.calculate_lrc(redundancy_source)
         if lrc != calculated_lrc:
             raise ValueError(
                 f"Incorrect LRC. Got {lrc!r}, should be {calculated_lrc!r}"
             )
         checksum = in_bytes[-3]
-        calculated_checksum = utils.calculate_checksum(redundancy_source)
         if checksum != calculated_checksum:
             raise ValueError(
                 f"Incorrect CHECKSUM. Got {checksum!r}, should be {calculated_checksum!r}"
             )
         drc = in_bytes[-2]
-        calculated_drc = utils.calculate_drc(redundancy_source)
         if drc != calculated_drc:
-            raise ValueError(f"Incorrect DRC. Got {drc!r}, should be {drc!r}")
+            raise ValueError(
+                f"Incorrect DRC. Got {drc!r}, should be {calculated_drc!r}"
+            )
 
         return cls(
             service=service,
@@ -120,10 +120,7 @@ class Response:
         out.extend(self.source_address_1.to_bytes(2, "little"))
         out.append(self.source_address_2)
         out.extend(self.data)
-        redundancy_source = out[1:]
-        out.append(utils.calculate_lrc(redundancy_source))
-        out.append(utils.calculate_checksum(redundancy_source))
-        out.append(utils.calculate_drc(redundancy_source))
+        out.extend(utils.calculate_redundancy(memoryview(out)[1:]))
         out.append(0x0D)
 
         return bytes(out)
@@ -145,23 +142,26 @@ class Response:
         source_address_1 = int.from_bytes(in_bytes[9:11], "little")
         source_address_2 = int.from_bytes(in_bytes[11:12], "little")
         data = in_bytes[12:-4]
-        redundancy_source = bytearray(in_bytes[1:-4])
+        (
+            calculated_lrc,
+            calculated_checksum,
+            calculated_drc,
+        ) = utils.calculate_redundancy(memoryview(in_bytes)[1:-4])
         lrc = in_bytes[-4]
-        calculated_lrc = utils.calculate_lrc(redundancy_source)
         if lrc != calculated_lrc:
             raise ValueError(
                 f"Incorrect LRC. Got {lrc!r}, should be {calculated_lrc!r}"
             )
         checksum = in_bytes[-3]
-        calculated_checksum = utils.calculate_checksum(redundancy_source)
         if checksum != calculated_checksum:
             raise ValueError(
                 f"Incorrect CHECKSUM. Got {checksum!r}, should be {calculated_checksum!r}"
             )
         drc = in_bytes[-2]
-        calculated_drc = utils.calculate_drc(redundancy_source)
         if drc != calculated_drc:
-            raise ValueError(f"Incorrect DRC. Got {drc!r}, should be {drc!r}")
+            raise ValueError(
+                f"Incorrect DRC. Got {drc!r}, should be {calculated_drc!r}"
+            )
 
         return cls(
             service=service,
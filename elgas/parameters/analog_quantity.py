@@ -1,4 +1,3 @@
-import struct
 from typing import ClassVar, Optional
 
 import attr
@@ -6,13 +5,23 @@ import marshmallow
 from marshmallow import post_load
 
 from elgas.parameters.enumerations import ParameterObjectType
-from elgas.utils import pop_many, pretty_text
+from elgas.parameters.layout import (
+    Layout,
+    archive_addresses,
+    f32,
+    optional,
+    text,
+    u8,
+    u16,
+    u32,
+)
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class AnalogQuantity:
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.ANALOG_MEASURAND
     value_length: ClassVar[int] = 2
+    value_format: ClassVar[str] = "H"
 
     number: int
     id: int
@@ -40,68 +49,40 @@ class AnalogQuantity:
     samples_in_fast_archive: int
     decimals: Optional[int]
 
+    layout: ClassVar[Layout] = Layout(
+        [
+            archive_addresses(),
+            u8(
+                "bit_control",
+                bits={
+                    "in_data_archive": 0b00000001,
+                    "in_daily_archive": 0b00000010,
+                    "in_monthly_archive": 0b00000100,
+                    "is_metrological_quantity": 0b00010000,
+                    "in_fast_archive_1": 0b00100000,
+                    "in_fast_archvie_2": 0b01000000,
+                },
+            ),
+            text("name", 23),
+            text("unit", 8),
+            f32("digit", decimals=7),
+            f32("offset"),
+            f32("lower_limit_measuring_range", decimals=7),
+            f32("upper_limit_measuring_range"),
+            u32("serial_number_transducer"),
+            u16("error_bit_order_in_actual_values"),
+            u16("error_bit_order_in_binary_archive"),
+            u16("error_bit_order_in_data_archive"),
+            u16("address_in_daily_archive_record"),
+            u16("address_in_monthly_archive_record"),
+            u8("samples_in_fast_archive"),
+            optional(u8("decimals")),
+        ]
+    )
+
     @classmethod
     def from_bytes(cls, in_data: bytes):
-        data = bytearray(in_data)
-        number = int.from_bytes(pop_many(data, 2), "little")
-        id = int.from_bytes(pop_many(data, 2), "little")
-        address_in_actual_values = int.from_bytes(pop_many(data, 2), "little")
-        address_in_data_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        bit_control = data.pop(0)
-        in_data_archive = bool(bit_control & 0b00000001)
-        in_daily_archive = bool(bit_control & 0b00000010)
-        in_monthly_archive = bool(bit_control & 0b00000100)
-        is_metrological_quantity = bool(bit_control & 0b00010000)
-        in_fast_archive_1 = bool(bit_control & 0b00100000)
-        in_fast_archvie_2 = bool(bit_control & 0b01000000)
-        name = pretty_text(pop_many(data, 23))
-        unit = pretty_text(pop_many(data, 8))
-        digit = round(struct.unpack("<f", pop_many(data, 4))[0], 7)
-        offset = struct.unpack("<f", pop_many(data, 4))[0]
-        lower_limit_measuring_range = round(
-            struct.unpack("<f", pop_many(data, 4))[0], 7
-        )
-        upper_limit_measuring_range = struct.unpack("<f", pop_many(data, 4))[0]
-        serial_number_transducer = int.from_bytes(pop_many(data, 4), "little")
-        error_bit_order_in_actual_values = int.from_bytes(pop_many(data, 2), "little")
-        error_bit_order_in_binary_archive = int.from_bytes(pop_many(data, 2), "little")
-        error_bit_order_in_data_archive = int.from_bytes(pop_many(data, 2), "little")
-        address_in_daily_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        address_in_monthly_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        samples_in_fast_archive = data.pop(0)
-
-        if data:
-            decimals = data.pop(0)
-        else:
-            decimals = None
-
-        return cls(
-            number=number,
-            id=id,
-            address_in_actual_values=address_in_actual_values,
-            address_in_data_archive_record=address_in_data_archive_record,
-            bit_control=bit_control,
-            in_data_archive=in_data_archive,
-            in_daily_archive=in_daily_archive,
-            in_monthly_archive=in_monthly_archive,
-            is_metrological_quantity=is_metrological_quantity,
-            in_fast_archive_1=in_fast_archive_1,
-            in_fast_archvie_2=in_fast_archvie_2,
-            name=name,
-            unit=unit,
-            digit=digit,
-            offset=offset,
-            lower_limit_measuring_range=lower_limit_measuring_range,
-            upper_limit_measuring_range=upper_limit_measuring_range,
-            serial_number_transducer=serial_number_transducer,
-            error_bit_order_in_actual_values=error_bit_order_in_actual_values,
-            error_bit_order_in_binary_archive=error_bit_order_in_binary_archive,
-            error_bit_order_in_data_archive=error_bit_order_in_data_archive,
-            address_in_daily_archive_record=address_in_daily_archive_record,
-            address_in_monthly_archive_record=address_in_monthly_archive_record,
-            samples_in_fast_archive=samples_in_fast_archive,
-            decimals=decimals,
-        )
+        return cls.layout.decode(cls, in_data)
 
 
 class AnalogQuantitySchema(marshmallow.Schema):
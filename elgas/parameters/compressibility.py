@@ -5,13 +5,14 @@ import marshmallow
 from marshmallow import post_load
 
 from elgas.parameters.enumerations import ParameterObjectType
-from elgas.utils import pop_many, pretty_text
+from elgas.parameters.layout import Layout, archive_addresses, optional, text, u8, u16
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class Compressibility:
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.COMPRESSIBILITY
     value_length: ClassVar[int] = 4
+    value_format: ClassVar[str] = "f"
 
     number: int
     id: int
@@ -28,57 +29,47 @@ class Compressibility:
     address_in_monthly_archive_record: int
     decimals: Optional[int]
 
+    layout: ClassVar[Layout] = Layout(
+        [
+            archive_addresses(),
+            u8(
+                "bit_control",
+                bits={
+                    "in_data_archive": 0b00000001,
+                    "in_daily_archive": 0b00000010,
+                    "in_monthly_archive": 0b00000100,
+                    "is_metrological_quantity": 0b00010000,
+                },
+            ),
+            text("name", 23),
+            u8("number_of_conversion_coefficient"),
+            u16("address_in_daily_archive_record"),
+            u16("address_in_monthly_archive_record"),
+            optional(u8("decimals")),
+        ]
+    )
+
     @classmethod
     def from_bytes(cls, in_data: bytes):
-        data = bytearray(in_data)
-        number = int.from_bytes(pop_many(data, 2), "little")
-        id = int.from_bytes(pop_many(data, 2), "little")
-        address_in_actual_values = int.from_bytes(pop_many(data, 2), "little")
-        address_in_data_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        bit_control = data.pop(0)
-        in_data_archive = bool(bit_control & 0b00000001)
-        in_daily_archive = bool(bit_control & 0b00000010)
-        in_monthly_archive = bool(bit_control & 0b00000100)
-        is_metrological_quantity = bool(bit_control & 0b00010000)
-        name = pretty_text(pop_many(data, 23))
-        number_of_conversion_coefficient = data.pop(0)
-
-        address_in_daily_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        address_in_monthly_archive_record = int.from_bytes(pop_many(data, 2), "little")
-
-        if data:
-            decimals = data.pop(0)
-        else:
-            decimals = None
-
-        return cls(
-            number=number,
-            id=id,
-            address_in_actual_values=address_in_actual_values,
-            address_in_data_archive_record=address_in_data_archive_record,
-            bit_control=bit_control,
-            in_data_archive=in_data_archive,
-            in_daily_archive=in_daily_archive,
-            in_monthly_archive=in_monthly_archive,
-            is_metrological_quantity=is_metrological_quantity,
-            name=name,
-            number_of_conversion_coefficient=number_of_conversion_coefficient,
-            address_in_daily_archive_record=address_in_daily_archive_record,
-            address_in_monthly_archive_record=address_in_monthly_archive_record,
-            decimals=decimals,
-        )
+        return cls.layout.decode(cls, in_data)
 
 
 class CompressibilityZ(Compressibility):
+    __slots__ = ()
+
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.COMPRESSIBILITY_Z
     value_length: ClassVar[int] = 4
+    value_format: ClassVar[str] = "f"
 
 
 class CompressibilityZBase(Compressibility):
+    __slots__ = ()
+
     object_type: ClassVar[
         ParameterObjectType
     ] = ParameterObjectType.COMPRESSIBILITY_Z_BASE
     value_length: ClassVar[int] = 4
+    value_format: ClassVar[str] = "f"
 
 
 class CompressibilitySchema(marshmallow.Schema):
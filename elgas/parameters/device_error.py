@@ -5,10 +5,10 @@ import marshmallow
 from marshmallow import post_load
 
 from elgas.parameters.enumerations import ParameterObjectType
-from elgas.utils import pop_many, pretty_text
+from elgas.parameters.layout import Layout, bit_orders, text, text_logs, u8, u16
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class DeviceError:
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.DEVICE_ERROR
 
@@ -29,44 +29,28 @@ class DeviceError:
     text_log_0: Optional[str]
     text_log_1: Optional[str]
 
+    layout: ClassVar[Layout] = Layout(
+        [
+            bit_orders(),
+            u8(
+                "bit_control",
+                bits={
+                    "in_binary_archive": 0b00000001,
+                    "in_data_archive": 0b00000010,
+                },
+            ),
+            text("name", 23),
+            u16("error_bit_order_in_actual_values"),
+            u16("error_bit_order_in_binary_archive_record"),
+            u16("error_bit_order_in_data_archive_record"),
+            text_logs(),
+        ],
+        strict=True,
+    )
+
     @classmethod
     def from_bytes(cls, in_data: bytes):
-        data = bytearray(in_data)
-        number = int.from_bytes(pop_many(data, 2), "little")
-        id = int.from_bytes(pop_many(data, 2), "little")
-        bit_order_in_actual_values = int.from_bytes(pop_many(data, 2), "little")
-        bit_order_in_data_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        bit_order_in_binary_archive_record = int.from_bytes(pop_many(data, 2), "little")
-
-        bit_control = data.pop(0)
-        in_binary_archive = bool(bit_control & 0b00000001)
-        in_data_archive = bool(bit_control & 0b00000010)
-        name = pretty_text(pop_many(data, 23))
-        if data:
-            action_during_change = data.pop(0)
-            text_log_0 = pretty_text(pop_many(data, 13))
-            text_log_1 = pretty_text(pop_many(data, 13))
-        else:
-            action_during_change = None
-            text_log_0 = None
-            text_log_1 = None
-
-        assert not data
-
-        return cls(
-            number=number,
-            id=id,
-            bit_order_in_actual_values=bit_order_in_actual_values,
-            bit_order_in_data_archive_record=bit_order_in_data_archive_record,
-            bit_order_in_binary_archive_record=bit_order_in_binary_archive_record,
-            bit_control=bit_control,
-            in_binary_archive=in_binary_archive,
-            in_data_archive=in_data_archive,
-            name=name,
-            action_during_change=action_during_change,
-            text_log_0=text_log_0,
-            text_log_1=text_log_1,
-        )
+        return cls.layout.decode(cls, in_data)
 
 
 class DeviceErrorSchema(marshmallow.Schema):
@@ -5,12 +5,14 @@ import marshmallow
 from marshmallow import post_load
 
 from elgas.parameters.enumerations import ParameterObjectType
-from elgas.utils import pop_many, pretty_text
+from elgas.parameters.layout import Layout, archive_addresses, text, u8, u16, u32
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class Diagnostics:
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.DIAGNOSTICS
+    value_length: ClassVar[int] = 8
+    value_format: ClassVar[str] = "Q"  # two 32 bit status words
 
     number: int
     id: int
@@ -33,51 +35,34 @@ class Diagnostics:
     mask_2_of_calling_to_dispatching: int
     action_during_change: int
 
+    layout: ClassVar[Layout] = Layout(
+        [
+            archive_addresses(),
+            u8(
+                "bit_control",
+                bits={
+                    "in_data_archive": 0b00000001,
+                    "in_daily_archive": 0b00000010,
+                    "in_monthly_archive": 0b00000100,
+                    "in_factory_archive": 0b00001000,
+                },
+            ),
+            text("name", 23),
+            u16("address_in_daily_archive_record"),
+            u16("address_in_monthly_archive_record"),
+            u32("mask_1_of_status_archive"),
+            u32("mask_2_of_status_archive"),
+            u32("mask_1_of_alarm"),
+            u32("mask_2_of_alarm"),
+            u32("mask_1_of_calling_to_dispatching"),
+            u32("mask_2_of_calling_to_dispatching"),
+            u8("action_during_change"),
+        ]
+    )
+
     @classmethod
     def from_bytes(cls, in_data: bytes):
-        data = bytearray(in_data)
-        number = int.from_bytes(pop_many(data, 2), "little")
-        id = int.from_bytes(pop_many(data, 2), "little")
-        address_in_actual_values = int.from_bytes(pop_many(data, 2), "little")
-        address_in_data_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        bit_control = data.pop(0)
-        in_data_archive = bool(bit_control & 0b00000001)
-        in_daily_archive = bool(bit_control & 0b00000010)
-        in_monthly_archive = bool(bit_control & 0b00000100)
-        in_factory_archive = bool(bit_control & 0b00001000)
-        name = pretty_text(pop_many(data, 23))
-
-        address_in_daily_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        address_in_monthly_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        mask_1_of_status_archive = int.from_bytes(pop_many(data, 4), "little")
-        mask_2_of_status_archive = int.from_bytes(pop_many(data, 4), "little")
-        mask_1_of_alarm = int.from_bytes(pop_many(data, 4), "little")
-        mask_2_of_alarm = int.from_bytes(pop_many(data, 4), "little")
-        mask_1_of_calling_to_dispatching = int.from_bytes(pop_many(data, 4), "little")
-        mask_2_of_calling_to_dispatching = int.from_bytes(pop_many(data, 4), "little")
-        action_during_change = data.pop(0)
-
-        return cls(
-            number=number,
-            id=id,
-            address_in_actual_values=address_in_actual_values,
-            address_in_data_archive_record=address_in_data_archive_record,
-            bit_control=bit_control,
-            in_data_archive=in_data_archive,
-            in_daily_archive=in_daily_archive,
-            in_monthly_archive=in_monthly_archive,
-            in_factory_archive=in_factory_archive,
-            name=name,
-            address_in_daily_archive_record=address_in_daily_archive_record,
-            address_in_monthly_archive_record=address_in_monthly_archive_record,
-            mask_1_of_status_archive=mask_1_of_status_archive,
-            mask_2_of_status_archive=mask_2_of_status_archive,
-            mask_1_of_alarm=mask_1_of_alarm,
-            mask_2_of_alarm=mask_2_of_alarm,
-            mask_1_of_calling_to_dispatching=mask_1_of_calling_to_dispatching,
-            mask_2_of_calling_to_dispatching=mask_2_of_calling_to_dispatching,
-            action_during_change=action_during_change,
-        )
+        return cls.layout.decode(cls, in_data)
 
 
 class DiagnosticsSchema(marshmallow.Schema):
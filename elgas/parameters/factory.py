@@ -121,9 +121,14 @@ class ParameterFactory:
     }
 
     @staticmethod
-    def from_bytes(object_type: ParameterObjectType, in_data: bytes):
+    def from_bytes(object_type: ParameterObjectType, in_data: bytes, offset: int = 0):
+        """
+        Decode the parameter object of `object_type` from the data starting at
+        `offset`. The data is not copied so a memoryview over a whole parameter
+        read can be passed in.
+        """
         klass = ParameterFactory.object_map[object_type]
-        return klass.from_bytes(in_data)
+        return klass.layout.decode(klass, in_data, offset)
 
 
 @attr.s(auto_attribs=True)
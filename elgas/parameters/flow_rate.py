@@ -5,13 +5,14 @@ import marshmallow
 from marshmallow import post_load
 
 from elgas.parameters.enumerations import ParameterObjectType
-from elgas.utils import pop_many, pretty_text
+from elgas.parameters.layout import Layout, archive_addresses, optional, text, u8, u16
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class FlowRate:
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.FLOW_RATE
     value_length: ClassVar[int] = 4
+    value_format: ClassVar[str] = "f"
 
     number: int
     id: int
@@ -32,51 +33,32 @@ class FlowRate:
     address_in_monthly_archive_record: int
     decimals: Optional[int]
 
+    layout: ClassVar[Layout] = Layout(
+        [
+            archive_addresses(),
+            u8(
+                "bit_control",
+                bits={
+                    "in_data_archive": 0b00000001,
+                    "in_daily_archive": 0b00000010,
+                    "in_monthly_archive": 0b00000100,
+                    "is_metrological_quantity": 0b00010000,
+                },
+            ),
+            text("name", 23),
+            text("unit", 8),
+            u16("error_bit_order_in_actual_values"),
+            u16("error_bit_order_in_binary_archive"),
+            u16("error_bit_order_in_data_archive"),
+            u16("address_in_daily_archive_record"),
+            u16("address_in_monthly_archive_record"),
+            optional(u8("decimals")),
+        ]
+    )
+
     @classmethod
     def from_bytes(cls, in_data: bytes):
-        data = bytearray(in_data)
-        number = int.from_bytes(pop_many(data, 2), "little")
-        id = int.from_bytes(pop_many(data, 2), "little")
-        address_in_actual_values = int.from_bytes(pop_many(data, 2), "little")
-        address_in_data_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        bit_control = data.pop(0)
-        in_data_archive = bool(bit_control & 0b00000001)
-        in_daily_archive = bool(bit_control & 0b00000010)
-        in_monthly_archive = bool(bit_control & 0b00000100)
-        is_metrological_quantity = bool(bit_control & 0b00010000)
-        name = pretty_text(pop_many(data, 23))
-        unit = pretty_text(pop_many(data, 8))
-
-        error_bit_order_in_actual_values = int.from_bytes(pop_many(data, 2), "little")
-        error_bit_order_in_binary_archive = int.from_bytes(pop_many(data, 2), "little")
-        error_bit_order_in_data_archive = int.from_bytes(pop_many(data, 2), "little")
-        address_in_daily_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        address_in_monthly_archive_record = int.from_bytes(pop_many(data, 2), "little")
-
-        if data:
-            decimals = data.pop(0)
-        else:
-            decimals = None
-
-        return cls(
-            number=number,
-            id=id,
-            address_in_actual_values=address_in_actual_values,
-            address_in_data_archive_record=address_in_data_archive_record,
-            bit_control=bit_control,
-            in_data_archive=in_data_archive,
-            in_daily_archive=in_daily_archive,
-            in_monthly_archive=in_monthly_archive,
-            is_metrological_quantity=is_metrological_quantity,
-            name=name,
-            unit=unit,
-            error_bit_order_in_actual_values=error_bit_order_in_actual_values,
-            error_bit_order_in_binary_archive=error_bit_order_in_binary_archive,
-            error_bit_order_in_data_archive=error_bit_order_in_data_archive,
-            address_in_daily_archive_record=address_in_daily_archive_record,
-            address_in_monthly_archive_record=address_in_monthly_archive_record,
-            decimals=decimals,
-        )
+        return cls.layout.decode(cls, in_data)
 
 
 class FlowRateSchema(marshmallow.Schema):
@@ -105,10 +87,11 @@ class FlowRateSchema(marshmallow.Schema):
         return FlowRate(**data)
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class StandardFlowRate:
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.STANDARD_FLOW_RATE
     value_length: ClassVar[int] = 4
+    value_format: ClassVar[str] = "f"
 
     number: int
     id: int
@@ -127,49 +110,31 @@ class StandardFlowRate:
     address_in_monthly_archive_record: int
     decimals: Optional[int]
 
+    layout: ClassVar[Layout] = Layout(
+        [
+            archive_addresses(),
+            u8(
+                "bit_control",
+                bits={
+                    "in_data_archive": 0b00000001,
+                    "in_daily_archive": 0b00000010,
+                    "in_monthly_archive": 0b00000100,
+                    "is_metrological_quantity": 0b00010000,
+                },
+            ),
+            text("name", 23),
+            text("unit", 8),
+            u8("number_of_primary_flow_rate"),
+            u8("number_of_conversion"),
+            u16("address_in_daily_archive_record"),
+            u16("address_in_monthly_archive_record"),
+            optional(u8("decimals")),
+        ]
+    )
+
     @classmethod
     def from_bytes(cls, in_data: bytes):
-        data = bytearray(in_data)
-        number = int.from_bytes(pop_many(data, 2), "little")
-        id = int.from_bytes(pop_many(data, 2), "little")
-        address_in_actual_values = int.from_bytes(pop_many(data, 2), "little")
-        address_in_data_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        bit_control = data.pop(0)
-        in_data_archive = bool(bit_control & 0b00000001)
-        in_daily_archive = bool(bit_control & 0b00000010)
-        in_monthly_archive = bool(bit_control & 0b00000100)
-        is_metrological_quantity = bool(bit_control & 0b00010000)
-        name = pretty_text(pop_many(data, 23))
-        unit = pretty_text(pop_many(data, 8))
-
-        number_of_primary_flow_rate = data.pop(0)
-        number_of_conversion = data.pop(0)
-        address_in_daily_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        address_in_monthly_archive_record = int.from_bytes(pop_many(data, 2), "little")
-
-        if data:
-            decimals = data.pop(0)
-        else:
-            decimals = None
-
-        return cls(
-            number=number,
-            id=id,
-            address_in_actual_values=address_in_actual_values,
-            address_in_data_archive_record=address_in_data_archive_record,
-            bit_control=bit_control,
-            in_data_archive=in_data_archive,
-            in_daily_archive=in_daily_archive,
-            in_monthly_archive=in_monthly_archive,
-            is_metrological_quantity=is_metrological_quantity,
-            name=name,
-            unit=unit,
-            number_of_primary_flow_rate=number_of_primary_flow_rate,
-            number_of_conversion=number_of_conversion,
-            address_in_daily_archive_record=address_in_daily_archive_record,
-            address_in_monthly_archive_record=address_in_monthly_archive_record,
-            decimals=decimals,
-        )
+        return cls.layout.decode(cls, in_data)
 
 
 class StandardFlowRateSchema(marshmallow.Schema):
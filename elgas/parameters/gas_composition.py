@@ -1,13 +1,13 @@
-import struct
+from typing import ClassVar
 
 import attr
 import marshmallow
 from marshmallow import post_load
 
-from elgas.utils import pop_many
+from elgas.parameters.layout import Layout, f32
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class GasComposition:
     co2: float
     n2: float
@@ -33,35 +33,37 @@ class GasComposition:
     c9h20: float
     c10h22: float
 
+    layout: ClassVar[Layout] = Layout(
+        [
+            f32("co2"),
+            f32("n2"),
+            f32("combustion_heat"),
+            f32("relative_density"),
+            f32("h2"),
+            f32("h2s"),
+            f32("he"),
+            f32("h2o"),
+            f32("o2"),
+            f32("ar"),
+            f32("co"),
+            f32("c1h4"),
+            f32("c2h6"),
+            f32("c3h8"),
+            f32("ic4h10"),
+            f32("nc4h10"),
+            f32("ic5h12"),
+            f32("nc5h12"),
+            f32("c6h14"),
+            f32("c7h16"),
+            f32("c8h18"),
+            f32("c9h20"),
+            f32("c10h22"),
+        ]
+    )
+
     @classmethod
     def from_bytes(cls, in_data: bytes):
-        data = bytearray(in_data)
-
-        return cls(
-            co2=struct.unpack("<f", pop_many(data, 4))[0],
-            n2=struct.unpack("<f", pop_many(data, 4))[0],
-            combustion_heat=struct.unpack("<f", pop_many(data, 4))[0],
-            relative_density=struct.unpack("<f", pop_many(data, 4))[0],
-            h2=struct.unpack("<f", pop_many(data, 4))[0],
-            h2s=struct.unpack("<f", pop_many(data, 4))[0],
-            he=struct.unpack("<f", pop_many(data, 4))[0],
-            h2o=struct.unpack("<f", pop_many(data, 4))[0],
-            o2=struct.unpack("<f", pop_many(data, 4))[0],
-            ar=struct.unpack("<f", pop_many(data, 4))[0],
-            co=struct.unpack("<f", pop_many(data, 4))[0],
-            c1h4=struct.unpack("<f", pop_many(data, 4))[0],
-            c2h6=struct.unpack("<f", pop_many(data, 4))[0],
-            c3h8=struct.unpack("<f", pop_many(data, 4))[0],
-            ic4h10=struct.unpack("<f", pop_many(data, 4))[0],
-            nc4h10=struct.unpack("<f", pop_many(data, 4))[0],
-            ic5h12=struct.unpack("<f", pop_many(data, 4))[0],
-            nc5h12=struct.unpack("<f", pop_many(data, 4))[0],
-            c6h14=struct.unpack("<f", pop_many(data, 4))[0],
-            c7h16=struct.unpack("<f", pop_many(data, 4))[0],
-            c8h18=struct.unpack("<f", pop_many(data, 4))[0],
-            c9h20=struct.unpack("<f", pop_many(data, 4))[0],
-            c10h22=struct.unpack("<f", pop_many(data, 4))[0],
-        )
+        return cls.layout.decode(cls, in_data)
 
 
 class GasCompositionSchema(marshmallow.Schema):
@@ -0,0 +1,443 @@
+"""
+Declarative description of how parameter objects are laid out in the SCADA
+parameter data.
+
+Each parameter class describes its fields once as a `Layout`. The first time an
+object of a certain payload length is decoded the layout is compiled into a single
+`struct.Struct` and a generated function that converts the unpacked values
+(texts, bit flags, nested objects) and creates the object. Later objects of the same
+length are decoded with one `unpack_from` call.
+
+Decoded objects are immutable, so the values many devices have in common are shared:
+texts are interned and equal nested objects (like the gas composition) are the same
+instance.
+"""
+import struct
+import sys
+import weakref
+from typing import *
+
+import attr
+
+from elgas.utils import parse_ip_address, pretty_text
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Field:
+    """
+    A field that is unpacked by a single struct format.
+
+    `expression` is a template for the python expression that converts the unpacked
+    value, `{}` is replaced with the variable holding it.
+    `bits` extracts more attributes from an integer field. A mask gives a bool, a
+    tuple of (mask, shift) gives an int.
+    Fields without name are read (for their bits) but not set on the object.
+    """
+
+    name: Optional[str]
+    format: str
+    expression: str = attr.ib(default="{}")
+    bits: Mapping[str, Union[int, Tuple[int, int]]] = attr.ib(factory=dict)
+
+    @property
+    def size(self) -> int:
+        return struct.calcsize("<" + self.format)
+
+    @property
+    def count(self) -> int:
+        return 1
+
+    @property
+    def names(self) -> List[str]:
+        names = [self.name] if self.name else []
+        return names + list(self.bits)
+
+    def assignments(self, variables: Iterator[str]) -> List[Tuple[str, str]]:
+        variable = next(variables)
+        out = list()
+        if self.name:
+            out.append((self.name, self.expression.format(variable)))
+        for name, mask in self.bits.items():
+            if isinstance(mask, tuple):
+                mask, shift = mask
+                out.append((name, f"(({variable} & {mask}) >> {shift})"))
+            else:
+                out.append((name, f"bool({variable} & {mask})"))
+        return out
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Skip:
+    """Bytes that are not used"""
+
+    size: int
+
+    @property
+    def format(self) -> str:
+        return f"{self.size}x"
+
+    @property
+    def count(self) -> int:
+        return 0
+
+    @property
+    def names(self) -> List[str]:
+        return []
+
+    def assignments(self, variables: Iterator[str]) -> List[Tuple[str, str]]:
+        return []
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Nested:
+    """
+    An object that is embedded in the parent. Its layout is flattened into the
+    parent struct so it does not need a separate unpack.
+    """
+
+    name: str
+    klass: Type
+
+    @property
+    def layout(self) -> "Layout":
+        return self.klass.layout
+
+    @property
+    def format(self) -> str:
+        return "".join(field.format for field in self.layout.fields)
+
+    @property
+    def size(self) -> int:
+        return struct.calcsize("<" + self.format)
+
+    @property
+    def count(self) -> int:
+        return sum(field.count for field in self.layout.fields)
+
+    @property
+    def names(self) -> List[str]:
+        return [self.name]
+
+    def assignments(self, variables: Iterator[str]) -> List[Tuple[str, str]]:
+        arguments = list()
+        for field in self.layout.fields:
+            arguments.extend(field.assignments(variables))
+        joined = ", ".join(f"{name}={expression}" for name, expression in arguments)
+        return [(self.name, f"share({self.klass.__name__}({joined}))")]
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class OptionalGroup:
+    """
+    A group of trailing fields that only some firmware versions send. Either all of
+    them are present or none of them, in which case they are set to None.
+    """
+
+    fields: Tuple[Any, ...]
+
+    @property
+    def format(self) -> str:
+        return "".join(field.format for field in self.fields)
+
+    @property
+    def size(self) -> int:
+        return struct.calcsize("<" + self.format)
+
+    @property
+    def names(self) -> List[str]:
+        return [name for field in self.fields for name in field.names]
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Repeated:
+    """
+    A field repeated as many times as given by an earlier field.
+    """
+
+    name: str
+    count: str
+    field: Field
+
+
+def u8(name: Optional[str], bits: Optional[Mapping] = None) -> Field:
+    return Field(name, "B", bits=bits or {})
+
+
+def u16(name: Optional[str]) -> Field:
+    return Field(name, "H")
+
+
+def u32(name: Optional[str]) -> Field:
+    return Field(name, "I")
+
+
+def f32(name: str, decimals: Optional[int] = None) -> Field:
+    if decimals is None:
+        return Field(name, "f")
+    return Field(name, "f", expression=f"round({{}}, {decimals})")
+
+
+def f64(name: str) -> Field:
+    return Field(name, "d")
+
+
+def text(name: str, size: int) -> Field:
+    """Fixed width text, cleaned with `pretty_text` and interned"""
+    return Field(name, f"{size}s", expression="intern(pretty_text({}))")
+
+
+def hex_string(name: str, size: int) -> Field:
+    return Field(name, f"{size}s", expression="{}.hex()")
+
+
+def ip_address(name: str) -> Field:
+    return Field(name, "4s", expression="parse_ip_address({})")
+
+
+def skip(size: int) -> Skip:
+    return Skip(size)
+
+
+def nested(name: str, klass: Type) -> Nested:
+    return Nested(name, klass)
+
+
+def optional(*fields) -> OptionalGroup:
+    return OptionalGroup(fields)
+
+
+def repeated(name: str, count: str, field: Field) -> Repeated:
+    return Repeated(name, count, field)
+
+
+# Helpers for the header that most of the value objects start with.
+
+
+def archive_addresses() -> List[Field]:
+    return [
+        u16("number"),
+        u16("id"),
+        u16("address_in_actual_values"),
+        u16("address_in_data_archive_record"),
+    ]
+
+
+def bit_orders() -> List[Field]:
+    return [
+        u16("number"),
+        u16("id"),
+        u16("bit_order_in_actual_values"),
+        u16("bit_order_in_data_archive_record"),
+        u16("bit_order_in_binary_archive_record"),
+    ]
+
+
+def text_logs() -> OptionalGroup:
+    return optional(
+        u8("action_during_change"),
+        text("text_log_0", 13),
+        text("text_log_1", 13),
+    )
+
+
+# Nested objects that are in use, so equal ones decoded later are the same instance.
+_shared: "weakref.WeakValueDictionary[Tuple, Any]" = weakref.WeakValueDictionary()
+
+
+def share(item: Any) -> Any:
+    """An object equal to item that is shared with the other objects using it"""
+    key = (type(item), attr.astuple(item, recurse=False))
+    try:
+        return _shared.setdefault(key, item)
+    except TypeError:  # unhashable values, like lists
+        return item
+
+
+class LayoutError(ValueError):
+    """Data does not fit the layout of the parameter object"""
+
+
+@attr.s(auto_attribs=True)
+class Layout:
+    """
+    Layout of a parameter object.
+
+    When `strict` is set, data left after the last field is an error, otherwise it is
+    ignored.
+    """
+
+    fields: List[Any] = attr.ib(converter=list)
+    strict: bool = attr.ib(default=False)
+    _decoders: Dict[Tuple[Type, int], Callable] = attr.ib(
+        init=False, factory=dict, repr=False
+    )
+
+    def __attrs_post_init__(self):
+        flat = list()
+        for field in self.fields:
+            if isinstance(field, (list, tuple)):
+                flat.extend(field)
+            else:
+                flat.append(field)
+        self.fields = flat
+
+    @property
+    def repeated_index(self) -> Optional[int]:
+        for index, field in enumerate(self.fields):
+            if isinstance(field, Repeated):
+                return index
+        return None
+
+    def field_position(self, name: str) -> Optional[Tuple[int, str]]:
+        """
+        Offset in the payload and struct format of a field, if it is at the same
+        place in every object. Fields after an optional group or a repeated field
+        move with the data and give None.
+        """
+        position = 0
+        for field in self.fields:
+            if isinstance(field, (OptionalGroup, Repeated)):
+                return None
+            if isinstance(field, Field) and field.name == name:
+                return position, field.format
+            position += field.size
+        return None
+
+    def decode(self, klass: Type, data: bytes, offset: int = 0):
+        """
+        Decode an object of `klass` from data starting at offset.
+        """
+        length = len(data) - offset
+        decoder = self._decoders.get((klass, length))
+        if decoder is None:
+            decoder = self._compile(klass, length)
+            self._decoders[(klass, length)] = decoder
+        return decoder(klass, data, offset)
+
+    def _compile(self, klass: Type, length: int) -> Callable:
+        repeated_index = self.repeated_index
+        if repeated_index is not None:
+            return self._compile_repeated(repeated_index)
+        return compile_fields(self.fields, length, self.strict, klass)
+
+    def _compile_repeated(self, index: int) -> Callable:
+        """
+        The position of the fields after a repeated field depends on the data, so only
+        the fixed part before it is compiled here. The rest is compiled as a layout of
+        its own per remaining length.
+        """
+        head = Layout(self.fields[:index], strict=False)
+        head_size = struct.calcsize("<" + "".join(f.format for f in head.fields))
+        repeated_field: Repeated = self.fields[index]
+        item = Layout([attr.evolve(repeated_field.field, name="value")])
+        item_size = repeated_field.field.size
+        tail = Layout(self.fields[index + 1 :], strict=self.strict)
+
+        def decoder(klass, data, offset):
+            values = head.decode(dict, data[: offset + head_size], offset)
+            position = offset + head_size
+            items = list()
+            for _ in range(values[repeated_field.count]):
+                end = position + item_size
+                items.append(item.decode(dict, data[:end], position)["value"])
+                position = end
+            values[repeated_field.name] = items
+            values.update(tail.decode(dict, data, position))
+            return klass(**values)
+
+        return decoder
+
+
+def slot_setters(klass: Optional[Type], names: Iterable[str]) -> Optional[List[Any]]:
+    """
+    The slot descriptors of the fields of klass, if it is a slotted attrs class that
+    is fully created by setting names, else None.
+
+    Setting the slots of a new instance directly skips the `__init__` of frozen
+    classes, which sets every attribute through `object.__setattr__`.
+    """
+    if klass is None or not attr.has(klass) or "__slots__" not in klass.__dict__:
+        return None
+    if hasattr(klass, "__attrs_post_init__"):
+        return None
+    names = list(names)
+    fields = attr.fields_dict(klass)
+    if set(names) != set(fields):
+        return None
+    if any(field.converter or field.validator for field in fields.values()):
+        return None
+    return [getattr(klass, name) for name in names]
+
+
+def compile_fields(
+    fields: List[Any], length: int, strict: bool, klass: Optional[Type] = None
+) -> Callable:
+    """
+    Make a decoder for the fields when the payload is `length` bytes.
+
+    Optional groups are included when there is data left for them. The result is a
+    function taking (klass, data, offset) that unpacks all fields with one precompiled
+    struct and calls klass with the converted values. When klass is given and is a
+    slotted attrs class, the decoder only works for it and sets the slots of a new
+    instance instead of calling klass.
+    """
+    included = list()
+    defaults = list()
+    remaining = length
+    for field in fields:
+        if isinstance(field, OptionalGroup):
+            if remaining <= 0:
+                defaults.extend(field.names)
+                continue
+            if remaining < field.size:
+                raise LayoutError(
+                    f"Optional fields {field.names} need {field.size} bytes, "
+                    f"only {remaining} left"
+                )
+            included.extend(field.fields)
+            remaining -= field.size
+        else:
+            included.append(field)
+            remaining -= struct.calcsize("<" + field.format)
+
+    if remaining < 0:
+        raise LayoutError(f"Data of length {length} is too short for layout")
+    if remaining > 0 and strict:
+        raise LayoutError(f"{remaining} bytes left after decoding all fields")
+
+    unpacker = struct.Struct("<" + "".join(field.format for field in included))
+    variables = [f"v{index}" for index in range(sum(f.count for f in included))]
+    variable_iterator = iter(variables)
+    arguments = list()
+    for field in included:
+        arguments.extend(field.assignments(variable_iterator))
+    arguments.extend((name, "None") for name in defaults)
+
+    unpacked = "".join(f"{variable}, " for variable in variables)
+    namespace = {
+        "unpack_from": unpacker.unpack_from,
+        "pretty_text": pretty_text,
+        "intern": sys.intern,
+        "share": share,
+        "parse_ip_address": parse_ip_address,
+        "new": object.__new__,
+    }
+    setters = slot_setters(klass, [name for name, _ in arguments])
+    if setters is None:
+        joined = ", ".join(f"{name}={expression}" for name, expression in arguments)
+        body = f"    return klass({joined})\n"
+    else:
+        lines = ["    item = new(klass)\n"]
+        for index, ((_, expression), setter) in enumerate(zip(arguments, setters)):
+            namespace[f"set_{index}"] = setter.__set__
+            lines.append(f"    set_{index}(item, {expression})\n")
+        body = "".join(lines) + "    return item\n"
+    source = (
+        f"def decode(klass, data, offset):\n"
+        f"    {unpacked or '_'} = unpack_from(data, offset)\n" + body
+    )
+    for field in included:
+        if isinstance(field, Nested):
+            namespace[field.klass.__name__] = field.klass
+    exec(compile(source, f"<layout {length}>", "exec"), namespace)
+    return namespace["decode"]
@@ -4,10 +4,10 @@ import attr
 import marshmallow
 
 from elgas.parameters.enumerations import ParameterObjectType
-from elgas.utils import parse_ip_address, pop_many, pretty_text
+from elgas.parameters.layout import Layout, hex_string, ip_address, text, u8, u16
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class Modem:
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.MODEM
 
@@ -34,60 +34,37 @@ class Modem:
     pin: str
     owner_sim_number: Optional[str]
 
+    layout: ClassVar[Layout] = Layout(
+        [
+            u8("number"),
+            u8("bit_control_0"),
+            text("title", 7),
+            u8("modem_type"),
+            text("initialization", 32),
+            text("call_to_dispatching", 32),
+            text("modem_hang_up", 8),
+            text("special_initialization", 80),
+            ip_address("ip_address_for_registration_and_diagnostics"),
+            ip_address("ip_address_for_calling_to_dispatching"),
+            u8("registration_send_period"),
+            u8("authentication_mode"),
+            u16("port_for_registration"),
+            u16("port_for_calling_to_dispatching"),
+            text("sms_call", 32),
+            text("gprs_user_name", 49),
+            hex_string("gprs_password", 33),
+            ip_address("ip_address_for_ping"),
+            u16("ping_period"),
+            text("transition_into_command_mode", 8),
+            hex_string("pin", 9),
+            text("owner_sim_number", 17),
+        ],
+        strict=True,
+    )
+
     @classmethod
     def from_bytes(cls, in_data: bytes):
-        data = bytearray(in_data)
-        number = data.pop(0)
-        bit_control_0 = data.pop(0)
-        title = pretty_text(pop_many(data, 7))
-        modem_type = data.pop(0)
-        initialization = pretty_text(pop_many(data, 32))
-        call_to_dispatching = pretty_text(pop_many(data, 32))
-        modem_hang_up = pretty_text(pop_many(data, 8))
-        special_initialization = pretty_text(pop_many(data, 80))
-        ip_address_for_registration_and_diagnostics = parse_ip_address(
-            pop_many(data, 4)
-        )
-        ip_address_for_calling_to_dispatching = parse_ip_address(pop_many(data, 4))
-        registration_send_period = data.pop(0)
-        authentication_mode = data.pop(0)
-        port_for_registration = int.from_bytes(pop_many(data, 2), "little")
-        port_for_calling_to_dispatching = int.from_bytes(pop_many(data, 2), "little")
-        sms_call = pretty_text(pop_many(data, 32))
-        gprs_user_name = pretty_text(pop_many(data, 49))
-        gprs_password = pop_many(data, 33).hex()
-        ip_address_for_ping = parse_ip_address(pop_many(data, 4))
-        ping_period = int.from_bytes(pop_many(data, 2), "little")
-        transition_into_command_mode = pretty_text(pop_many(data, 8))
-        pin = pop_many(data, 9).hex()
-        owner_sim_number = pretty_text(pop_many(data, 17))
-
-        assert not data  # Should be empty now
-
-        return cls(
-            number=number,
-            bit_control_0=bit_control_0,
-            title=title,
-            modem_type=modem_type,
-            initialization=initialization,
-            call_to_dispatching=call_to_dispatching,
-            modem_hang_up=modem_hang_up,
-            special_initialization=special_initialization,
-            ip_address_for_registration_and_diagnostics=ip_address_for_registration_and_diagnostics,
-            ip_address_for_calling_to_dispatching=ip_address_for_calling_to_dispatching,
-            registration_send_period=registration_send_period,
-            authentication_mode=authentication_mode,
-            port_for_registration=port_for_registration,
-            port_for_calling_to_dispatching=port_for_calling_to_dispatching,
-            sms_call=sms_call,
-            gprs_user_name=gprs_user_name,
-            gprs_password=gprs_password,
-            ip_address_for_ping=ip_address_for_ping,
-            ping_period=ping_period,
-            transition_into_command_mode=transition_into_command_mode,
-            pin=pin,
-            owner_sim_number=owner_sim_number,
-        )
+        return cls.layout.decode(cls, in_data)
 
 
 class ModemSchema(marshmallow.Schema):
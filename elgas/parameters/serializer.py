@@ -0,0 +1,273 @@
+"""
+Fast serialization of parameter objects.
+
+The marshmallow schemas in `ParameterSchemaFactory` define how parameter objects are
+stored, but dumping and loading through them is slower than decoding the parameters
+from the device. A `ParameterSerializer` is compiled from a schema into two generated
+functions that give exactly the same output as the schema.
+
+The generated functions only handle the values the schemas produce themselves, like
+an int for an `Integer` field or a string for a `Float(as_string=True)` field. Any
+other value is passed to the marshmallow field (when dumping) or the whole schema
+(when loading), so conversions and validation errors are the same as before.
+
+Configurations are stored in the format of `UtilitarianConfigurationSchema` and can
+be written as dicts, JSON or msgpack. msgpack is an optional dependency, install it
+with `pip install elgas[msgpack]`.
+"""
+import functools
+import json
+import math
+import sys
+from typing import *
+
+import attr
+import marshmallow
+
+from elgas.parameters.enumerations import ParameterObjectType
+from elgas.parameters.factory import ParameterFactory, ParameterSchemaFactory
+from elgas.parameters.layout import share
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise ImportError(
+            "msgpack is needed to store configurations as msgpack. "
+            "Install it with `pip install elgas[msgpack]`"
+        )
+
+
+class SlowPath(Exception):
+    """Data that the generated loader does not handle, loaded by the schema instead"""
+
+
+def _to_float(value: Any) -> float:
+    """A stored `Float(as_string=True)` value, finite like marshmallow requires"""
+    if value.__class__ is not str:
+        raise SlowPath()
+    number = float(value)
+    if not math.isfinite(number):
+        raise SlowPath()
+    return number
+
+
+def _to_finite(value: Any) -> float:
+    if value.__class__ is not float or not math.isfinite(value):
+        raise SlowPath()
+    return value
+
+
+def _string_list(value: Any) -> List[str]:
+    if value.__class__ is not list:
+        raise SlowPath()
+    for item in value:
+        if item.__class__ is not str:
+            raise SlowPath()
+    return [sys.intern(item) for item in value]
+
+
+@attr.s(auto_attribs=True)
+class ParameterSerializer:
+    """
+    Dumps objects of `klass` and loads them back like `schema`.
+
+    Loading always gives an object of `klass`, also for the schemas that load into a
+    dict.
+    """
+
+    schema: Type[marshmallow.Schema]
+    klass: Type
+    _schema: marshmallow.Schema = attr.ib(init=False, repr=False)
+    _dump: Callable = attr.ib(init=False, repr=False)
+    _load: Callable = attr.ib(init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        self._schema = self.schema()
+        self._dump, self._load = compile_schema(self._schema, self.klass)
+
+    def dump(self, item: Any) -> Dict[str, Any]:
+        return self._dump(item)
+
+    def load(self, data: Mapping[str, Any]) -> Any:
+        try:
+            return self._load(data)
+        except (SlowPath, KeyError, TypeError, ValueError):
+            loaded = self._schema.load(data)
+            if isinstance(loaded, dict):
+                return self.klass(**loaded)
+            return loaded
+
+
+def compile_schema(
+    schema: marshmallow.Schema, klass: Type
+) -> Tuple[Callable, Callable]:
+    """
+    Generate the dump and load functions for the fields of schema.
+    """
+    namespace: Dict[str, Any] = {
+        "klass": klass,
+        "SlowPath": SlowPath,
+        "to_float": _to_float,
+        "to_finite": _to_finite,
+        "string_list": _string_list,
+        "intern": sys.intern,
+        "share": share,
+    }
+    dumped = list()
+    dump_lines = list()
+    load_lines = list()
+    arguments = list()
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        variable = f"v{index}"
+        field_name = f"f{index}"
+        namespace[field_name] = field
+        slow = f"{field_name}.serialize({name!r}, item)"
+        dump_lines.append(f"    {variable} = item.{name}")
+        load_lines.append(f"    {variable} = data[{name!r}]")
+
+        if isinstance(field, marshmallow.fields.Nested):
+            nested_class = attr.fields_dict(klass)[name].type
+            nested_dump, nested_load = compile_schema(field.schema, nested_class)
+            namespace[f"dump_{index}"] = nested_dump
+            namespace[f"load_{index}"] = nested_load
+            dumped.append(
+                f"dump_{index}({variable}) "
+                f"if hasattr({variable}, '__attrs_attrs__') else {slow}"
+            )
+            load_lines.append(f"    {variable} = share(load_{index}({variable}))")
+        elif isinstance(field, marshmallow.fields.List):
+            dumped.append(
+                f"list({variable}) if {variable}.__class__ is list "
+                f"and all(x.__class__ is str for x in {variable}) else {slow}"
+            )
+            load_lines.append(f"    {variable} = string_list({variable})")
+        else:
+            dump_expression, dump_check, load_check, load_expression = _simple_field(
+                field, variable
+            )
+            dumped.append(f"{dump_expression} if {dump_check} else {slow}")
+            if load_check is not None:
+                if field.allow_none:
+                    load_check = f"{load_check} or {variable} is None"
+                load_lines.append(f"    if not ({load_check}): raise SlowPath()")
+            if load_expression != variable:
+                if field.allow_none:
+                    load_expression = (
+                        f"None if {variable} is None else {load_expression}"
+                    )
+                load_lines.append(f"    {variable} = {load_expression}")
+        arguments.append((name, variable))
+
+    entries = ", ".join(
+        f"{name!r}: {expression}" for (name, _), expression in zip(arguments, dumped)
+    )
+    dump_source = (
+        "def dump(item):\n"
+        + "".join(line + "\n" for line in dump_lines)
+        + f"    return {{{entries}}}\n"
+    )
+
+    joined = ", ".join(f"{name}={variable}" for name, variable in arguments)
+    load_source = (
+        "def load(data):\n"
+        f"    if len(data) != {len(arguments)}: raise SlowPath()\n"
+        + "".join(line + "\n" for line in load_lines)
+        + f"    return klass({joined})\n"
+    )
+    exec(compile(dump_source, f"<dump {schema.__class__.__name__}>", "exec"), namespace)
+    exec(compile(load_source, f"<load {schema.__class__.__name__}>", "exec"), namespace)
+    return namespace["dump"], namespace["load"]
+
+
+def _simple_field(
+    field: marshmallow.fields.Field, variable: str
+) -> Tuple[str, str, Optional[str], str]:
+    """
+    (dump expression, dump check, load check, load expression) for a field with a
+    single value. A load check of None means the load expression checks the value.
+    """
+    if isinstance(field, marshmallow.fields.Boolean):
+        check = f"{variable}.__class__ is bool"
+        return variable, check, check, variable
+    if isinstance(field, marshmallow.fields.Integer):
+        check = f"{variable}.__class__ is int"
+        return variable, check, check, variable
+    if isinstance(field, marshmallow.fields.String):
+        check = f"{variable}.__class__ is str"
+        return variable, check, check, f"intern({variable})"
+    if isinstance(field, marshmallow.fields.Float):
+        check = f"{variable}.__class__ is float"
+        if field.as_string:
+            return f"repr({variable})", check, None, f"to_float({variable})"
+        return variable, check, None, f"to_finite({variable})"
+    if isinstance(field, marshmallow.fields.Number):
+        check = f"{variable}.__class__ is float"
+        return variable, check, check, variable
+    raise TypeError(f"Fields of type {type(field).__name__} are not supported")
+
+
+@functools.lru_cache(maxsize=None)
+def serializer_for(object_type: ParameterObjectType) -> ParameterSerializer:
+    return ParameterSerializer(
+        schema=ParameterSchemaFactory.by_parameter_id(object_type),
+        klass=ParameterFactory.object_map[object_type],
+    )
+
+
+def dump(item: Any) -> Dict[str, Any]:
+    """The parameter object as dumped by its schema"""
+    return serializer_for(item.object_type).dump(item)
+
+
+def load(object_type: ParameterObjectType, data: Mapping[str, Any]) -> Any:
+    """A parameter object of object_type from data dumped by its schema"""
+    return serializer_for(ParameterObjectType(object_type)).load(data)
+
+
+def dump_configuration(parameters: Iterable[Any]) -> Dict[str, Any]:
+    """
+    The parameter objects in the format of `UtilitarianConfigurationSchema`.
+    """
+    return {
+        "objects": [
+            {
+                "parameter_type": int(item.object_type),
+                "data": serializer_for(item.object_type).dump(item),
+                "series_name": None,
+            }
+            for item in parameters
+        ]
+    }
+
+
+def load_configuration(data: Mapping[str, Any]) -> List[Any]:
+    """
+    The parameter objects of a configuration from `dump_configuration`.
+    """
+    return [
+        load(stored["parameter_type"], stored["data"]) for stored in data["objects"]
+    ]
+
+
+def to_json(parameters: Iterable[Any]) -> str:
+    """The same JSON as `UtilitarianConfigurationSchema().dumps`"""
+    return json.dumps(dump_configuration(parameters))
+
+
+def from_json(text: Union[str, bytes]) -> List[Any]:
+    return load_configuration(json.loads(text))
+
+
+def to_msgpack(parameters: Iterable[Any]) -> bytes:
+    _require_msgpack()
+    return msgpack.packb(dump_configuration(parameters))
+
+
+def from_msgpack(data: bytes) -> List[Any]:
+    _require_msgpack()
+    return load_configuration(msgpack.unpackb(data))
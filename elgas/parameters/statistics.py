@@ -1,4 +1,3 @@
-import struct
 from typing import ClassVar, Optional
 
 import attr
@@ -6,10 +5,19 @@ import marshmallow
 from marshmallow import post_load
 
 from elgas.parameters.enumerations import ParameterObjectType
-from elgas.utils import pop_many, pretty_text
-
-
-@attr.s(auto_attribs=True)
+from elgas.parameters.layout import (
+    Layout,
+    archive_addresses,
+    f32,
+    f64,
+    optional,
+    text,
+    u8,
+    u16,
+)
+
+
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class AnalogStatistics:
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.ANALOG_STATISTICS
 
@@ -32,52 +40,33 @@ class AnalogStatistics:
     address_in_monthly_archive_record: int
     decimals: Optional[int]
 
+    layout: ClassVar[Layout] = Layout(
+        [
+            archive_addresses(),
+            u8(
+                "bit_control",
+                bits={
+                    "in_data_archive": 0b00000001,
+                    "in_daily_archive": 0b00000010,
+                    "in_monthly_archive": 0b00000100,
+                    "is_metrological_quantity": 0b00010000,
+                },
+            ),
+            text("name", 23),
+            text("unit", 8),
+            f32("digit", decimals=7),
+            f32("offset"),
+            u8("number_of_primary_quantity"),
+            u8("statistics_type"),
+            u16("address_in_daily_archive_record"),
+            u16("address_in_monthly_archive_record"),
+            optional(u8("decimals")),
+        ]
+    )
+
     @classmethod
     def from_bytes(cls, in_data: bytes):
-        data = bytearray(in_data)
-        number = int.from_bytes(pop_many(data, 2), "little")
-        id = int.from_bytes(pop_many(data, 2), "little")
-        address_in_actual_values = int.from_bytes(pop_many(data, 2), "little")
-        address_in_data_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        bit_control = data.pop(0)
-        in_data_archive = bool(bit_control & 0b00000001)
-        in_daily_archive = bool(bit_control & 0b00000010)
-        in_monthly_archive = bool(bit_control & 0b00000100)
-        is_metrological_quantity = bool(bit_control & 0b00010000)
-        name = pretty_text(pop_many(data, 23))
-        unit = pretty_text(pop_many(data, 8))
-        digit = round(struct.unpack("<f", pop_many(data, 4))[0], 7)
-        offset = struct.unpack("<f", pop_many(data, 4))[0]
-        number_of_primary_quantity = data.pop(0)
-        statistics_type = data.pop(0)
-        address_in_daily_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        address_in_monthly_archive_record = int.from_bytes(pop_many(data, 2), "little")
-
-        if data:
-            decimals = data.pop(0)
-        else:
-            decimals = None
-
-        return cls(
-            number=number,
-            id=id,
-            address_in_actual_values=address_in_actual_values,
-            address_in_data_archive_record=address_in_data_archive_record,
-            bit_control=bit_control,
-            in_data_archive=in_data_archive,
-            in_daily_archive=in_daily_archive,
-            in_monthly_archive=in_monthly_archive,
-            is_metrological_quantity=is_metrological_quantity,
-            name=name,
-            unit=unit,
-            digit=digit,
-            offset=offset,
-            number_of_primary_quantity=number_of_primary_quantity,
-            statistics_type=statistics_type,
-            address_in_daily_archive_record=address_in_daily_archive_record,
-            address_in_monthly_archive_record=address_in_monthly_archive_record,
-            decimals=decimals,
-        )
+        return cls.layout.decode(cls, in_data)
 
 
 class AnalogStatisticsSchema(marshmallow.Schema):
@@ -107,6 +96,8 @@ class AnalogStatisticsSchema(marshmallow.Schema):
 
 
 class Statistics(AnalogStatistics):
+    __slots__ = ()
+
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.STATISTICS
 
 
@@ -117,6 +108,8 @@ class StatisticsSchema(AnalogStatisticsSchema):
 
 
 class AnalogTimeStatistics(AnalogStatistics):
+    __slots__ = ()
+
     object_type: ClassVar[
         ParameterObjectType
     ] = ParameterObjectType.ANALOG_TIME_STATISTICS
@@ -129,6 +122,8 @@ class AnalogTimeStatisticsSchema(AnalogStatisticsSchema):
 
 
 class TimeStatistics(AnalogStatistics):
+    __slots__ = ()
+
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.TIME_STATISTICS
 
 
@@ -138,7 +133,7 @@ class TimeStatisticsSchema(AnalogStatisticsSchema):
         return TimeStatistics(**data)
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class CounterStatistics:
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.COUNTER_STATISTICS
 
@@ -160,51 +155,38 @@ class CounterStatistics:
     address_in_daily_archive_record: int
     address_in_monthly_archive_record: int
 
+    layout: ClassVar[Layout] = Layout(
+        [
+            archive_addresses(),
+            u8(
+                "bit_control",
+                bits={
+                    "in_data_archive": 0b00000001,
+                    "in_daily_archive": 0b00000010,
+                    "in_monthly_archive": 0b00000100,
+                    "is_metrological_quantity": 0b00010000,
+                },
+            ),
+            text("name", 23),
+            text("unit", 8),
+            f64("digit"),
+            u8("type_of_primary_quantity"),
+            u8("number_of_primary_quantity"),
+            u8("statistics_type"),
+            u16("address_in_daily_archive_record"),
+            u16("address_in_monthly_archive_record"),
+        ],
+        strict=True,
+    )
+
     @classmethod
     def from_bytes(cls, in_data: bytes):
-        data = bytearray(in_data)
-        number = int.from_bytes(pop_many(data, 2), "little")
-        id = int.from_bytes(pop_many(data, 2), "little")
-        address_in_actual_values = int.from_bytes(pop_many(data, 2), "little")
-        address_in_data_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        bit_control = data.pop(0)
-        in_data_archive = bool(bit_control & 0b00000001)
-        in_daily_archive = bool(bit_control & 0b00000010)
-        in_monthly_archive = bool(bit_control & 0b00000100)
-        is_metrological_quantity = bool(bit_control & 0b00010000)
-        name = pretty_text(pop_many(data, 23))
-        unit = pretty_text(pop_many(data, 8))
-        digit = struct.unpack("<d", pop_many(data, 8))[0]
-        type_of_primary_quantity = data.pop(0)
-        number_of_primary_quantity = data.pop(0)
-        statistics_type = data.pop(0)
-        address_in_daily_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        address_in_monthly_archive_record = int.from_bytes(pop_many(data, 2), "little")
-
-        assert not data
-
-        return cls(
-            number=number,
-            id=id,
-            address_in_actual_values=address_in_actual_values,
-            address_in_data_archive_record=address_in_data_archive_record,
-            bit_control=bit_control,
-            in_data_archive=in_data_archive,
-            in_daily_archive=in_daily_archive,
-            in_monthly_archive=in_monthly_archive,
-            is_metrological_quantity=is_metrological_quantity,
-            name=name,
-            unit=unit,
-            digit=digit,
-            type_of_primary_quantity=type_of_primary_quantity,
-            number_of_primary_quantity=number_of_primary_quantity,
-            statistics_type=statistics_type,
-            address_in_daily_archive_record=address_in_daily_archive_record,
-            address_in_monthly_archive_record=address_in_monthly_archive_record,
-        )
+        return cls.layout.decode(cls, in_data)
 
 
 class StandardCounterStatistics(CounterStatistics):
+    __slots__ = ()
+
     object_type: ClassVar[
         ParameterObjectType
     ] = ParameterObjectType.STANDARD_COUNTER_STATISTICS
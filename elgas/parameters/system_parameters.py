@@ -1,4 +1,3 @@
-import struct
 from typing import ClassVar
 
 import attr
@@ -13,10 +12,20 @@ from elgas.parameters.enumerations import (
     SwitchFunction,
 )
 from elgas.parameters.gas_composition import GasComposition, GasCompositionSchema
-from elgas.utils import pop_many, pretty_text
+from elgas.parameters.layout import (
+    Layout,
+    f32,
+    hex_string,
+    nested,
+    skip,
+    text,
+    u8,
+    u16,
+    u32,
+)
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class SystemParameters:
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.SYSTEM_PARAMETER
 
@@ -83,151 +92,87 @@ class SystemParameters:
     metrological_crc_32: int
     application_crc_32: int
 
+    # first 2 bytes is length and not included in parsing
+    # third byte is object type and not included in parsing.
+    layout: ClassVar[Layout] = Layout(
+        [
+            u8("device_type"),
+            u32("serial_number"),
+            text("firmware_version", 5),
+            u8("service_version"),
+            u8("certification_variant"),
+            text("station_id", 17),
+            u8(
+                None,  # data access
+                bits={
+                    "password_for_full_access_active": 0b00000001,
+                    "password_for_reading_is_on": 0b00000010,
+                    "metrological_switch": 0b00000100,
+                    "user_switch": 0b00001000,
+                    "switch_function": (0b00110000, 4),
+                },
+            ),
+            u16("parameter_crc"),
+            u8("measuring_period"),
+            u16("archive_period"),
+            f32("base_pressure"),
+            f32("base_temperature"),
+            u8("compressibility_formula"),
+            nested("gas_composition", GasComposition),
+            # The record lengths are including the header with time.
+            u16("data_archive_record_length"),
+            u16("binary_archive_record_length"),
+            u16("daily_archive_record_length"),
+            u16("monthly_archive_record_length"),
+            u16("instantaneous_values_error_bit_order"),
+            u16("binary_archive_record_error_bit_order"),
+            u16("data_archive_record_error_bit_order"),
+            u8("optical_port_speed"),
+            u8("optical_port_protocol"),
+            u8("optical_port_bit_control"),
+            u8("communication_port_0_speed"),
+            u8("communication_port_0_protocol"),
+            u8("communication_port_0_bit_control"),
+            u8("communication_port_1_speed"),
+            u8("communication_port_1_protocol"),
+            u8("communication_port_1_bit_control"),
+            u8("communication_port_2_speed"),
+            u8("communication_port_2_protocol"),
+            u8("communication_port_2_bit_control"),
+            u8("gas_day_hour"),
+            f32("fixed_barometric_pressure"),
+            f32("altitude"),
+            skip(17),  # Not used
+            u16("status_archive_record_length"),
+            u8("pressure_unit_type"),
+            text("pressure_unit_text", 8),
+            u8("temperature_unit_type"),
+            text("temperature_unit_text", 8),
+            u8("altitude_unit_type"),
+            text("altitude_unit_text", 8),
+            u8("gross_calorific_value_type"),
+            text("gross_calorific_value_text", 8),
+            u8("dst_region"),  # seems like it should not be used.
+            u8("gmt_hour_shift"),
+            u16("billing_archive_record_length"),
+            u8("conditions_for_combustion_heat"),
+            u8("device_variant"),  # czech translation is device_value?
+            skip(1),  # not used
+            u8("bit_control"),
+            u8("places_for_corrected_volume_counters"),
+            u8("device_features_bits"),
+            hex_string("device_features", 16),
+            text("version_metrological_part", 5),
+            u16("metrological_crc"),
+            u32("metrological_crc_32"),
+            u32("application_crc_32"),
+        ],
+        strict=True,
+    )
+
     @classmethod
     def from_bytes(cls, in_bytes: bytes):
-
-        # first 2 bytes is length and not included in parsing
-        # third byte is object type and not included in parsing.
-        data = bytearray(in_bytes)
-        device_type = data.pop(0)
-        serial_number = int.from_bytes(pop_many(data, 4), "little")
-        firmware_version = pretty_text(pop_many(data, 5))
-        service_version = data.pop(0)
-        certification_variant = data.pop(0)
-        station_id = pretty_text(pop_many(data, 17))
-        data_access = data.pop(0)
-        password_for_full_access_active = bool(data_access & 0b00000001)
-        password_for_reading_is_on = bool(data_access & 0b00000010)
-        metrological_switch = bool(data_access & 0b00000100)
-        user_switch = bool(data_access & 0b00001000)
-        switch_function = int((data_access & 0b00110000) >> 4)
-        parameter_crc = int.from_bytes(pop_many(data, 2), "little")
-        measuring_period = data.pop(0)
-        archiving_period = int.from_bytes(pop_many(data, 2), "little")
-        base_pressure = struct.unpack("<f", pop_many(data, 4))[0]
-        base_temperature = struct.unpack("<f", pop_many(data, 4))[0]
-        compressibility_formula = data.pop(0)
-        gas_composition = GasComposition.from_bytes(pop_many(data, (23 * 4)))
-        # The record lengths are including the header with time.
-        data_archive_record_length = int.from_bytes(pop_many(data, 2), "little")
-        binary_archive_record_length = int.from_bytes(pop_many(data, 2), "little")
-        daily_archive_record_length = int.from_bytes(pop_many(data, 2), "little")
-        monthly_archive_record_length = int.from_bytes(pop_many(data, 2), "little")
-        instantaneous_values_error_bit_order = int.from_bytes(
-            pop_many(data, 2), "little"
-        )
-        binary_archive_record_error_bit_order = int.from_bytes(
-            pop_many(data, 2), "little"
-        )
-        data_archive_record_error_bit_order = int.from_bytes(
-            pop_many(data, 2), "little"
-        )
-        optical_port_speed = data.pop(0)
-        optical_port_protocol = data.pop(0)
-        optical_port_bit_control = data.pop(0)
-        communication_port_0_speed = data.pop(0)
-        communication_port_0_protocol = data.pop(0)
-        communication_port_0_bit_control = data.pop(0)
-        communication_port_1_speed = data.pop(0)
-        communication_port_1_protocol = data.pop(0)
-        communication_port_1_bit_control = data.pop(0)
-        communication_port_2_speed = data.pop(0)
-        communication_port_2_protocol = data.pop(0)
-        communication_port_2_bit_control = data.pop(0)
-        gas_hour = data.pop(0)
-        fixed_barometric_pressure = struct.unpack("<f", pop_many(data, 4))[0]
-        altitude = struct.unpack("<f", pop_many(data, 4))[0]
-        _ = pop_many(data, 17)  # Not used
-        status_archive_record_length = int.from_bytes(pop_many(data, 2), "little")
-        pressure_unit_type = data.pop(0)
-        pressure_unit_text = pretty_text(pop_many(data, 8))
-        temperature_unit_type = data.pop(0)
-        temperature_unit_text = pretty_text(pop_many(data, 8))
-        altitude_unit_type = data.pop(0)
-        altitude_unit_text = pretty_text(pop_many(data, 8))
-        gross_calorific_value_type = data.pop(0)
-        gross_calorific_value_text = pretty_text(pop_many(data, 8))
-        dst_region = data.pop(0)  # seems like it should not be used.
-        gmt_hour_shift = data.pop(0)
-        billing_archive_record_length = int.from_bytes(pop_many(data, 2), "little")
-        conditions_for_combustion_heat = data.pop(0)
-        device_variant = data.pop(0)  # czech translation is device_value?
-        _ = data.pop(0)  # not used
-        bit_control = data.pop(0)
-        corrected_volume_counters_amount = data.pop(0)
-        device_features_bits = data.pop(0)
-        device_features = pop_many(data, 16).hex()
-        version_metrological_part = pretty_text(pop_many(data, 5))
-        metrological_crc = int.from_bytes(pop_many(data, 2), "little")
-        metrological_crc_32 = int.from_bytes(pop_many(data, 4), "little")
-        application_crc_32 = int.from_bytes(pop_many(data, 4), "little")
-
-        assert not data
-
-        return cls(
-            device_type=device_type,
-            serial_number=serial_number,
-            firmware_version=firmware_version,
-            service_version=service_version,
-            certification_variant=certification_variant,
-            station_id=station_id,
-            password_for_full_access_active=password_for_full_access_active,
-            password_for_reading_is_on=password_for_reading_is_on,
-            metrological_switch=metrological_switch,
-            user_switch=user_switch,
-            switch_function=switch_function,
-            parameter_crc=parameter_crc,
-            measuring_period=measuring_period,
-            archive_period=archiving_period,
-            base_pressure=base_pressure,
-            base_temperature=base_temperature,
-            compressibility_formula=compressibility_formula,
-            gas_composition=gas_composition,
-            data_archive_record_length=data_archive_record_length,
-            binary_archive_record_length=binary_archive_record_length,
-            daily_archive_record_length=daily_archive_record_length,
-            monthly_archive_record_length=monthly_archive_record_length,
-            instantaneous_values_error_bit_order=instantaneous_values_error_bit_order,
-            binary_archive_record_error_bit_order=binary_archive_record_error_bit_order,
-            data_archive_record_error_bit_order=data_archive_record_error_bit_order,
-            optical_port_speed=optical_port_speed,
-            optical_port_protocol=optical_port_protocol,
-            optical_port_bit_control=optical_port_bit_control,
-            communication_port_0_speed=communication_port_0_speed,
-            communication_port_0_protocol=communication_port_0_protocol,
-            communication_port_0_bit_control=communication_port_0_bit_control,
-            communication_port_1_speed=communication_port_1_speed,
-            communication_port_1_protocol=communication_port_1_protocol,
-            communication_port_1_bit_control=communication_port_1_bit_control,
-            communication_port_2_speed=communication_port_2_speed,
-            communication_port_2_protocol=communication_port_2_protocol,
-            communication_port_2_bit_control=communication_port_2_bit_control,
-            gas_day_hour=gas_hour,
-            fixed_barometric_pressure=fixed_barometric_pressure,
-            altitude=altitude,
-            status_archive_record_length=status_archive_record_length,
-            pressure_unit_type=pressure_unit_type,
-            pressure_unit_text=pressure_unit_text,
-            temperature_unit_type=temperature_unit_type,
-            temperature_unit_text=temperature_unit_text,
-            altitude_unit_type=altitude_unit_type,
-            altitude_unit_text=altitude_unit_text,
-            gross_calorific_value_type=gross_calorific_value_type,
-            gross_calorific_value_text=gross_calorific_value_text,
-            dst_region=dst_region,
-            gmt_hour_shift=gmt_hour_shift,
-            billing_archive_record_length=billing_archive_record_length,
-            conditions_for_combustion_heat=conditions_for_combustion_heat,
-            device_variant=device_variant,
-            bit_control=bit_control,
-            places_for_corrected_volume_counters=corrected_volume_counters_amount,
-            device_features_bits=device_features_bits,
-            device_features=device_features,
-            version_metrological_part=version_metrological_part,
-            metrological_crc=metrological_crc,
-            metrological_crc_32=metrological_crc_32,
-            application_crc_32=application_crc_32,
-        )
+        return cls.layout.decode(cls, in_bytes)
 
 
 class SystemParametersSchema(marshmallow.Schema):
@@ -5,10 +5,18 @@ import marshmallow
 from marshmallow import post_load
 
 from elgas.parameters.enumerations import ParameterObjectType
-from elgas.utils import pop_many, pretty_text
+from elgas.parameters.layout import (
+    Layout,
+    bit_orders,
+    hex_string,
+    repeated,
+    text,
+    text_logs,
+    u8,
+)
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class TimeWindow:
     object_type: ClassVar[ParameterObjectType] = ParameterObjectType.TIME_WINDOW
 
@@ -28,50 +36,27 @@ class TimeWindow:
     text_log_0: Optional[str]
     text_log_1: Optional[str]
 
+    layout: ClassVar[Layout] = Layout(
+        [
+            bit_orders(),
+            u8(
+                "bit_control",
+                bits={
+                    "in_binary_archive": 0b00000001,
+                    "in_data_archive": 0b00000010,
+                },
+            ),
+            text("name", 23),
+            u8("rows_in_window"),
+            repeated("rows", count="rows_in_window", field=hex_string("row", 10)),
+            text_logs(),
+        ],
+        strict=True,
+    )
+
     @classmethod
     def from_bytes(cls, in_data: bytes):
-        data = bytearray(in_data)
-        number = int.from_bytes(pop_many(data, 2), "little")
-        id = int.from_bytes(pop_many(data, 2), "little")
-        bit_order_in_actual_values = int.from_bytes(pop_many(data, 2), "little")
-        bit_order_in_data_archive_record = int.from_bytes(pop_many(data, 2), "little")
-        bit_order_in_binary_archive_record = int.from_bytes(pop_many(data, 2), "little")
-
-        bit_control = data.pop(0)
-        in_binary_archive = bool(bit_control & 0b00000001)
-        in_data_archive = bool(bit_control & 0b00000010)
-        name = pretty_text(pop_many(data, 23))
-        rows_in_window = data.pop(0)
-        rows = list()
-        for _ in range(0, rows_in_window):
-            rows.append(pop_many(data, 10).hex())
-        if data:
-            action_during_change = data.pop(0)
-            text_log_0 = pretty_text(pop_many(data, 13))
-            text_log_1 = pretty_text(pop_many(data, 13))
-        else:
-            action_during_change = None
-            text_log_0 = None
-            text_log_1 = None
-
-        assert not data
-
-        return cls(
-            number=number,
-            id=id,
-            bit_order_in_actual_values=bit_order_in_actual_values,
-            bit_order_in_data_archive_record=bit_order_in_data_archive_record,
-            bit_order_in_binary_archive_record=bit_order_in_binary_archive_record,
-            bit_control=bit_control,
-            in_binary_archive=in_binary_archive,
-            in_data_archive=in_data_archive,
-            name=name,
-            rows_in_window=rows_in_window,
-            rows=rows,
-            action_during_change=action_during_change,
-            text_log_0=text_log_0,
-            text_log_1=text_log_1,
-        )
+        return cls.layout.decode(cls, in_data)
 
 
 class TimeWindowSchema(marshmallow.Schema):
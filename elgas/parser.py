@@ -1,3 +1,5 @@
+import functools
+import struct
 from typing import *
 
 import attr
@@ -5,7 +7,11 @@ import attr
 import elgas.parameters
 import elgas.parameters.enumerations
 import elgas.parameters.factory
-from elgas.utils import pop_many
+from elgas import constants
+from elgas.archive import ADDRESS_ATTRIBUTES
+from elgas.parameters.enumerations import ParameterObjectType
+
+HEADER_SIZE = 3
 
 
 @attr.s(auto_attribs=True)
@@ -22,23 +28,187 @@ class ScadaParameterParser:
     data: Optional[bytes] = attr.ib(default=None)
 
     def parse(self, data: Optional[bytes] = None):
-        working_data = bytearray(self.data or data)
+        view = memoryview(self.data or data or b"")
+        return [
+            elgas.parameters.factory.ParameterFactory.from_bytes(
+                object_type, view[: offset + length], offset=offset + HEADER_SIZE
+            )
+            for object_type, offset, length in index_objects(view)
+        ]
+
+    def index(self, data: Optional[bytes] = None) -> "ParameterSet":
+        """
+        Only find where the objects are. They are decoded when they are used.
+        """
+        return ParameterSet(self.data or data or b"")
 
-        if not working_data:
-            raise ValueError("No data to parse")
 
-        object_list = list()
+def index_objects(view: memoryview) -> List[Tuple[ParameterObjectType, int, int]]:
+    """
+    The type, offset and length of each object in the parameter data, from the
+    object headers only.
+    """
+    if not view:
+        raise ValueError("No data to parse")
 
-        while working_data:
-            length = int.from_bytes(pop_many(working_data, 2), "little")
-            object_type = elgas.parameters.enumerations.ParameterObjectType(
-                working_data.pop(0)
+    out = list()
+    offset = 0
+    end = len(view)
+    while offset < end:
+        if end - offset < HEADER_SIZE:
+            raise ValueError(
+                f"Parameter data ends with {end - offset} bytes that are too "
+                f"short for an object header"
             )
-            data = working_data[: length - 3]
-            object_list.append(
-                elgas.parameters.factory.ParameterFactory.from_bytes(object_type, data)
+        length = view[offset] | view[offset + 1] << 8
+        if length < HEADER_SIZE or offset + length > end:
+            raise ValueError(
+                f"Parameter object at offset {offset} has invalid length {length}"
+            )
+        out.append((ParameterObjectType(view[offset + 2]), offset, length))
+        offset += length
+    return out
+
+
+@functools.lru_cache(maxsize=None)
+def field_reader(klass: Type, name: str) -> Tuple[bool, Optional[Tuple[int, Any]]]:
+    """
+    If objects of klass have the field, and its offset and struct if it is at the
+    same place in every object.
+    """
+    if name not in attr.fields_dict(klass):
+        return False, None
+    position = klass.layout.field_position(name)
+    if position is None:
+        return True, None
+    offset, field_format = position
+    return True, (offset, struct.Struct("<" + field_format))
+
+
+class ParameterSet(Sequence):
+    """
+    Parameter objects decoded on first access.
+
+    Creating the set only reads the object headers, or nothing when the `entries`
+    from `index_objects` are given. It is a sequence of the objects, in the order of
+    the data, and can be used where the list returned by `ScadaParameterParser.parse`
+    is. Lookups by id, number and archive address read the field from the data and
+    only decode the objects found.
+    """
+
+    def __init__(
+        self,
+        data: Union[bytes, memoryview],
+        entries: Optional[List[Tuple[ParameterObjectType, int, int]]] = None,
+    ):
+        # A memoryview is used as is, so data mapped from a file is not copied.
+        if not isinstance(data, memoryview):
+            data = bytes(data)
+        self._data = data
+        self._view = memoryview(data)
+        self.entries = index_objects(self._view) if entries is None else entries
+        self._objects: List[Optional[Any]] = [None] * len(self.entries)
+        self._fields: Dict[str, Dict[int, List[int]]] = dict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = self._objects[index]
+        if item is None:
+            object_type, offset, length = self.entries[index]
+            item = elgas.parameters.factory.ParameterFactory.from_bytes(
+                object_type, self._view[: offset + length], offset + HEADER_SIZE
             )
+            self._objects[index] = item
+        return item
+
+    def release(self) -> None:
+        """
+        Release the views of the data, like before the file it is mapped from is
+        closed. Objects not decoded yet can not be decoded anymore.
+        """
+        self._view.release()
+        if isinstance(self._data, memoryview):
+            self._data.release()
+
+    @property
+    def decoded(self) -> int:
+        """Number of objects decoded so far"""
+        return sum(item is not None for item in self._objects)
+
+    def of_type(self, *object_types: ParameterObjectType) -> List[Any]:
+        return [
+            self[index]
+            for index, (object_type, _, _) in enumerate(self.entries)
+            if object_type in object_types
+        ]
+
+    def first(self, object_type: ParameterObjectType) -> Optional[Any]:
+        for index, entry in enumerate(self.entries):
+            if entry[0] == object_type:
+                return self[index]
+        return None
+
+    @property
+    def system_parameters(self) -> Optional[Any]:
+        return self.first(ParameterObjectType.SYSTEM_PARAMETER)
+
+    def _field_index(self, name: str) -> Dict[int, List[int]]:
+        """
+        Positions of the objects by the value of a field, read without decoding the
+        objects. Objects that have the field after a variable part are decoded.
+        """
+        field_index = self._fields.get(name)
+        if field_index is not None:
+            return field_index
+
+        field_index = dict()
+        factory = elgas.parameters.factory.ParameterFactory
+        for index, (object_type, offset, length) in enumerate(self.entries):
+            has_field, position = field_reader(factory.object_map[object_type], name)
+            if not has_field:
+                continue
+            if position is not None:
+                field_offset, field_struct = position
+                start = offset + HEADER_SIZE + field_offset
+                if start + field_struct.size > offset + length:
+                    continue
+                (value,) = field_struct.unpack_from(self._view, start)
+            else:
+                value = getattr(self[index], name, None)
+                if value is None:
+                    continue
+            field_index.setdefault(value, []).append(index)
+        self._fields[name] = field_index
+        return field_index
+
+    def by_id(self, parameter_id: int) -> Optional[Any]:
+        found = self._field_index("id").get(parameter_id)
+        return self[found[0]] if found else None
 
-            working_data = working_data[length - 3 :]
+    def by_number(
+        self,
+        number: int,
+        object_types: Union[ParameterObjectType, Iterable[ParameterObjectType]],
+    ) -> Optional[Any]:
+        """The object with the number in the first of object_types that has it"""
+        if isinstance(object_types, ParameterObjectType):
+            object_types = (object_types,)
+        found = self._field_index("number").get(number, [])
+        for object_type in object_types:
+            for index in found:
+                if self.entries[index][0] == object_type:
+                    return self[index]
+        return None
 
-        return object_list
+    def by_archive_address(
+        self, archive: constants.Archive, address: int
+    ) -> Optional[Any]:
+        """The object with its value at address in the records of archive"""
+        if not address:
+            return None
+        found = self._field_index(ADDRESS_ATTRIBUTES[archive]).get(address)
+        return self[found[0]] if found else None
@@ -1,5 +1,6 @@
 import random
 from enum import IntEnum
+from typing import *
 
 import attr
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
@@ -39,10 +40,35 @@ def data_padding(data: bytes):
         return bytes(padding)
 
 
+BLOCK_SIZE = 16
+
+
 @attr.s(auto_attribs=True)
 class CipherContext:
+    """
+    Encrypts and decrypts the data of encrypted frames with one key.
+
+    The data starts with the length of the plain data (2 bytes) and the key id,
+    followed by the encrypted plain data, padding and CRC. The CRC covers everything
+    before it, header included.
+
+    The ciphers of the key are made when the context is made and only kept by it, so
+    the key is not held anywhere after the context is dropped. Decryption uses one ECB
+    decryptor for the whole life of the context and does the CBC chaining with a
+    single XOR over all blocks, so no cipher objects are created per frame.
+    """
+
     key_id: EncryptionKeyId
     key: bytes
+    # AES-CBC with the key as IV, as used in the encrypted frames.
+    _cbc: Cipher = attr.ib(init=False, repr=False)
+    _ecb_decryptor: Any = attr.ib(init=False, repr=False)
+    _buffer: bytearray = attr.ib(init=False, factory=bytearray, repr=False)
+
+    def __attrs_post_init__(self):
+        aes = algorithms.AES(self.key)
+        self._cbc = Cipher(aes, modes.CBC(initialization_vector=self.key))
+        self._ecb_decryptor = Cipher(aes, modes.ECB()).decryptor()
 
     def crc(self, data: bytes):
         for_crc = bytearray()
@@ -53,41 +79,93 @@ class CipherContext:
         return utils.calculate_crc(for_crc)
 
     def encrypt(self, data: bytes):
-        for_crc = bytearray()
-        for_crc.extend(len(data).to_bytes(2, "little"))
-        for_crc.append(self.key_id)
-        padded_data = data_padding(data)
-        for_crc.extend(data)
-        for_crc.extend(padded_data)
-        crc = utils.calculate_crc(for_crc)
-        unencrypted = for_crc + crc.to_bytes(2, "big")
-        # we then encrypt only the data part + crc.
-        header = unencrypted[:3]
-        to_cipher = unencrypted[3:]
-
-        cipher_text = encrypt(to_cipher, self.key, self.key)
-        return header + cipher_text
-
-    def decrypt(self, in_data: bytes):
-        header = in_data[:3]
-        encrypted = in_data[3:]
-        original_length = int.from_bytes(header[:2], "little")
-        key_id = header[2]
-        assert key_id == self.key_id
-        decrypted_data = decrypt(encrypted, self.key, self.key)
-        crc = decrypted_data[-2:]
-        for_crc = bytearray()
-        for_crc.extend(original_length.to_bytes(2, "little"))
-        for_crc.append(key_id)
-        for_crc.extend(decrypted_data[:-2])
+        padding = data_padding(data)
+        out = bytearray(len(data).to_bytes(2, "little"))
+        out.append(self.key_id)
+        out += data
+        out += padding
+        out += utils.calculate_crc(out).to_bytes(2, "big")
+        # Only the data, padding and crc are encrypted.
+        encryptor = self._cbc.encryptor()
+        to_cipher = memoryview(out)[3:]
+        out[3:] = encryptor.update(to_cipher) + encryptor.finalize()
+        return bytes(out)
+
+    def _ecb_decrypt(self, encrypted: bytes) -> memoryview:
+        """
+        Decrypt the blocks without chaining into the reused buffer. The result is
+        only valid until the next call.
+        """
+        length = len(encrypted)
+        if len(self._buffer) < length + BLOCK_SIZE - 1:
+            self._buffer = bytearray(length + BLOCK_SIZE - 1)
+        self._ecb_decryptor.update_into(encrypted, self._buffer)
+        return memoryview(self._buffer)[:length]
+
+    def _check_header(self, in_data: memoryview) -> int:
+        length = len(in_data) - 3
+        if length <= 0 or length % BLOCK_SIZE:
+            raise ValueError(
+                f"Encrypted data of {length} bytes is not a whole number of blocks"
+            )
+        if in_data[2] != self.key_id:
+            raise ValueError(
+                f"Data is encrypted with key id {in_data[2]}, not {self.key_id}"
+            )
+        original_length = int.from_bytes(in_data[:2], "little")
+        if original_length > length - 2:
+            raise ValueError(
+                f"Original length {original_length} does not fit the encrypted data"
+            )
+        return original_length
+
+    def _unchain(
+        self, in_data: memoryview, ecb_decrypted: memoryview, original_length: int
+    ) -> bytes:
+        """
+        Finish the CBC decryption: each block is XORed with the cipher text block
+        before it, the first with the key. The CRC is then checked.
+        """
+        length = len(ecb_decrypted)
+        previous = int.from_bytes(self.key, "big") << (8 * (length - BLOCK_SIZE))
+        previous |= int.from_bytes(in_data[3:-BLOCK_SIZE], "big")
+        decrypted = int.from_bytes(ecb_decrypted, "big") ^ previous
+        for_crc = bytearray(in_data[:3])
+        for_crc += decrypted.to_bytes(length, "big")
+        correct_crc = bytes(for_crc[-2:])
+        del for_crc[-2:]
         crc = utils.calculate_crc(for_crc).to_bytes(2, "big")
-        correct_crc = decrypted_data[-2:]
         if not crc == correct_crc:
             raise ValueError(
                 f"Incorrect CRC in encrypted data. Got {crc} should be {correct_crc} "
             )
-        original_data = decrypted_data[:original_length]
-        return original_data
+        return bytes(for_crc[3 : 3 + original_length])
+
+    def decrypt(self, in_data: bytes):
+        view = memoryview(in_data)
+        original_length = self._check_header(view)
+        return self._unchain(view, self._ecb_decrypt(view[3:]), original_length)
+
+    def decrypt_many(self, in_data: Iterable[bytes]) -> List[bytes]:
+        """
+        Decrypt the data of many encrypted frames, for example the
+        `EncryptedResponse.data` of a captured archive download. All blocks are
+        decrypted in one call to the cipher.
+        """
+        views = [memoryview(data) for data in in_data]
+        original_lengths = [self._check_header(view) for view in views]
+        ecb_decrypted = self._ecb_decrypt(b"".join(view[3:] for view in views))
+        out = list()
+        position = 0
+        for view, original_length in zip(views, original_lengths):
+            length = len(view) - 3
+            out.append(
+                self._unchain(
+                    view, ecb_decrypted[position : position + length], original_length
+                )
+            )
+            position += length
+        return out
 
 
 def encrypt(data: bytes, key: bytes, iv: bytes) -> bytes:
@@ -0,0 +1,615 @@
+"""
+Simulated ELGAS devices for load and soak testing without real volume correctors.
+
+A `SimulatedDevice` answers request frames the way a device does, using the frame and
+PDU classes of the library and parameter data read from a real device. It answers
+READ_VALUES, READ_DEVICE_TIME, WRITE_DEVICE_TIME, READ_SCADA_PARAMETERS, READ_ARCHIVES
+and READ_ARCHIVES_BY_DATE. Archive records are generated from the record plans of the
+parameters, so the same device always has the same records.
+
+Devices are served over TCP with `DeviceSimulator`, one port per unit or all units on
+one port, or over a pty with `PtyDevice` to be used with `SerialTransport`. A `Link`
+adds latency, limited bandwidth and lost frames. `call_burst` makes many units call a
+call to dispatching server at once and then answer its requests on the same
+connection.
+"""
+import asyncio
+import os
+import random
+import select
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import *
+
+import attr
+import structlog
+
+from elgas import application, constants, frames, parser, security, utils
+from elgas.archive import ADDRESS_ATTRIBUTES, ArchiveRecordPlan
+from elgas.client import system_parameter_crc
+from elgas.snapshot import DATA_OFFSET, SnapshotPlan
+
+LOG = structlog.get_logger("simulator")
+
+# Error byte sent instead of a PDU, as `connection.raise_error` reads them.
+WRONG_PASSWORD = b"\x01"
+DATA_ERROR = b"\x10"
+WRONG_ENCRYPTION_KEYS = b"\x40"
+
+ARCHIVE_PERIODS = {
+    constants.Archive.DATA: timedelta(hours=1),
+    constants.Archive.DAILY: timedelta(days=1),
+    constants.Archive.MONTHLY: timedelta(days=30),
+    constants.Archive.BILLING: timedelta(days=30),
+}
+
+
+def generated_value(channel, step: int) -> Union[int, float]:
+    """A value of a channel that changes with each step, the same on every run"""
+    if channel.format in ("f", "d"):
+        return float(channel.address + step % 1000) / 4
+    return (channel.address * 1000 + step) % (1 << (8 * channel.size))
+
+
+@attr.s(auto_attribs=True)
+class SimulatedArchive:
+    """
+    Records `first_record_id` to `first_record_id + record_count - 1`, one per
+    `period` from `first_timestamp`.
+    """
+
+    plan: ArchiveRecordPlan
+    first_record_id: int
+    record_count: int
+    first_timestamp: datetime
+    period: timedelta
+
+    @property
+    def end_record_id(self) -> int:
+        """The id after the last record"""
+        return self.first_record_id + self.record_count
+
+    def timestamp(self, record_id: int) -> datetime:
+        return self.first_timestamp + (record_id - self.first_record_id) * self.period
+
+    def record_id_at(self, timestamp: datetime) -> int:
+        """Id of the first record stored at or after the timestamp"""
+        index = -((self.first_timestamp - timestamp) // self.period)
+        return self.first_record_id + min(max(index, 0), self.record_count)
+
+    def records(self, oldest_record_id: int, amount: int) -> Tuple[int, bytes]:
+        """
+        Up to amount records from oldest_record_id. Records that are overwritten are
+        skipped, as a ring buffer does.
+        """
+        start = max(oldest_record_id, self.first_record_id)
+        stop = min(start + amount, self.end_record_id)
+        out = bytearray()
+        for record_id in range(start, stop):
+            seconds = (self.timestamp(record_id) - utils.BASE_DATE).total_seconds()
+            values = [
+                generated_value(channel, record_id) for channel in self.plan.channels
+            ]
+            out += self.plan.record_struct.pack(int(seconds), *values)
+        return start, bytes(out)
+
+
+@attr.s(auto_attribs=True)
+class SimulatedDevice:
+    """
+    A device with the parameters in `parameter_data`, as read from a real device.
+
+    Each supported archive of the parameters has `archive_records` records ending at
+    `last_record_time`. Encrypted requests are answered when the key id is in
+    `encryption_keys`. Responses hold at most `max_data_length` bytes of records.
+    """
+
+    parameter_data: bytes = attr.ib(repr=False)
+    password: str = attr.ib(default="000000", repr=False)
+    address_1: int = attr.ib(default=1)
+    address_2: int = attr.ib(default=0)
+    encryption_keys: Dict[int, bytes] = attr.ib(factory=dict, repr=False)
+    archive_records: int = attr.ib(default=1000)
+    first_record_id: int = attr.ib(default=1)
+    last_record_time: datetime = attr.ib(default=datetime(2022, 1, 1))
+    max_data_length: int = attr.ib(default=1024)
+    station_id: str = attr.ib(default="")
+    clock_offset: timedelta = attr.ib(default=timedelta())
+    requests: int = attr.ib(init=False, default=0)
+    parameters: List[Any] = attr.ib(init=False, repr=False)
+    parameter_offsets: List[int] = attr.ib(init=False, repr=False)
+    snapshot_plan: SnapshotPlan = attr.ib(init=False, repr=False)
+    archives: Dict[constants.Archive, SimulatedArchive] = attr.ib(
+        init=False, repr=False
+    )
+    _ciphers: Dict[int, security.CipherContext] = attr.ib(init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        self.parameters = parser.ScadaParameterParser().parse(self.parameter_data)
+        self.parameter_offsets = [0]
+        while self.parameter_offsets[-1] < len(self.parameter_data):
+            offset = self.parameter_offsets[-1]
+            length = self.parameter_data[offset : offset + 2]
+            self.parameter_offsets.append(offset + int.from_bytes(length, "little"))
+        self.snapshot_plan = SnapshotPlan.from_parameters(self.parameters)
+        self.archives = dict()
+        for archive in ADDRESS_ATTRIBUTES:
+            try:
+                plan = ArchiveRecordPlan.from_parameters(self.parameters, archive)
+            except ValueError:
+                # The device does not have the archive.
+                continue
+            period = ARCHIVE_PERIODS[archive]
+            self.archives[archive] = SimulatedArchive(
+                plan=plan,
+                first_record_id=self.first_record_id,
+                record_count=self.archive_records,
+                first_timestamp=self.last_record_time
+                - (self.archive_records - 1) * period,
+                period=period,
+            )
+        self._ciphers = {
+            key_id: security.CipherContext(key_id, key)
+            for key_id, key in self.encryption_keys.items()
+        }
+        if not self.station_id:
+            self.station_id = f"SIM{self.address_1:013d}"
+
+    @property
+    def parameter_crc(self) -> int:
+        return system_parameter_crc(self.parameters)
+
+    @property
+    def time(self) -> datetime:
+        return (datetime.now() + self.clock_offset).replace(microsecond=0)
+
+    def handle_frame(self, frame: bytes) -> bytes:
+        """
+        Answer a request frame, with characters returned, with an escaped response
+        frame.
+        """
+        self.requests += 1
+        encrypted = frame[2] == frames.EncryptedRequest.TYPE
+        request_class = frames.EncryptedRequest if encrypted else frames.Request
+        request = request_class.from_bytes(frame)
+        cipher = self._ciphers.get(request.data[2]) if encrypted else None
+        if encrypted and cipher is None:
+            LOG.info("Request encrypted with unknown key", key_id=request.data[2])
+            response_data = WRONG_ENCRYPTION_KEYS
+        elif encrypted:
+            response_data = self.answer(request.service, cipher.decrypt(request.data))
+        else:
+            response_data = self.answer(request.service, request.data)
+
+        # Errors are sent as one byte in plain text.
+        if cipher is not None and len(response_data) != 1:
+            response_class = frames.EncryptedResponse
+            response_data = cipher.encrypt(response_data)
+        else:
+            response_class = frames.Response
+
+        response = response_class(
+            service=request.service,
+            destination_address_1=request.source_address_1,
+            destination_address_2=request.source_address_2,
+            source_address_1=self.address_1,
+            source_address_2=self.address_2,
+            data=response_data,
+        )
+        return utils.escape_characters(response.to_bytes())
+
+    def answer(self, service: constants.ServiceNumber, data: bytes) -> bytes:
+        """The application data answering a request, or an error byte"""
+        if service == constants.ServiceNumber.READ_DEVICE_TIME:
+            return self.read_time()
+
+        password = (str(self.password) + "!\x03").encode("latin-1")
+        if not data.startswith(password):
+            LOG.info("Wrong password", service=service)
+            return WRONG_PASSWORD
+        # The two characters after the password are random.
+        reader = utils.ByteReader(data[len(password) + 2 :])
+        try:
+            if service == constants.ServiceNumber.READ_VALUES:
+                return self.read_values()
+            elif service == constants.ServiceNumber.WRITE_DEVICE_TIME:
+                return self.write_time(reader.bcd_datetime()[0])
+            elif service == constants.ServiceNumber.READ_SCADA_PARAMETERS:
+                return self.read_parameters(reader.u16(), reader.u16())
+            elif service == constants.ServiceNumber.READ_ARCHIVES:
+                archive = constants.Archive(reader.u8())
+                oldest_record_id = reader.u32()
+                return self.read_archive(archive, oldest_record_id, reader.u16())
+            elif service == constants.ServiceNumber.READ_ARCHIVES_BY_DATE:
+                archive = constants.Archive(reader.u8())
+                amount = reader.u16()
+                timestamp = reader.bcd_datetime()[0]
+                return self.read_archive(
+                    archive, self.archives[archive].record_id_at(timestamp), amount
+                )
+        except (KeyError, ValueError) as e:
+            LOG.info("Invalid request", service=service, error=repr(e))
+            return DATA_ERROR
+        LOG.info("Service not simulated", service=service)
+        return DATA_ERROR
+
+    def read_time(self) -> bytes:
+        out = bytearray(utils.datetime_to_bytes(self.time))
+        out.append(0)  # Data access result
+        out.extend(utils.calculate_crc(out).to_bytes(2, "big"))
+        return bytes(out)
+
+    def write_time(self, device_time: datetime) -> bytes:
+        self.clock_offset = device_time - datetime.now()
+        LOG.info("Device time written", time=device_time.isoformat())
+        return b""
+
+    def values(self) -> bytes:
+        """Instantaneous values after the device time, up to the bit fields"""
+        data = bytearray(self.snapshot_plan.values_struct.size)
+        step = int((self.time - utils.BASE_DATE).total_seconds())
+        for channel in self.snapshot_plan.channels:
+            struct.pack_into(
+                "<" + channel.format,
+                data,
+                channel.address - DATA_OFFSET,
+                generated_value(channel, step),
+            )
+        return bytes(data)
+
+    def read_values(self) -> bytes:
+        return (
+            utils.datetime_to_bytes(self.time)
+            + self.values()
+            + b"\x01"  # Data access
+            + bytes(16)  # Status and summary status
+            + self.parameter_crc.to_bytes(2, "little")
+        )
+
+    def read_parameters(self, object_count: int, buffer_length: int) -> bytes:
+        """Whole objects from object_count that fit in buffer_length bytes"""
+        offsets = self.parameter_offsets
+        if object_count >= len(offsets) - 1:
+            raise ValueError(f"There is no parameter object {object_count}")
+        end = object_count + 1
+        while (
+            end < len(offsets) - 1
+            and offsets[end + 1] - offsets[object_count] <= buffer_length
+        ):
+            end += 1
+        out = bytearray()
+        out.extend(object_count.to_bytes(2, "little"))
+        out.extend((end - object_count).to_bytes(2, "little"))
+        out.append(end == len(offsets) - 1)
+        out.extend(self.parameter_data[offsets[object_count] : offsets[end]])
+        return bytes(out)
+
+    def read_archive(
+        self, archive: constants.Archive, oldest_record_id: int, amount: int
+    ) -> bytes:
+        simulated = self.archives[archive]
+        amount = min(amount, self.max_data_length // simulated.plan.record_length)
+        first, records = simulated.records(oldest_record_id, amount)
+        return bytes([archive]) + first.to_bytes(4, "little") + records
+
+    def call_request(self) -> application.CallRequest:
+        """The registration the device sends when it calls a dispatching server"""
+        return application.CallRequest(
+            guid=self.address_1.to_bytes(16, "little"),
+            station_id=self.station_id,
+            sim_card_id=str(self.address_1),
+            modem_id=str(self.address_1),
+            address_1=self.address_1,
+            address_2=self.address_2,
+            signal_strength=31,
+            connections=self.requests,
+            last_connection_time=self.time,
+            connection_errors=0,
+            last_connection_error_time=utils.BASE_DATE,
+            resets=0,
+            last_reset_time=utils.BASE_DATE,
+            tcp_data=0,
+            all_data=0,
+            serial_number=str(self.address_1),
+            ip_address="127.0.0.1",
+            last_modem_error=0,
+            last_modem_error_time=utils.BASE_DATE,
+            modem_battery_capacity=0,
+            modem_battery_voltage=0,
+            firmware_version="simulator",
+        )
+
+    def call_frame(self) -> bytes:
+        request = frames.Request(
+            service=constants.ServiceNumber.CALL,
+            destination_address_1=0,
+            destination_address_2=0,
+            source_address_1=self.address_1,
+            source_address_2=self.address_2,
+            data=self.call_request().to_bytes(),
+        )
+        return utils.escape_characters(request.to_bytes())
+
+
+@attr.s(auto_attribs=True)
+class Link:
+    """
+    Conditions of the connection to a device. Each response is delayed by `latency`
+    seconds plus its transfer time at `bytes_per_second`, and lost with probability
+    `loss`. With a `seed` the lost frames are the same on every run.
+    """
+
+    latency: float = attr.ib(default=0.0)
+    bytes_per_second: Optional[float] = attr.ib(default=None)
+    loss: float = attr.ib(default=0.0)
+    seed: Optional[int] = attr.ib(default=None)
+    _random: random.Random = attr.ib(init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        self._random = random.Random(self.seed)
+
+    def delay(self, data: bytes) -> float:
+        transfer = len(data) / self.bytes_per_second if self.bytes_per_second else 0.0
+        return self.latency + transfer
+
+    def lose(self) -> bool:
+        return self._random.random() < self.loss
+
+
+def destination_address(frame: bytes) -> Tuple[int, int]:
+    """Destination address 1 and 2 of a request frame, with characters returned"""
+    return int.from_bytes(frame[6:8], "little"), frame[8]
+
+
+async def serve_device(
+    device: SimulatedDevice,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    link: Optional[Link] = None,
+):
+    """Answer the requests on a connection until it is closed"""
+    await _serve(lambda frame: device, reader, writer, link)
+
+
+async def serve_units(
+    devices: Mapping[Tuple[int, int], SimulatedDevice],
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    link: Optional[Link] = None,
+):
+    """
+    Answer the requests on a connection until it is closed, each by the device at
+    the destination address of the frame, like units sharing a line. Frames to other
+    addresses are not answered.
+    """
+
+    def device_for(frame: bytes) -> Optional[SimulatedDevice]:
+        if len(frame) < 9:
+            return None
+        return devices.get(destination_address(frame))
+
+    await _serve(device_for, reader, writer, link)
+
+
+async def _serve(
+    device_for: Callable[[bytes], Optional[SimulatedDevice]],
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    link: Optional[Link] = None,
+):
+    link = link or Link()
+    try:
+        while True:
+            try:
+                escaped = await reader.readuntil(b"\x0d")
+            except asyncio.IncompleteReadError:
+                return
+            frame = utils.return_characters(escaped)
+            device = device_for(frame)
+            if device is None:
+                LOG.info("Ignoring frame to no device", frame=frame.hex())
+                continue
+            try:
+                response = device.handle_frame(frame)
+            except ValueError as e:
+                LOG.info("Ignoring invalid frame", error=repr(e))
+                continue
+            delay = link.delay(response)
+            if delay:
+                await asyncio.sleep(delay)
+            if link.lose():
+                LOG.debug("Losing response", address=device.address_1)
+                continue
+            writer.write(response)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+@attr.s(auto_attribs=True)
+class DeviceSimulator:
+    """
+    Serves simulated devices over TCP, each on its own port. Every listening port
+    uses a file descriptor, raise the limit of open files to run thousands of units.
+    With `shared_port` all devices are served on one port and each request is
+    answered by the device at its destination address, so clients have to address
+    the unit they read.
+    """
+
+    devices: List[SimulatedDevice]
+    link: Link = attr.ib(factory=Link)
+    shared_port: bool = attr.ib(default=False)
+    servers: List[asyncio.AbstractServer] = attr.ib(init=False, factory=list)
+    addresses: List[Tuple[str, int]] = attr.ib(init=False, factory=list)
+
+    @classmethod
+    def with_units(
+        cls,
+        count: int,
+        parameter_data: bytes,
+        link: Optional[Link] = None,
+        shared_port: bool = False,
+        **kwargs,
+    ) -> "DeviceSimulator":
+        """`count` devices with addresses 1 to count and the same parameters"""
+        devices = [
+            SimulatedDevice(parameter_data, address_1=address, **kwargs)
+            for address in range(1, count + 1)
+        ]
+        return cls(devices=devices, link=link or Link(), shared_port=shared_port)
+
+    async def start(self, host: str = "127.0.0.1"):
+        if self.shared_port:
+            await self._start_shared(host)
+            return
+        for device in self.devices:
+
+            async def handle(reader, writer, device=device):
+                await serve_device(device, reader, writer, self.link)
+
+            server = await asyncio.start_server(handle, host, 0)
+            self.servers.append(server)
+            self.addresses.append(server.sockets[0].getsockname()[:2])
+        LOG.info("Simulating devices", units=len(self.devices))
+
+    async def _start_shared(self, host: str):
+        units = {
+            (device.address_1, device.address_2): device for device in self.devices
+        }
+        if len(units) != len(self.devices):
+            raise ValueError("Devices on a shared port need different addresses")
+
+        async def handle(reader, writer):
+            await serve_units(units, reader, writer, self.link)
+
+        server = await asyncio.start_server(handle, host, 0)
+        self.servers.append(server)
+        address = server.sockets[0].getsockname()[:2]
+        self.addresses.extend(address for _ in self.devices)
+        LOG.info("Simulating devices on one port", units=len(self.devices))
+
+    async def stop(self):
+        for server in self.servers:
+            server.close()
+        for server in self.servers:
+            await server.wait_closed()
+        self.servers.clear()
+        self.addresses.clear()
+
+    async def __aenter__(self) -> "DeviceSimulator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.stop()
+
+
+async def call(
+    device: SimulatedDevice, host: str, port: int, link: Optional[Link] = None
+) -> bool:
+    """
+    Call a dispatching server as the device, then answer the requests of the server
+    on the same connection until it is closed. Returns whether the call was answered.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(device.call_frame())
+    await writer.drain()
+    try:
+        escaped = await reader.readuntil(b"\x0d")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        writer.close()
+        return False
+    frames.Response.from_bytes(utils.return_characters(escaped))
+    await serve_device(device, reader, writer, link)
+    return True
+
+
+async def call_burst(
+    devices: Iterable[SimulatedDevice],
+    host: str,
+    port: int,
+    link: Optional[Link] = None,
+) -> int:
+    """
+    Make all devices call the dispatching server at the same time. Returns the number
+    of calls that were answered.
+    """
+    answered = await asyncio.gather(
+        *(call(device, host, port, link) for device in devices),
+        return_exceptions=True,
+    )
+    return sum(result is True for result in answered)
+
+
+@attr.s(auto_attribs=True)
+class PtyDevice:
+    """
+    Serves a simulated device on a pty, in a thread. Open `port` with a
+    `SerialTransport` like a serial port.
+    """
+
+    device: SimulatedDevice
+    link: Link = attr.ib(factory=Link)
+    port: Optional[str] = attr.ib(init=False, default=None)
+    _controller: Optional[int] = attr.ib(init=False, default=None, repr=False)
+    _device_side: Optional[int] = attr.ib(init=False, default=None, repr=False)
+    _thread: Optional[threading.Thread] = attr.ib(init=False, default=None, repr=False)
+    _stopped: threading.Event = attr.ib(init=False, factory=threading.Event, repr=False)
+
+    def start(self) -> str:
+        self._controller, self._device_side = os.openpty()
+        self.port = os.ttyname(self._device_side)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        os.close(self._device_side)
+        os.close(self._controller)
+
+    def __enter__(self) -> "PtyDevice":
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _serve(self):
+        buffer = bytearray()
+        while not self._stopped.is_set():
+            # Wait with a timeout to see when the device is stopped.
+            readable, _, _ = select.select([self._controller], [], [], 0.1)
+            if not readable:
+                continue
+            try:
+                data = os.read(self._controller, 4096)
+            except OSError:
+                return
+            if not data:
+                return
+            buffer += data
+            while True:
+                end = buffer.find(b"\x0d")
+                if end == -1:
+                    break
+                escaped = bytes(buffer[: end + 1])
+                del buffer[: end + 1]
+                try:
+                    response = self.device.handle_frame(
+                        utils.return_characters(escaped)
+                    )
+                except ValueError as e:
+                    LOG.info("Ignoring invalid frame", error=repr(e))
+                    continue
+                delay = self.link.delay(response)
+                if delay:
+                    time.sleep(delay)
+                if not self.link.lose():
+                    os.write(self._controller, response)
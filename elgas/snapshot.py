@@ -0,0 +1,267 @@
+"""
+Decoding of instantaneous values (actual values) using the parameters read from the
+device.
+
+`ReadInstantaneousValuesResponse.data` holds the values of all objects followed by bit
+fields with binary states and error flags. Where each value is and which bits belong to
+it is given by the parameter objects: `address_in_actual_values`,
+`bit_order_in_actual_values` and `error_bit_order_in_actual_values`. Addresses and
+bit orders count from the start of the response, so they include the 6 bytes of device
+time before the data.
+
+A `SnapshotPlan` is compiled once per parameter set and decodes a response with a
+single `unpack_from`. The plan knows the parameter CRC it was made from and refuses
+responses from a device whose parameters have changed. A `SnapshotPlanCache` keeps
+the plans by parameter CRC so the clients only compile a plan when the parameters of
+the device change.
+"""
+import struct
+from collections import OrderedDict
+from datetime import datetime
+from typing import *
+
+import attr
+
+from elgas import application
+from elgas.archive import BitChannel, ValueChannel, unique_names
+from elgas.parameters.system_parameters import SystemParameters
+
+# The device time is sent before the values.
+DATA_OFFSET = 6
+
+
+@attr.s(auto_attribs=True)
+class Snapshot:
+    """
+    Instantaneous values of a device, by object name.
+    """
+
+    time: datetime
+    parameter_crc: Optional[int]
+    values: Dict[str, Any]
+    errors: Dict[str, bool]
+    states: Dict[str, bool]
+
+
+@attr.s(auto_attribs=True)
+class SnapshotPlan:
+    """
+    Where the values and flags are in the instantaneous values of a device.
+    """
+
+    parameter_crc: int
+    channels: List[ValueChannel]
+    error_channels: List[BitChannel] = attr.ib(factory=list)
+    state_channels: List[BitChannel] = attr.ib(factory=list)
+    values_struct: struct.Struct = attr.ib(init=False, repr=False)
+    first_bit: int = attr.ib(init=False, repr=False)
+    _scaling: List[Tuple[str, Optional[float], Optional[float]]] = attr.ib(
+        init=False, repr=False
+    )
+
+    def __attrs_post_init__(self):
+        self.channels = sorted(self.channels, key=lambda channel: channel.address)
+        bit_orders = [
+            channel.bit_order for channel in self.error_channels + self.state_channels
+        ]
+        # The data in the response starts after the device time.
+        self.values_struct, self.first_bit = compile_values(
+            [(channel.address - DATA_OFFSET, channel) for channel in self.channels],
+            bit_orders,
+            bit_offset=-DATA_OFFSET,
+        )
+        self._scaling = scaling(self.channels)
+
+    @classmethod
+    def from_parameters(cls, parameters: Iterable[Any]) -> "SnapshotPlan":
+        """
+        Build the plan from the parameter objects read from the device, as returned
+        by `ScadaParameterParser.parse`.
+        """
+        parameters = list(parameters)
+        system_parameters = next(
+            (item for item in parameters if isinstance(item, SystemParameters)), None
+        )
+        if system_parameters is None:
+            raise ValueError("Parameters do not include the system parameters")
+
+        channels, error_channels, state_channels = find_channels(parameters)
+        return cls(
+            parameter_crc=system_parameters.parameter_crc,
+            channels=channels,
+            error_channels=error_channels,
+            state_channels=state_channels,
+        )
+
+    def decode(self, response: application.ReadInstantaneousValuesResponse) -> Snapshot:
+        """
+        Decode the values in the response. Raises ValueError if the response is from a
+        device with other parameters than the plan was made from.
+        """
+        parameter_crc = int.from_bytes(response.parameter_crc, "little")
+        if parameter_crc != self.parameter_crc:
+            raise ValueError(
+                f"Response has parameter CRC {parameter_crc} but plan was made for "
+                f"{self.parameter_crc}. The parameters need to be read again."
+            )
+        values, errors, states = decode_values(self, response.data)
+        return Snapshot(
+            time=response.current_time,
+            parameter_crc=parameter_crc,
+            values=values,
+            errors=errors,
+            states=states,
+        )
+
+
+@attr.s(auto_attribs=True)
+class SnapshotPlanCache:
+    """
+    Snapshot plans by parameter CRC, the least recently used dropped when there are
+    more than `maxsize`.
+
+    Share a cache between clients only for devices of the same type, since devices
+    with other parameters can have the same 16 bit CRC.
+    """
+
+    maxsize: int = 128
+    _plans: "OrderedDict[int, SnapshotPlan]" = attr.ib(
+        init=False, factory=OrderedDict, repr=False
+    )
+
+    def get(self, parameter_crc: int) -> Optional[SnapshotPlan]:
+        plan = self._plans.get(parameter_crc)
+        if plan is not None:
+            self._plans.move_to_end(parameter_crc)
+        return plan
+
+    def plan_for(self, parameters: Iterable[Any]) -> SnapshotPlan:
+        """
+        The plan for the parameter objects, compiled if there is none for their
+        parameter CRC.
+        """
+        parameters = list(parameters)
+        system_parameters = next(
+            (item for item in parameters if isinstance(item, SystemParameters)), None
+        )
+        if system_parameters is not None:
+            plan = self.get(system_parameters.parameter_crc)
+            if plan is not None:
+                return plan
+        plan = SnapshotPlan.from_parameters(parameters)
+        self._plans[plan.parameter_crc] = plan
+        if len(self._plans) > self.maxsize:
+            self._plans.popitem(last=False)
+        return plan
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+
+def find_channels(
+    parameters: Iterable[Any],
+) -> Tuple[List[ValueChannel], List[BitChannel], List[BitChannel]]:
+    """
+    The values, error flags and binary states of the parameter objects in the
+    instantaneous values.
+    """
+    named = [item for item in parameters if hasattr(item, "name")]
+    channels = list()
+    error_channels = list()
+    state_channels = list()
+    for name, item in zip(unique_names(named), named):
+        address = getattr(item, "address_in_actual_values", 0)
+        if address and getattr(item, "value_format", None):
+            channels.append(
+                ValueChannel(
+                    name=name,
+                    address=address,
+                    format=item.value_format,
+                    parameter=item,
+                )
+            )
+        error_bit_order = getattr(item, "error_bit_order_in_actual_values", 0)
+        if error_bit_order:
+            error_channels.append(BitChannel(name, error_bit_order))
+        bit_order = getattr(item, "bit_order_in_actual_values", 0)
+        if bit_order:
+            state_channels.append(BitChannel(name, bit_order))
+    return channels, error_channels, state_channels
+
+
+def scaling(
+    channels: List[ValueChannel],
+) -> List[Tuple[str, Optional[float], Optional[float]]]:
+    return [
+        (channel.name, channel.digit, channel.value_offset)
+        if channel.is_scaled
+        else (channel.name, None, None)
+        for channel in channels
+    ]
+
+
+def compile_values(
+    placed: List[Tuple[int, ValueChannel]],
+    bit_orders: List[int],
+    bit_offset: int,
+) -> Tuple[struct.Struct, int]:
+    """
+    Make the struct unpacking the channels, at the given offsets in the data, followed
+    by the bytes holding the bit orders. `bit_offset` is the offset in the data of the
+    byte the bit orders count from.
+    Returns the struct and the first bit order in the bytes it unpacks.
+    """
+    position = 0
+    values_format = "<"
+    for offset, channel in placed:
+        if offset < position:
+            raise ValueError(
+                f"{channel.name} at address {channel.address} overlaps the value "
+                f"before it in the instantaneous values"
+            )
+        values_format += f"{offset - position}x{channel.format}"
+        position = offset + channel.size
+
+    first_bit = 0
+    if bit_orders:
+        first_byte = min(bit_orders) // 8
+        last_byte = max(bit_orders) // 8
+        if first_byte + bit_offset < position:
+            raise ValueError("Bit fields overlap the values")
+        values_format += (
+            f"{first_byte + bit_offset - position}x{last_byte - first_byte + 1}s"
+        )
+        first_bit = first_byte * 8
+    return struct.Struct(values_format), first_bit
+
+
+def decode_values(
+    plan, data: bytes
+) -> Tuple[Dict[str, Any], Dict[str, bool], Dict[str, bool]]:
+    """Scaled values, error flags and states of a plan from the data"""
+    try:
+        unpacked = plan.values_struct.unpack_from(data)
+    except struct.error as e:
+        raise ValueError(
+            f"Instantaneous values of {len(data)} bytes are too short, "
+            f"the parameters need {plan.values_struct.size}"
+        ) from e
+
+    values = {
+        name: raw if digit is None else raw * digit + offset
+        for (name, digit, offset), raw in zip(plan._scaling, unpacked)
+    }
+    if plan.error_channels or plan.state_channels:
+        bits = int.from_bytes(unpacked[-1], "little")
+    else:
+        bits = 0
+    first_bit = plan.first_bit
+    errors = {
+        channel.name: bool(bits >> (channel.bit_order - first_bit) & 1)
+        for channel in plan.error_channels
+    }
+    states = {
+        channel.name: bool(bits >> (channel.bit_order - first_bit) & 1)
+        for channel in plan.state_channels
+    }
+    return values, errors, states
@@ -0,0 +1,265 @@
+"""
+Incremental reading of archives.
+
+`ArchiveSync` reads the records of an archive that are newer than the last record
+read before. How far a device has been read is kept as a `Checkpoint` per device and
+archive in a `CheckpointStore`. The checkpoint is only moved after a batch of records
+has been handled, so an interrupted sync continues after the last handled batch.
+
+The archives are ring buffers. If a device has not been read for so long that records
+after the checkpoint were overwritten, the missing record ids are reported as a `Gap`
+and the sync continues from the oldest record the device has.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import *
+
+import attr
+import structlog
+
+from elgas import application, client, constants
+from elgas.archive import ArchiveRecordPlan
+
+LOG = structlog.get_logger("sync")
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Checkpoint:
+    """The last record of an archive that has been handled"""
+
+    device: str
+    archive: constants.Archive
+    record_id: int
+    timestamp: datetime
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Gap:
+    """Records that were overwritten in the device before they were read"""
+
+    device: str
+    archive: constants.Archive
+    first_record_id: int
+    last_record_id: int
+
+    @property
+    def records(self) -> int:
+        return self.last_record_id - self.first_record_id + 1
+
+
+class CheckpointStore(Protocol):
+    """
+    Where `ArchiveSync` keeps how far the archives of each device have been read.
+    `set` must have stored the checkpoint when it returns, since the sync continues
+    after it.
+    """
+
+    def get(self, device: str, archive: constants.Archive) -> Optional[Checkpoint]:
+        """The checkpoint of the archive of device, None if it was never synced"""
+        ...
+
+    def set(self, checkpoint: Checkpoint) -> None:
+        """Store the checkpoint, replacing the one of the same device and archive"""
+        ...
+
+
+@attr.s(auto_attribs=True)
+class MemoryCheckpointStore:
+    checkpoints: Dict[Tuple[str, constants.Archive], Checkpoint] = attr.ib(factory=dict)
+
+    def get(self, device: str, archive: constants.Archive) -> Optional[Checkpoint]:
+        return self.checkpoints.get((device, archive))
+
+    def set(self, checkpoint: Checkpoint) -> None:
+        self.checkpoints[(checkpoint.device, checkpoint.archive)] = checkpoint
+
+
+@attr.s(auto_attribs=True)
+class JsonCheckpointStore:
+    """
+    All checkpoints in one JSON file. The file is replaced on every change so it is
+    never left half written.
+    """
+
+    path: Path = attr.ib(converter=Path)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return dict()
+
+    @staticmethod
+    def _key(device: str, archive: constants.Archive) -> str:
+        return f"{device}/{archive.name}"
+
+    def get(self, device: str, archive: constants.Archive) -> Optional[Checkpoint]:
+        item = self._load().get(self._key(device, archive))
+        if item is None:
+            return None
+        return Checkpoint(
+            device=device,
+            archive=archive,
+            record_id=item["record_id"],
+            timestamp=datetime.fromisoformat(item["timestamp"]),
+        )
+
+    def set(self, checkpoint: Checkpoint) -> None:
+        checkpoints = self._load()
+        checkpoints[self._key(checkpoint.device, checkpoint.archive)] = {
+            "record_id": checkpoint.record_id,
+            "timestamp": checkpoint.timestamp.isoformat(),
+        }
+        fd, temporary = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(checkpoints, file, indent=2, sort_keys=True)
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+@attr.s(auto_attribs=True)
+class SqliteCheckpointStore:
+    """Checkpoints in a SQLite database, safe to share between processes"""
+
+    path: Union[str, Path]
+    _connection: sqlite3.Connection = attr.ib(init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        self._connection = sqlite3.connect(str(self.path))
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "device TEXT NOT NULL, archive INTEGER NOT NULL, "
+                "record_id INTEGER NOT NULL, timestamp TEXT NOT NULL, "
+                "PRIMARY KEY (device, archive))"
+            )
+
+    def close(self):
+        self._connection.close()
+
+    def get(self, device: str, archive: constants.Archive) -> Optional[Checkpoint]:
+        row = self._connection.execute(
+            "SELECT record_id, timestamp FROM checkpoints "
+            "WHERE device = ? AND archive = ?",
+            (device, int(archive)),
+        ).fetchone()
+        if row is None:
+            return None
+        return Checkpoint(
+            device=device,
+            archive=archive,
+            record_id=row[0],
+            timestamp=datetime.fromisoformat(row[1]),
+        )
+
+    def set(self, checkpoint: Checkpoint) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                (
+                    checkpoint.device,
+                    int(checkpoint.archive),
+                    checkpoint.record_id,
+                    checkpoint.timestamp.isoformat(),
+                ),
+            )
+
+
+@attr.s(auto_attribs=True)
+class SyncResult:
+    records: int = 0
+    batches: int = 0
+    gaps: List[Gap] = attr.ib(factory=list)
+    checkpoint: Optional[Checkpoint] = attr.ib(default=None)
+
+
+@attr.s(auto_attribs=True)
+class ArchiveSync:
+    """
+    Reads the records of the plan's archive after the checkpoint of `device`.
+
+    Without a checkpoint the sync starts at `start`, a record id or a timestamp.
+    """
+
+    client: client.ElgasClient
+    plan: ArchiveRecordPlan
+    store: CheckpointStore
+    device: str
+    start: Union[int, datetime] = attr.ib(default=0)
+    amount: int = attr.ib(default=10)
+
+    def run(
+        self, handle_batch: Callable[[application.ReadArchiveResponse], Any]
+    ) -> SyncResult:
+        """
+        Read the new records and call `handle_batch` with each response. The
+        checkpoint is stored after `handle_batch` returns, if it raises the batch is
+        read again by the next sync.
+        """
+        result = SyncResult()
+        checkpoint = self.store.get(self.device, self.plan.archive)
+        start = self.start if checkpoint is None else checkpoint.record_id + 1
+        LOG.info(
+            "Syncing archive",
+            device=self.device,
+            archive=self.plan.archive.name,
+            start=start,
+        )
+
+        expected = start
+        for page in self.client.iter_archive_pages(
+            self.plan, start, amount=self.amount
+        ):
+            count = self.plan.record_count(page.data)
+            if checkpoint is not None:
+                # Records already handled, if the device returns them again.
+                # The page is replaced, not changed, as the client continues after
+                # the records of the page it returned.
+                handled = min(count, max(0, expected - page.oldest_record_id))
+                if handled:
+                    page = attr.evolve(
+                        page,
+                        oldest_record_id=page.oldest_record_id + handled,
+                        data=page.data[handled * self.plan.record_length :],
+                    )
+                    count -= handled
+                    if not count:
+                        continue
+                if page.oldest_record_id > expected:
+                    gap = Gap(
+                        device=self.device,
+                        archive=self.plan.archive,
+                        first_record_id=expected,
+                        last_record_id=page.oldest_record_id - 1,
+                    )
+                    LOG.warning("Records were overwritten before being read", gap=gap)
+                    result.gaps.append(gap)
+
+            handle_batch(page)
+            checkpoint = Checkpoint(
+                device=self.device,
+                archive=self.plan.archive,
+                record_id=page.oldest_record_id + count - 1,
+                timestamp=self.plan.timestamp_at(page.data, count - 1),
+            )
+            self.store.set(checkpoint)
+            expected = checkpoint.record_id + 1
+            result.records += count
+            result.batches += 1
+
+        result.checkpoint = checkpoint
+        LOG.info(
+            "Archive synced",
+            device=self.device,
+            archive=self.plan.archive.name,
+            records=result.records,
+            gaps=len(result.gaps),
+        )
+        return result
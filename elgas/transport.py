@@ -52,6 +52,41 @@ class Timeout:
         self.target_time = time.monotonic() + duration
 
 
+def read_until(transport, expected: bytes, size: Optional[int]) -> bytes:
+    """
+    Read chunks into the read buffer of the transport until it holds the expected
+    sequence, or size bytes, or the timeout of the transport has expired. The data up
+    to and including the sequence is taken out of the buffer and returned.
+    """
+    buffer = transport.read_buffer
+    timeout = Timeout(transport.timeout)
+    search_from = 0
+    while True:
+        index = buffer.find(expected, search_from)
+        if index != -1:
+            end = index + len(expected)
+            break
+        if size is not None and len(buffer) >= size:
+            end = size
+            break
+        if timeout.expired():
+            end = len(buffer)
+            break
+        # The sequence can start in the data already searched.
+        search_from = max(0, len(buffer) - len(expected) + 1)
+        chunk = transport._recv_chunk()
+        if not chunk:
+            end = len(buffer)
+            break
+        buffer += chunk
+
+    if size is not None:
+        end = min(end, size)
+    line = bytes(buffer[:end])
+    del buffer[:end]
+    return line
+
+
 class ElgasTransport(Protocol):
     def connect(self):
         ...
@@ -75,7 +110,10 @@ class BlockingTcpTransport:
     host: str
     port: int
     timeout: int = attr.ib(default=10)
+    read_size: int = attr.ib(default=4096)
     tcp_socket: Optional[socket.socket] = attr.ib(init=False, default=None)
+    # Received data after the last returned frame.
+    read_buffer: bytearray = attr.ib(init=False, factory=bytearray, repr=False)
 
     @property
     def address(self) -> Tuple[str, int]:
@@ -116,6 +154,7 @@ class BlockingTcpTransport:
                 self.tcp_socket = None
                 raise exceptions.CommunicationError from e
             self.tcp_socket = None
+            self.read_buffer.clear()
             LOG.info(f"Connection to {self.address} is closed")
 
     def send(self, data: bytes):
@@ -137,41 +176,28 @@ class BlockingTcpTransport:
             raise exceptions.CommunicationError("Could not receive data") from e
         return data
 
-    def _recv_bytes(self, amount: int):
+    def _recv_chunk(self) -> bytes:
         """
-        Some implementations will return partial data, and we need to keep on trying
-        to read the bytes until we have them all.
+        Read what is available, up to read_size bytes. Blocks until there is data.
+        Raises CommunicationError if the connection is closed by the other side.
         """
         if not self.tcp_socket:
             raise RuntimeError("TCP transport not connected.")
 
-        data = b""
-        while len(data) < amount:
-            data += self.tcp_socket.recv(amount - len(data))
-
+        data = self.tcp_socket.recv(self.read_size)
+        if not data:
+            raise exceptions.CommunicationError("Connection closed by remote")
         return data
 
     def recv_until(self, expected=b"\x0d", size=None):
         """\
         Read until an expected sequence is found ('\r' by default), the size
         is exceeded or until timeout occurs.
+
+        Data is read in chunks and anything received after the expected sequence is
+        kept for the next call.
         """
-        lenterm = len(expected)
-        line = bytearray()
-        timeout = Timeout(self.timeout)
-        while True:
-            c = self._recv_bytes(1)
-            if c:
-                line += c
-                if line[-lenterm:] == expected:
-                    break
-                if size is not None and len(line) >= size:
-                    break
-            else:
-                break
-            if timeout.expired():
-                break
-        return bytes(line)
+        return read_until(self, expected, size)
 
 
 @attr.s(auto_attribs=True)
@@ -183,7 +209,10 @@ class SerialTransport:
     port: str
     baud_rate: int
     timeout: int = attr.ib(default=10)
+    read_size: int = attr.ib(default=4096)
     serial_port: Optional[serial.Serial] = attr.ib(init=False, default=None)
+    # Received data after the last returned frame.
+    read_buffer: bytearray = attr.ib(init=False, factory=bytearray, repr=False)
 
     def connect(self):
         """
@@ -219,6 +248,7 @@ class SerialTransport:
                 self.serial_port = None
                 raise exceptions.CommunicationError from e
             self.serial_port = None
+            self.read_buffer.clear()
             LOG.info(f"Connection to {self.port} is closed")
 
     def send(self, data: bytes):
@@ -240,38 +270,27 @@ class SerialTransport:
             raise exceptions.CommunicationError("Could not receive data") from e
         return data
 
-    def _recv_bytes(self, amount: int):
+    def _recv_chunk(self) -> bytes:
         """
-        Some implementations will return partial data, and we need to keep on trying
-        to read the bytes until we have them all.
+        Read what is available, up to read_size bytes. Blocks until there is data
+        or the timeout of the port expires, then empty bytes are returned.
         """
         if not self.serial_port:
-            raise RuntimeError("TCP transport not connected.")
-
-        data = b""
-        while len(data) < amount:
-            data += self.serial_port.read(amount - len(data))
+            raise RuntimeError("Serial transport not connected.")
 
+        data = self.serial_port.read(1)
+        if data:
+            waiting = min(self.serial_port.in_waiting, self.read_size - 1)
+            if waiting:
+                data += self.serial_port.read(waiting)
         return data
 
     def recv_until(self, expected=b"\x0d", size=None):
         """\
         Read until an expected sequence is found ('\r' by default), the size
         is exceeded or until timeout occurs.
+
+        Data is read in chunks and anything received after the expected sequence is
+        kept for the next call.
         """
-        lenterm = len(expected)
-        line = bytearray()
-        timeout = Timeout(self.timeout)
-        while True:
-            c = self._recv_bytes(1)
-            if c:
-                line += c
-                if line[-lenterm:] == expected:
-                    break
-                if size is not None and len(line) >= size:
-                    break
-            else:
-                break
-            if timeout.expired():
-                break
-        return bytes(line)
+        return read_until(self, expected, size)
@@ -1,8 +1,11 @@
 import random
+import struct
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import *
 
+import attr
+
 
 class SecretStr(str):
     """
@@ -85,6 +88,35 @@ def calculate_drc(data: bytearray) -> int:
     return drc & 0xFF
 
 
+def calculate_redundancy(data: bytes) -> Tuple[int, int, int]:
+    """
+    Calculate LRC, checksum and DRC of the data in one go.
+
+    The checksum is the byte sum. LRC and DRC are both built from XOR: the LRC is the
+    XOR of all bytes and in the DRC each byte is rotated left once for every byte
+    that follows it. Since a rotation of 8 is no rotation, bytes 8 positions apart
+    are rotated the same amount. The data, read as a big endian integer, is folded into
+    a single 8 byte word by XOR-ing its halves, so the byte j positions from the end of
+    the word holds the XOR of all bytes that are rotated j times.
+    """
+    if not data:
+        return 0, 0, 0
+    checksum = sum(data) & 0xFF
+    words = (len(data) + 7) // 8
+    folded = int.from_bytes(data, "big")
+    while words > 1:
+        half = words // 2
+        bits = half * 64
+        folded = (folded >> bits) ^ (folded & ((1 << bits) - 1))
+        words -= half
+    lrc = 0
+    drc = 0
+    for position, byte in enumerate(folded.to_bytes(8, "little")):
+        lrc ^= byte
+        drc ^= ((byte << position) | (byte >> (8 - position))) & 0xFF
+    return lrc, checksum, drc
+
+
 def generate_crc16_table():
     result = []
     for byte in range(256):
@@ -102,11 +134,45 @@ def generate_crc16_table():
 crc16_table = generate_crc16_table()
 
 
+def generate_crc16_slice_tables(amount: int = 8) -> List[List[int]]:
+    """
+    Tables to process several bytes per step (slicing-by-N). Table k gives the CRC
+    contribution of a byte that is followed by k more bytes.
+    """
+    tables = [crc16_table]
+    for _ in range(1, amount):
+        previous = tables[-1]
+        tables.append([(crc >> 8) ^ crc16_table[crc & 0xFF] for crc in previous])
+    return tables
+
+
+_crc16_slices = generate_crc16_slice_tables(8)
+_EIGHT_BYTES = struct.Struct("8B")
+
+
 def calculate_crc(data: bytearray):
+    """
+    CRC16 (Modbus polynomial) of the data, returned byte swapped as used in the
+    encrypted frames. 8 bytes are processed per step using slicing tables.
+    """
+    t0, t1, t2, t3, t4, t5, t6, t7 = _crc16_slices
     crc = 0xFFFF
-    for a in data:
-        idx = crc16_table[(crc ^ a) & 0xFF]
-        crc = ((crc >> 8) & 0xFF) ^ idx
+    whole = len(data) - len(data) % 8
+    for b0, b1, b2, b3, b4, b5, b6, b7 in _EIGHT_BYTES.iter_unpack(
+        memoryview(data)[:whole]
+    ):
+        crc = (
+            t7[(crc ^ b0) & 0xFF]
+            ^ t6[(crc >> 8) ^ b1]
+            ^ t5[b2]
+            ^ t4[b3]
+            ^ t3[b4]
+            ^ t2[b5]
+            ^ t1[b6]
+            ^ t0[b7]
+        )
+    for a in memoryview(data)[whole:]:
+        crc = (crc >> 8) ^ t0[(crc ^ a) & 0xFF]
     result = ((crc << 8) & 0xFF00) | ((crc >> 8) & 0x00FF)
     return result
 
@@ -145,27 +211,60 @@ def return_characters(data: bytes) -> bytes:
 
     It is important to only do one pass as the first pass can result in new combinations
     of escape sequence. Ex '\x1b\x1b\x0e' -> '\x1b\x0e'
+
+    Splitting on '\x1b\x1b' pairs the escape characters from the left, the same way
+    a byte by byte pass would, so the remaining sequences in each part can be replaced
+    independently.
     """
-    in_data = bytearray(data)
-    out = bytearray()
-    while in_data:
-        byte = in_data.pop(0)
-
-        if byte == 0x1B:
-            next_byte = in_data.pop(0)
-            if next_byte == 0x0E:
-                out.append(0x0D)
-            elif next_byte == 0x1B:
+    if _has_incomplete_escape(data):
+        raise ValueError("Data ends with an incomplete escape sequence")
+    return b"\x1b".join(
+        [
+            part.replace(b"\x1b\x0e", b"\x0d").replace(b"\x1b\x0f", b"\x8d")
+            for part in bytes(data).split(b"\x1b\x1b")
+        ]
+    )
+
+
+def _has_incomplete_escape(data: bytes) -> bool:
+    """
+    An odd number of escape characters at the end of the data means the last one is
+    waiting for the byte that follows it.
+    """
+    return (len(data) - len(data.rstrip(b"\x1b"))) % 2 == 1
+
+
+@attr.s(auto_attribs=True)
+class CharacterReturner:
+    """
+    Incremental version of `return_characters`.
+
+    Data can be fed in chunks as it arrives from the transport. An escape character at
+    the end of a chunk is held back until the next chunk decides what it means.
+    The returned characters can be written into a caller supplied buffer.
+    """
+
+    pending_escape: bool = attr.ib(default=False)
+
+    def feed(self, data: bytes, out: Optional[bytearray] = None) -> bytearray:
+        if out is None:
+            out = bytearray()
+        data = bytes(data)
+        if self.pending_escape:
+            data = b"\x1b" + data
+            self.pending_escape = False
+        if _has_incomplete_escape(data):
+            data = data[:-1]
+            self.pending_escape = True
+
+        for index, part in enumerate(data.split(b"\x1b\x1b")):
+            if index:
                 out.append(0x1B)
-            elif next_byte == 0x0F:
-                out.append(0x8D)
-            else:
-                out.append(byte)
-                out.append(next_byte)
-        else:
-            out.append(byte)
+            out += part.replace(b"\x1b\x0e", b"\x0d").replace(b"\x1b\x0f", b"\x8d")
+        return out
 
-    return bytes(out)
+    def reset(self):
+        self.pending_escape = False
 
 
 def pad_password(password: str):
@@ -274,3 +373,88 @@ def parse_ip_address(data: bytes) -> str:
         raise ValueError(f"IP addreess data should be 4 bytes, got {len(data)}")
     numbers = [str(x) for x in data]
     return ".".join(numbers)
+
+
+BASE_DATE = datetime(2000, 1, 1)
+
+_U16_LE = struct.Struct("<H")
+_U16_BE = struct.Struct(">H")
+_U32_LE = struct.Struct("<I")
+_U32_BE = struct.Struct(">I")
+_F32_LE = struct.Struct("<f")
+_F64_LE = struct.Struct("<d")
+
+
+@attr.s(auto_attribs=True)
+class ByteReader:
+    """
+    Reads fields from the front of a buffer without copying or consuming it.
+
+    The reader keeps an offset into a memoryview of the data so each read is a slice or
+    a struct unpack at the current offset. Reading past the end raises ValueError.
+    """
+
+    data: memoryview = attr.ib(converter=memoryview)
+    offset: int = attr.ib(default=0)
+
+    @property
+    def remaining(self) -> int:
+        return len(self.data) - self.offset
+
+    def _advance(self, amount: int) -> int:
+        start = self.offset
+        end = start + amount
+        if amount < 0 or end > len(self.data):
+            raise ValueError(
+                f"Cannot read {amount} bytes at offset {start}, only "
+                f"{self.remaining} bytes left"
+            )
+        self.offset = end
+        return start
+
+    def skip(self, amount: int):
+        self._advance(amount)
+
+    def view(self, amount: int) -> memoryview:
+        start = self._advance(amount)
+        return self.data[start : start + amount]
+
+    def take(self, amount: int) -> bytes:
+        return self.view(amount).tobytes()
+
+    def rest(self) -> bytes:
+        return self.take(self.remaining)
+
+    def u8(self) -> int:
+        return self.data[self._advance(1)]
+
+    def u16(self) -> int:
+        return _U16_LE.unpack_from(self.data, self._advance(2))[0]
+
+    def u16_be(self) -> int:
+        return _U16_BE.unpack_from(self.data, self._advance(2))[0]
+
+    def u32(self) -> int:
+        return _U32_LE.unpack_from(self.data, self._advance(4))[0]
+
+    def u32_be(self) -> int:
+        return _U32_BE.unpack_from(self.data, self._advance(4))[0]
+
+    def f32(self) -> float:
+        return _F32_LE.unpack_from(self.data, self._advance(4))[0]
+
+    def f64(self) -> float:
+        return _F64_LE.unpack_from(self.data, self._advance(8))[0]
+
+    def bcd(self, amount: int) -> int:
+        return from_bcd(self.view(amount))
+
+    def text(self, amount: int) -> str:
+        """Fixed width latin-1 text, cleaned up as in `pretty_text`"""
+        return pretty_text(self.take(amount))
+
+    def seconds_since_2000(self) -> datetime:
+        return BASE_DATE + timedelta(seconds=self.u32())
+
+    def bcd_datetime(self) -> Tuple[datetime, bool, bool]:
+        return bytes_to_datetime(self.view(6))
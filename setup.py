@@ -32,6 +32,9 @@ DEV_PACKAGES = ["pre-commit"] + TEST_PACKAGES
 EXTRAS = {
     "test": TEST_PACKAGES,
     "dev": DEV_PACKAGES,
+    "numpy": ["numpy"],
+    "msgpack": ["msgpack"],
+    "arrow": ["numpy", "pyarrow"],
 }
 
 CLASSIFIERS = [
@@ -108,7 +111,7 @@ setup(
     maintainer_email=EMAIL,
     url=URL,
     project_urls=PROJECT_URLS,
-    packages=find_packages(exclude=("tests",)),
+    packages=find_packages(exclude=("tests", "tests.*", "benchmarks", "benchmarks.*")),
     entry_points={},
     install_requires=REQUIRED,
     extras_require=EXTRAS,
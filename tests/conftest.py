@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from elgas import archive, constants, parser
+from tests.fixtures import (
+    FIRST_TIMESTAMP,
+    RECORD_COUNT,
+    FakeArchiveClient,
+    parameter_data,
+)
+
+
+@pytest.fixture
+def plan():
+    parameters = parser.ScadaParameterParser().parse(parameter_data)
+    return archive.ArchiveRecordPlan.from_parameters(
+        parameters, constants.Archive.DAILY
+    )
+
+
+@pytest.fixture
+def elgas_client(plan):
+    fake = FakeArchiveClient(transport=None, password="0000", password_id=801)
+    fake.record_length = plan.record_length
+    records = bytearray()
+    for index in range(RECORD_COUNT):
+        timestamp = FIRST_TIMESTAMP + timedelta(days=index)
+        seconds = int((timestamp - datetime(2000, 1, 1)).total_seconds())
+        records += plan.record_struct.pack(seconds, *[index] * len(plan.channels))
+    fake.records = bytes(records)
+    return fake
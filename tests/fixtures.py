@@ -0,0 +1,121 @@
+"""
+Sample data shared by the tests and the benchmarks.
+"""
+import math
+import struct
+from datetime import datetime, timedelta
+
+from elgas import application, client, snapshot, utils
+
+# SCADA parameters read from a device, parameter CRC 39397.
+parameter_data = b'\x0e\x01\x00\x83]!\xffs1.16\x00\x10\x02211137_000000001\x00\x0c\xe5\x99\x1e\x10\x0ef\xa6\xcaB\x00\x00\x00\x00\x02\xcd\xcc\x8c?\xb3\x0cA?5\xde.B\n\xd7#?\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x03\x18\xc4B\x8a\x1fC?\xd5\t\x88>\x84\x9eM=\xac\x8b[=\xc6\xdc5<\x00o\x01<\n\xd7#<\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00X\x00\x0e\x00H\x004\x00\x98\x02X\x00\x00\x00\x03\x00\x00\x08\x00\x12\x03\x03\x00\x08\x03\x00\x06h\xa6\xcaB\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00*\x00\x07bar\x00\x00\x00\x00\x00 \xb0C\x00\x00\x00\x00\x00\x00\xa1m\x00\x00\x00\x00\x00\x00\x00\x90MJ/m3\x003\x00\x01\x01\x00\x00\x00\x00\x00A\x005\xe0\xff\x7f\xffw\xee\x12\x00\x00\x00\x00\x00\x00\x00\x00\x001.16\x00\x9a\xfa\x00\x00\x00\x00\xe5!\x00\x00K\x00\x1e\x00\x00\x01\x00\x06\x00\n\x00\x9bPressure p\x00G\x00\x00\x00\x00\x00\x00+++\x00\x00bar\x00\x00\x00\x00\x00\x9a\x00\x9a:\x00\x00\x00\x00\xcd\xccL?\x00\x00\x8cBNy\x87d\x9e\x02Z\x00\x00\x00\n\x00\x00\x00\x00\x02K\x00\x1e\x01\x00\x02\x00\x08\x00\x0c\x00\x9bTemperature t\x00. Vbs\x00}?}\xb0C\x00\x00\x00\x00\x00\x00\x96\x00\x16;\x00\x00H\xc2\x00\x00\xc8\xc1\x00\x00pB\xadTad\xa2\x02\\\x00\x00\x00\x0c\x00\x00\x00\x00AK\x00\x1e\x02\x00\x15\x00\n\x00\x0e\x00\x89Internal temp. A3\x002\x00#\x00\x00\xb0C\x00\x00\x00\x00\x00\x00\x00\x00\x00>\x00\x00\x00\xc3\x00\x00 \xc2\x00\x00\xaaB\x00\x00\x00\x00\x9c\x02\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00K\x00\x1e\x03\x00\x16\x00\x0c\x00\x10\x00\x89Battery voltage A4\x00ax SV\x00\x00\x00\x00\x00\x00\x00h\xe8\x9f;\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x90@\x00\x00\x00\x00\x9c\x02\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00K\x00\x1e\x04\x00\x17\x00\x0e\x00\x12\x00\x81Battery capacity A5\x00\x00\x00\x00%\x00\x00\x00\x00\x00\x00\x00\xc8\x00\xc8:\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xc8B\x00\x00\x00\x00\x9c\x02\x00\x00\x00\x00\x00\x00\x00\x00\x00aK\x00\x1e\x05\x00\x1a\x00\x10\x00\x14\x00\x81GSM signal A6\x00&\x00B\x00F\x00\x91Co%\x00\x00\x00\x00\x00\x00\x00\xc8\x00\xc8:\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xc8B\x00\x00\x00\x00\x9c\x02\x00\x00\x00\x00\x00\x00\x00\x00\x00BF\x00\x1f\x00\x00\xa0\x00\x90\x02\x00\x00P\x00\x81Cover B1\x00\x00\x00\x00\x00\x04B\x00;\x00\x00\'\x00J\x00\x9c\x02\x00\x00\x00\x00\x00      Closed\x00      Opened\x00K\x000\x01\x00\x1e\x00\x91\x02\x00\x00Q\x00QCall window B2\x00 B2\x002\x00\x95\x02\x01!\x00\xb8V\x00\x00\x00\x00\x00\x00\x04     no call\x00      active\x00K\x000\x02\x00\x1f\x00\x92\x02\x00\x00R\x00IService window B3\x00 B3\x003\x01A\x00\x00\x00\x00\x00\x08Q\x01\x00\x00  no service\x00      active\x00F\x00\x1f\x03\x00\x1c\x00\x93\x02\x00\x00S\x00\xc1Modem power supp B4\x00\x00\x00\x00\x9c\x02\x00\x00\x00\x00\x00         Off\x00          On\x00F\x00\x1f\x04\x00\x1b\x00\x94\x02\x00\x00T\x00\xc1External power B5\x00 \x9c}"}\x9c\x02\x00\x00\x00\x00\x00    Power OK\x00 Power error\x00F\x00\x1f\x05\x001\x00\x95\x02\x00\x00U\x00\xc1Ext.power modem B6\x00o%} \x9c\x02\x00\x00\x00\x00\x00    Power OK\x00 Power error\x00Y\x005\x00\x00\x03\x00\x12\x00\x16\x00\x97Primary volume Vm\x00 } } m3\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xf0?} } \x9c\x02\x00\x00\x00\x00\x0e\x00\n\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x0b\x00\x00\x00?\x006\x00\x00\t\x00\x1a\x00\x1e\x00\x97Spare prim. vol. Vs\x00   m3\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xf0?\x00\x16\x00\x12\x00\x00\x00\x00\x0b\x00\x00\x004\x00!\x00\x00\x07\x00"\x00&\x00\x97Base volume Vb\x00} \x95}"}!!m3\x00\x00\x00\x00\x00\x00\x00\x00\x1e\x00\x1a\x00\x00\x00\x023\x00.\x00\x00\x08\x00*\x00.\x00\x97Spare base vol. Vbs\x000}"m3\x00\x00\x00\x00\x00\x00\x00&\x00"\x00\x00\x00\x026\x00"\x00\x00\x04\x002\x006\x00\x8bFlow Q\x00  B3} 3}!A} } } m3/h\x00\x00\x00\x00\x9c\x02\x00\x00\x00\x00.\x00\x00\x00\x012\x00#\x00\x00\n\x006\x00:\x00\x83Base flow Qb\x00}?}#} }<} m3/h\x00\x00\x00\x00\x00\x002\x00\x00\x00\x01F\x00F\x00\x004\x00\x96\x02\x00\x00V\x00\xc1Setpoint Q max S1\x00} }  \x00<\x1cF"\x00\x00    Inactive\x00      Active\x007\x00$\x00\x00\x05\x00:\x00>\x00\x9bConvers.factor C\x00 A5\x00\x00\x00\x00\x01\x0f\x00\x00HC\x00\x00pA\x00\x00\x80?6\x00\x00\x00\x04)\x00/\x00\x00\x06\x00>\x00B\x00\x93Comp. ratio Z/Zb K\x00\x00\x81GS\x00:\x00\x00\x00\x04)\x00J\x00\x00&\x00B\x00F\x00\x91Compressibility Z\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x04)\x00K\x00\x00%\x00F\x00J\x00\x91Base compress. Zb\x00ver B\x00\x00\x00\x00\x00\x04B\x00;\x00\x00\'\x00J\x00N\x00\xc7Status St1\x00Closed\x00     >\x00*\x00\xffo\xea\xec\xff\x0b\xff\xdf\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00M\x01\x8d\x00\x12\x00\x00\x00\x00\x00\x00\x00\x05ATS0=1\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00ATD*99***1#\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00ATH\x00\x00\x00\x00\x00AT+CGDCONT=1,"IP","elvaco.tele2.m2m"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00y\x15Tg4\x81G\x99Bf\x11E\x00y\x15Tg4\x81G\x99Bf\x11E\x00y\x15Tg4\x81G\x00\x00\x00\x00\x00\x00+++\x00\x00\x00\x00\x00y\x15Tg4\x81G\x99B\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+
+# Call to dispatching frame as sent by a modem, with escaped characters.
+call_to_dispatch_frame = (
+    b"\x02"  # STX
+    b"\xfe"  # ID
+    b"\x84\x87"  # Call to dispatching, Type 0x84 grpup 0x87
+    b"\x9c\x00"  # Length: 156 , total data is 159 correct?
+    b"\x00\x00"  # Destination address
+    b"\x00"  # Destination port
+    b"\x01\x00"  # Source address
+    b"\x00"  # Source port
+    b"\x1b\x0f\x00"  # This is length of structure but correct is 141 and only 2. But 141 is forbidden ans is replaced with
+    ## Correct unescaped: \x8d\x00 = 141
+    b"\x02"  # structure version
+    b"@\xa4\x94\xdd\x96\xce\x1b\x1b\xb7\x19Ad\xd5jo\x80\xa4"  # Guid. What is it for? Reveresed byte order?  Not same as docs.
+    b"0000000000000001\x00"  # station ID
+    b"#\x82\x08p\x10cCx\x00\x00"  # ID of SIM-card, Imsi, not iccid: '23820870106343780000'
+    b"\x03Y\x07s g\x06Q"  # ID of modem, ''0359077320670651''
+    b"\x00"  # Protocol 0 = ELGAS2
+    b"\x01\x00"  # address1, ushort = 16 bit? little endian?
+    b"\x00"  # address2 uchar = 8 bit?
+    b"\x1f"  # gprs signal strength = 31
+    b"\x06\x00\x00\x00"  # number of gprs connections, ulong = 6, little endian
+    b"\x9e+b-"  # Time of last gprs connection
+    b"\x00\x00\x00\x00"  # number of gprs errors
+    b"\x00\x00\x00\x00"  # time of last gprs error
+    b"\x01\x00\x00\x00"  # number of resets
+    b"\x91\xca\xaf,"  # time of last reset
+    b"\x98\x00\x00\x00"  # number of tcp data (packets or bytes?)
+    b"\x00\x00\x00\x00"  # number of all data, what is this?
+    ## version 2 data
+    b",@\x8c\x8c"  # serial number of device? how to parse?
+    b"\nGJK"  # ip address ?  10.71.74.75
+    b"\x1d*b-"  # time of last module error
+    b"\x01"  # last modem error
+    b"z\xfe"  # modem battery capacity  How to parse?
+    b"\xcd\x01"  # modem battery voltage, how to parse?
+    # What is the rest?
+    b"01.000\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"  # Firmware
+    b"}"  # LRC
+    b"C"  # Checksum
+    b"+"  # DRC
+    b"\r"  # ETX
+)
+
+
+def make_pdu(plan, raw_values, bit_orders=(), parameter_crc=None) -> bytes:
+    """
+    Instantaneous values response as sent by the device: time, values at their
+    addresses, bit fields and the 19 byte trailer.
+    """
+    data = bytearray(plan.values_struct.size)
+    for channel, value in zip(plan.channels, raw_values):
+        struct.pack_into(
+            "<" + channel.format, data, channel.address - snapshot.DATA_OFFSET, value
+        )
+    for bit_order in bit_orders:
+        data[bit_order // 8 - snapshot.DATA_OFFSET] |= 1 << (bit_order % 8)
+    crc = plan.parameter_crc if parameter_crc is None else parameter_crc
+    pdu = (
+        utils.datetime_to_bytes(datetime(2022, 2, 10, 6, 0, 15))
+        + bytes(data)
+        + b"\x01"
+        + bytes(16)
+        + crc.to_bytes(2, "little")
+    )
+    return pdu
+
+
+def make_response(plan, raw_values, bit_orders=(), parameter_crc=None):
+    return application.ReadInstantaneousValuesResponse.from_bytes(
+        make_pdu(plan, raw_values, bit_orders, parameter_crc)
+    )
+
+
+# A daily archive of RECORD_COUNT records, one per day.
+FIRST_RECORD_ID = 1000
+RECORD_COUNT = 25
+FIRST_TIMESTAMP = datetime(2022, 2, 1, 6, 0)
+
+
+class FakeArchiveClient(client.ElgasClient):
+    """Client that answers archive requests from an archive in memory"""
+
+    records: bytes = b""
+    record_length: int = 0
+    requests = 0
+
+    def _response(self, archive, amount, index):
+        self.requests += 1
+        index = max(index, 0)
+        return application.ReadArchiveResponse(
+            archive=archive,
+            oldest_record_id=FIRST_RECORD_ID + index,
+            data=self.records[
+                index * self.record_length : (index + amount) * self.record_length
+            ],
+        )
+
+    def read_archive(self, archive, amount, oldest_record_id):
+        return self._response(archive, amount, oldest_record_id - FIRST_RECORD_ID)
+
+    def read_archive_by_time(self, archive, amount, oldest_timestamp):
+        return self._response(archive, amount, self._index(oldest_timestamp))
+
+    @staticmethod
+    def _index(timestamp):
+        """Index of the first record at or after timestamp, one record per day"""
+        days = (timestamp - FIRST_TIMESTAMP) / timedelta(days=1)
+        return max(0, math.ceil(days))
@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import pytest
+
+from elgas import application, archive, constants, parser
+from tests.fixtures import parameter_data
+
+# Two daily archive records read with READ_ARCHIVES_BY_DATE.
+daily_archive_response = b"\x03\x01\x00\x00\x00`f\x97)\x00\x00F\x10\x02\"\xa6\x0e\x9b{\xc4\xf5(\\\xa7.\xff@0\x18\xe2z$!\xed@fpi\x9em\xa94A'\x8b\x88\xc1\x92\x8a\xea@\x00\x00\x00\x00\x00\x00\x00\x00}\x96\x81@\x8a\x17~?\x80\x00\x00 \x00\x00\x00\xd0\xcd\xb5\xe0\xb7\x98)\x00\x00F\x11\x02\"\xaa\x0e\xc7|\xc4\xf5(\\\xa7.\xff@0\x18\xe2z$!\xed@fpi\x9em\xa94A'\x8b\x88\xc1\x92\x8a\xea@\x00\x00\x00\x00\x00\x00\x00\x00\x06c\x81@\xc4\x1d~?\x00\x00\x00 \x00\x00\x00\xd05\xbb"
+
+
+@pytest.fixture
+def parameters():
+    return parser.ScadaParameterParser().parse(parameter_data)
+
+
+def test_plan_from_parameters(parameters):
+    plan = archive.ArchiveRecordPlan.from_parameters(parameters)
+    assert plan.archive == constants.Archive.DATA
+    assert plan.record_length == 88
+    assert plan.record_struct.size == 88
+    assert len(plan.channels) == 17
+
+    daily = archive.ArchiveRecordPlan.from_parameters(
+        parameters, constants.Archive.DAILY
+    )
+    assert daily.record_length == 72
+    # Only objects with an address in the daily record.
+    assert "Internal temp. A3 2 #" not in [channel.name for channel in daily.channels]
+
+
+def test_iter_records(parameters):
+    plan = archive.ArchiveRecordPlan.from_parameters(
+        parameters, constants.Archive.DAILY
+    )
+    pdu = application.ReadArchiveByTimeResponse.from_bytes(daily_archive_response)
+    records = list(plan.iter_records(pdu.data))
+    assert len(records) == 2
+    first = records[0]
+    assert first["timestamp"] == datetime(2022, 2, 10, 6, 0)
+    assert first["Pressure p G      +++"] == pytest.approx(4.405875)
+    assert first["Temperature t . Vbs"] == pytest.approx(22.4276627)  # offset -50
+    assert first["Primary volume Vm"] == pytest.approx(127722.46)
+    assert records[1]["timestamp"] == datetime(2022, 2, 11, 6, 0)
+
+
+def test_status_bits_of_real_record(parameters):
+    plan = archive.ArchiveRecordPlan.from_parameters(
+        parameters, constants.Archive.DAILY
+    )
+    pdu = application.ReadArchiveByTimeResponse.from_bytes(daily_archive_response)
+    first, second = plan.iter_records(pdu.data)
+    status = "Status St1 Closed"
+    assert first[status] == 0xD000000020000080
+    assert [bit for bit in range(64) if first[f"{status} bit {bit}"]] == [
+        7,
+        29,
+        60,
+        62,
+        63,
+    ]
+    assert [bit for bit in range(64) if second[f"{status} bit {bit}"]] == [
+        29,
+        60,
+        62,
+        63,
+    ]
+
+
+def test_error_and_state_bits(parameters):
+    plan = archive.ArchiveRecordPlan.from_parameters(
+        parameters, constants.Archive.BINARY
+    )
+    assert plan.record_length == 14
+    assert plan.channels == []
+    # Cover and service window on, pressure measurement in error.
+    record = (694_267_200).to_bytes(4, "little") + bytes(6) + b"\x05\x04" + bytes(2)
+    (decoded,) = plan.iter_records(record)
+    flags = sorted(name for name, value in decoded.items() if value is True)
+    assert [name.split()[0] for name in flags] == ["Cover", "Pressure", "Service"]
+    assert [name.split()[-1] for name in flags] == ["state", "error", "state"]
+    assert decoded["System error"] is False
+
+
+def test_to_columns_matches_records(parameters):
+    np = pytest.importorskip("numpy")
+    plan = archive.ArchiveRecordPlan.from_parameters(
+        parameters, constants.Archive.DAILY
+    )
+    pdu = application.ReadArchiveByTimeResponse.from_bytes(daily_archive_response)
+    columns = plan.to_columns(pdu.data)
+    records = list(plan.iter_records(pdu.data))
+    assert columns["timestamp"].tolist() == [r["timestamp"] for r in records]
+    for channel in plan.channels:
+        assert np.allclose(
+            columns[channel.name].astype(float),
+            [float(r[channel.name]) for r in records],
+        )
+    assert plan.flag_channels
+    for channel in plan.flag_channels:
+        assert columns[channel.name].tolist() == [r[channel.name] for r in records]
+    assert plan.to_array(pdu.data).shape == (2,)
+
+
+def test_data_must_be_whole_records(parameters):
+    plan = archive.ArchiveRecordPlan.from_parameters(parameters)
+    with pytest.raises(ValueError):
+        list(plan.iter_records(b"\x00" * 100))
+
+
+def test_plan_needs_system_parameters(parameters):
+    with pytest.raises(ValueError):
+        archive.ArchiveRecordPlan.from_parameters(parameters[1:])
@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from elgas import async_client, async_transport, exceptions
+from tests.test_connection import read_time_response
+
+
+async def serve(respond):
+    """Start a local server answering each request with `respond(request)`"""
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request = await reader.readuntil(b"\x0d")
+                response = respond(request)
+                if response:
+                    # Sent in two parts, the client must read until it is complete.
+                    for part in (response[:5], response[5:]):
+                        writer.write(part)
+                        await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def make_client(port, timeout=5):
+    return async_client.AsyncElgasClient(
+        transport=async_transport.AsyncTcpTransport("127.0.0.1", port),
+        password="0000",
+        password_id=801,
+        timeout=timeout,
+    )
+
+
+def test_read_time():
+    async def main():
+        server, port = await serve(lambda request: read_time_response)
+        async with server:
+            client = make_client(port)
+            await client.connect()
+            first = await client.read_time()
+            second = await client.read_time()
+            await client.disconnect()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == second == datetime(2006, 5, 30, 12, 33, 10)
+
+
+def test_many_clients_on_one_loop():
+    async def main():
+        server, port = await serve(lambda request: read_time_response)
+        async with server:
+            clients = [make_client(port) for _ in range(50)]
+            await asyncio.gather(*(client.connect() for client in clients))
+            times = await asyncio.gather(*(client.read_time() for client in clients))
+            await asyncio.gather(*(client.disconnect() for client in clients))
+        return times
+
+    assert len(set(asyncio.run(main()))) == 1
+
+
+def test_deadline_exceeded_disconnects():
+    async def main():
+        server, port = await serve(lambda request: None)
+        async with server:
+            client = make_client(port, timeout=5)
+            await client.connect()
+            with pytest.raises(exceptions.DeadlineExceeded):
+                await client.read_time(timeout=0.05)
+            assert client.transport.writer is None
+            # A new session can be started on the same client.
+            await client.connect()
+            await client.disconnect()
+
+    asyncio.run(main())
@@ -0,0 +1,25 @@
+from benchmarks.suite import compare
+
+
+def results(**seconds_per_call):
+    return {
+        "results": {
+            name: {"seconds_per_call": seconds}
+            for name, seconds in seconds_per_call.items()
+        }
+    }
+
+
+def test_compare_finds_regressions():
+    baseline = results(parse=1.0, decode=2.0, encrypt=1.0)
+    current = results(parse=1.3, decode=1.0, encrypt=1.05)
+
+    assert compare(current, baseline, threshold=0.1) == ["parse"]
+    assert compare(current, baseline, threshold=0.5) == []
+
+
+def test_compare_ignores_benchmarks_not_in_both():
+    baseline = results(parse=1.0, removed=1.0)
+    current = results(parse=1.0, added=5.0)
+
+    assert compare(current, baseline, threshold=0.1) == []
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from elgas import bulk, constants, frames, utils
+
+np = pytest.importorskip("numpy")
+
+
+def make_frame(data: bytes) -> bytes:
+    return frames.Response(
+        service=constants.ServiceNumber.READ_DEVICE_TIME,
+        destination_address_1=1,
+        destination_address_2=2,
+        source_address_1=3,
+        source_address_2=4,
+        data=data,
+    ).to_bytes()
+
+
+def test_bulk_redundancy_matches_single_frame_calculation():
+    payloads = [bytes(random.getrandbits(8) for _ in range(n)) for n in range(40)]
+    result = bulk.calculate_redundancy(payloads)
+    for payload, row in zip(payloads, result):
+        assert tuple(row) == utils.calculate_redundancy(payload)
+
+
+def test_validate_frames():
+    good = [make_frame(bytes(range(n))) for n in (0, 1, 13, 200)]
+    bad_drc = bytearray(good[2])
+    bad_drc[-2] ^= 0x01
+    bad_length = bytearray(good[3])
+    bad_length[4] += 1
+    wire = [utils.escape_characters(frame) for frame in good] + [
+        utils.escape_characters(bytes(bad_drc)),
+        utils.escape_characters(bytes(bad_length)),
+        b"\x02\xfe",
+        b"",
+    ]
+    assert bulk.validate_frames(wire).tolist() == [True] * 4 + [False] * 4
+
+
+def test_validate_unescaped_frames():
+    captured = [make_frame(bytes([0x0D, 0x1B, 0x8D]))]
+    assert bulk.validate_frames(captured, escaped=False).tolist() == [True]
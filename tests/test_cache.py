@@ -0,0 +1,90 @@
+import pytest
+
+from elgas import cache, client
+from tests.fixtures import parameter_data
+
+# Parameter CRC in the system parameters of parameter_data
+PARAMETER_CRC = 39397
+
+
+def test_memory_cache_evicts_least_recently_used():
+    memory = cache.MemoryConfigurationCache(max_size=2)
+    first = cache.CacheKey("meter-1", 1)
+    second = cache.CacheKey("meter-2", 1)
+    memory.set(first, b"first")
+    memory.set(second, b"second")
+    assert memory.get(first) == b"first"  # now the most recently used
+    memory.set(cache.CacheKey("meter-3", 1), b"third")
+    assert len(memory) == 2
+    assert memory.get(second) is None
+    assert memory.get(first) == b"first"
+
+
+def test_file_cache(tmp_path):
+    files = cache.FileConfigurationCache(tmp_path / "parameters")
+    key = cache.CacheKey("+46 70/123", PARAMETER_CRC)
+    assert files.get(key) is None
+    files.set(key, parameter_data)
+    assert files.get(key) == parameter_data
+    assert files.get(cache.CacheKey("+46 70/123", 1)) is None
+    # Device ids are made safe to use as file names.
+    assert files.path(key).parent == tmp_path / "parameters"
+    assert [path.name for path in (tmp_path / "parameters").iterdir()] == [
+        files.path(key).name
+    ]
+
+
+def test_file_cache_keeps_devices_with_similar_ids_apart(tmp_path):
+    files = cache.FileConfigurationCache(tmp_path)
+    keys = [cache.CacheKey(device, PARAMETER_CRC) for device in ("a/b", "a_b", "a:b")]
+    assert len({files.path(key) for key in keys}) == len(keys)
+    for key in keys:
+        files.set(key, key.device.encode())
+    assert [files.get(key) for key in keys] == [b"a/b", b"a_b", b"a:b"]
+
+
+class FakeDeviceClient(client.ElgasClient):
+    """Client that answers from memory instead of a device"""
+
+    parameter_crc = PARAMETER_CRC
+    parameter_reads = 0
+
+    def read_parameter_crc(self) -> int:
+        return self.parameter_crc
+
+    def read_parameter_data(self, read_from: int = 0) -> bytes:
+        self.parameter_reads += 1
+        return parameter_data
+
+
+def make_client(configuration_cache):
+    return FakeDeviceClient(
+        transport=None,
+        password="0000",
+        password_id=801,
+        device_id="meter-1",
+        configuration_cache=configuration_cache,
+    )
+
+
+def test_client_reads_parameters_only_when_crc_changes():
+    memory = cache.MemoryConfigurationCache()
+    elgas_client = make_client(memory)
+    first = elgas_client.read_parameters()
+    second = elgas_client.read_parameters()
+    assert elgas_client.parameter_reads == 1
+    assert first == second
+
+    elgas_client.parameter_crc = 1
+    elgas_client.read_parameters()
+    assert elgas_client.parameter_reads == 2
+
+
+def test_client_needs_device_id_for_cache():
+    with pytest.raises(ValueError):
+        client.ElgasClient(
+            transport=None,
+            password="0000",
+            password_id=801,
+            configuration_cache=cache.MemoryConfigurationCache(),
+        )
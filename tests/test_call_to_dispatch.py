@@ -1,49 +1,10 @@
-from elgas.utils import return_characters
-from elgas import application, constants, frames
-
-data = (
-    b"\x02"  # STX
-    b"\xfe"  # ID
-    b"\x84\x87"  # Call to dispatching, Type 0x84 grpup 0x87
-    b"\x9c\x00"  # Length: 156 , total data is 159 correct?
-    b"\x00\x00"  # Destination address
-    b"\x00"  # Destination port
-    b"\x01\x00"  # Source address
-    b"\x00"  # Source port
-    b"\x1b\x0f\x00"  # This is length of structure but correct is 141 and only 2. But 141 is forbidden ans is replaced with
-    ## Correct unescaped: \x8d\x00 = 141
-    b"\x02"  # structure version
-    b"@\xa4\x94\xdd\x96\xce\x1b\x1b\xb7\x19Ad\xd5jo\x80\xa4"  # Guid. What is it for? Reveresed byte order?  Not same as docs.
-    b"0000000000000001\x00"  # station ID
-    b"#\x82\x08p\x10cCx\x00\x00"  # ID of SIM-card, Imsi, not iccid: '23820870106343780000'
-    b"\x03Y\x07s g\x06Q"  # ID of modem, ''0359077320670651''
-    b"\x00"  # Protocol 0 = ELGAS2
-    b"\x01\x00"  # address1, ushort = 16 bit? little endian?
-    b"\x00"  # address2 uchar = 8 bit?
-    b"\x1f"  # gprs signal strength = 31
-    b"\x06\x00\x00\x00"  # number of gprs connections, ulong = 6, little endian
-    b"\x9e+b-"  # Time of last gprs connection
-    b"\x00\x00\x00\x00"  # number of gprs errors
-    b"\x00\x00\x00\x00"  # time of last gprs error
-    b"\x01\x00\x00\x00"  # number of resets
-    b"\x91\xca\xaf,"  # time of last reset
-    b"\x98\x00\x00\x00"  # number of tcp data (packets or bytes?)
-    b"\x00\x00\x00\x00"  # number of all data, what is this?
-    ## version 2 data
-    b",@\x8c\x8c"  # serial number of device? how to parse?
-    b"\nGJK"  # ip address ?  10.71.74.75
-    b"\x1d*b-"  # time of last module error
-    b"\x01"  # last modem error
-    b"z\xfe"  # modem battery capacity  How to parse?
-    b"\xcd\x01"  # modem battery voltage, how to parse?
-    # What is the rest?
-    b"01.000\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"  # Firmware
-    b"}"  # LRC
-    b"C"  # Checksum
-    b"+"  # DRC
-    b"\r"  # ETX
-)
+import asyncio
+from datetime import datetime
 
+from elgas import application, async_client, call_to_dispatch, constants, frames, utils
+from elgas.utils import return_characters
+from tests.fixtures import call_to_dispatch_frame
+from tests.test_connection import read_time_response
 
 corrected_data = (
     b"\x02"
@@ -90,7 +51,7 @@ corrected_data = (
 def test_length_of_data():
     length = 0x9C
 
-    assert len(return_characters(data)) - 1 == length
+    assert len(return_characters(call_to_dispatch_frame)) - 1 == length
 
 
 def test_parse_call_request():
@@ -148,3 +109,83 @@ def test_parse_call_apdu():
     assert call.modem_battery_capacity == 65146
     assert call.modem_battery_voltage == 461
     assert call.firmware_version == "01.000"
+
+
+def test_parse_call_request_burst():
+    frame = memoryview(corrected_data)
+    calls = [application.CallRequest.from_bytes(frame[12:-4]) for _ in range(1000)]
+    assert all(call == calls[0] for call in calls)
+    assert calls[0].serial_number == "2358001708"
+
+
+async def modem(port):
+    """A device calling in and then answering a read time request"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(call_to_dispatch_frame)
+    response = await reader.readuntil(b"\x0d")
+    await reader.readuntil(b"\x0d")  # read time request
+    writer.write(read_time_response)
+    await writer.drain()
+    await reader.read()  # until the server closes the connection
+    writer.close()
+    return frames.Response.from_bytes(utils.return_characters(response))
+
+
+def test_call_is_answered_and_device_read():
+    device_times = list()
+
+    async def handler(call, transport):
+        client = async_client.AsyncElgasClient(
+            transport=transport, password="0000", password_id=801
+        )
+        device_times.append((call.station_id, await client.read_time()))
+
+    async def main():
+        server = call_to_dispatch.CallToDispatchServer(handler)
+        listening = await server.start("127.0.0.1", 0)
+        port = listening.sockets[0].getsockname()[1]
+        async with listening:
+            responses = await asyncio.gather(*(modem(port) for _ in range(20)))
+        return server, responses
+
+    server, responses = asyncio.run(main())
+    assert server.calls == 20
+    assert server.active_sessions == 0
+    assert all(response.data == b"" for response in responses)
+    assert responses[0].destination_address_1 == 1
+    assert device_times[0] == ("0000000000000001", datetime(2006, 5, 30, 12, 33, 10))
+    assert len(device_times) == 20
+
+
+def test_connections_without_session_are_closed():
+    async def main():
+        done = asyncio.Event()
+
+        async def handler(call, transport):
+            await done.wait()
+
+        server = call_to_dispatch.CallToDispatchServer(
+            handler, max_sessions=1, wait_for_session=0.05
+        )
+        listening = await server.start("127.0.0.1", 0)
+        port = listening.sockets[0].getsockname()[1]
+        async with listening:
+            first_reader, first_writer = await asyncio.open_connection(
+                "127.0.0.1", port
+            )
+            first_writer.write(call_to_dispatch_frame)
+            await first_reader.readuntil(b"\x0d")
+
+            second_reader, second_writer = await asyncio.open_connection(
+                "127.0.0.1", port
+            )
+            # Closed by the server without an answer.
+            assert await second_reader.read() == b""
+            second_writer.close()
+            done.set()
+            first_writer.close()
+        return server
+
+    server = asyncio.run(main())
+    assert server.rejected == 1
+    assert server.calls == 1
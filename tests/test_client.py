@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+from tests.fixtures import FIRST_RECORD_ID, FIRST_TIMESTAMP, RECORD_COUNT
+
+
+def test_iter_archive_pages_to_end(elgas_client, plan):
+    pages = list(elgas_client.iter_archive_pages(plan, FIRST_RECORD_ID, amount=10))
+    assert [page.oldest_record_id for page in pages] == [1000, 1010, 1020]
+    assert sum(plan.record_count(page.data) for page in pages) == RECORD_COUNT
+    # The last request returns no records.
+    assert elgas_client.requests == 4
+
+
+def test_iter_archive_pages_between_record_ids(elgas_client, plan):
+    pages = list(elgas_client.iter_archive_pages(plan, 1003, 1014, amount=5))
+    assert [plan.record_count(page.data) for page in pages] == [5, 5, 2]
+    assert elgas_client.requests == 3
+
+
+def test_iter_archive_pages_end_on_page_boundary(elgas_client, plan):
+    pages = list(elgas_client.iter_archive_pages(plan, 1000, 1009, amount=5))
+    assert [plan.record_count(page.data) for page in pages] == [5, 5]
+    # No request after the page with the end record.
+    assert elgas_client.requests == 2
+
+    elgas_client.requests = 0
+    pages = list(
+        elgas_client.iter_archive_pages(
+            plan, FIRST_TIMESTAMP, FIRST_TIMESTAMP + timedelta(days=3), amount=4
+        )
+    )
+    assert [plan.record_count(page.data) for page in pages] == [4]
+    assert elgas_client.requests == 1
+
+
+def test_iter_archive_records_between_timestamps(elgas_client, plan):
+    records = list(
+        elgas_client.iter_archive_records(
+            plan, datetime(2022, 2, 3), datetime(2022, 2, 9, 6, 0), amount=4
+        )
+    )
+    assert [record["timestamp"].day for record in records] == list(range(3, 10))
+    assert elgas_client.requests == 2
+
+
+def test_iter_archive_records_empty_range(elgas_client, plan):
+    assert list(elgas_client.iter_archive_records(plan, 1010, 1005)) == []
@@ -0,0 +1,86 @@
+import attr
+import pytest
+
+from elgas import archive, configuration, constants, parser
+from elgas.parameters.enumerations import ParameterObjectType
+from tests.fixtures import parameter_data
+
+
+@pytest.fixture
+def config():
+    return configuration.Configuration(
+        parser.ScadaParameterParser().parse(parameter_data)
+    )
+
+
+def test_lookups(config):
+    assert len(config) == 26
+    assert config.parameter_crc == 39397
+    assert config.by_id(3).name == "Primary volume Vm"
+    assert config.by_id(9999) is None
+    assert config.by_name("Base volume Vb") is config.by_id(7)
+    assert config.by_number(1, ParameterObjectType.ANALOG_MEASURAND).id == 2
+    assert len(config.of_type(ParameterObjectType.ANALOG_MEASURAND)) == 6
+    assert config.of_type(ParameterObjectType.ENERGY) == []
+
+
+def test_address_lookups(config):
+    plan = archive.ArchiveRecordPlan.from_parameters(config, constants.Archive.DAILY)
+    for channel in plan.channels:
+        assert config.in_archive(constants.Archive.DAILY, channel.address) is (
+            channel.parameter
+        )
+        assert config.by_name(channel.name) is channel.parameter
+        assert config.name_of(channel.parameter) == channel.name
+    primary = config.by_id(3)
+    assert config.in_actual_values(primary.address_in_actual_values) is primary
+    assert config.in_actual_values(0) is None
+    cover = config.by_id(160)
+    assert config.at_bit_order(cover.bit_order_in_actual_values) is cover
+
+
+def test_references(config):
+    base_volume = config.by_id(7)
+    assert config.primary_counter(base_volume) is config.by_id(3)
+    assert config.conversion(base_volume) is config.by_id(5)
+    conversion = config.by_id(5)
+    assert config.references(conversion) == {
+        "number_of_analog_pressure": config.by_id(1),
+        "number_of_analog_temperature": config.by_id(2),
+    }
+    assert config.standard_counter(config.by_id(8)) is base_volume
+    assert config.primary_counter(config.by_id(1)) is None
+
+
+def test_primary_quantity_of_set_point(config):
+    set_point = config.of_type(ParameterObjectType.SET_POINT)[0]
+    flow = config.by_name("Flow Q")
+    assert set_point.type_of_primary_quantity == ParameterObjectType.FLOW_RATE
+    assert config.primary_quantity(set_point) is flow
+    assert config.references(set_point) == {"number_of_primary_quantity": flow}
+    assert (
+        configuration.referenced_types(
+            attr.evolve(set_point, type_of_primary_quantity=255),
+            "number_of_primary_quantity",
+        )
+        == ()
+    )
+
+
+def test_by_number_is_the_same_for_parameter_sets(config):
+    parameters = parser.ScadaParameterParser().index(parameter_data)
+    for object_types in (
+        ParameterObjectType.ANALOG_MEASURAND,
+        (ParameterObjectType.COUNTER, ParameterObjectType.DOUBLE_COUNTER),
+        ParameterObjectType.ENERGY,
+    ):
+        for number in range(3):
+            assert parameters.by_number(number, object_types) == config.by_number(
+                number, object_types
+            )
+
+
+def test_from_parameter_set():
+    parameters = parser.ScadaParameterParser().index(parameter_data)
+    config = configuration.Configuration(parameters)
+    assert config.by_id(3) is parameters.by_id(3)
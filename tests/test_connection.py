@@ -0,0 +1,82 @@
+import pytest
+
+from elgas import application, connection, exceptions, state, utils
+
+# Read time response, already escaped as on the wire.
+read_time_response = bytes.fromhex("02FE866C17000000000200021033123005060C2D20D49B0D")
+
+
+def make_connection() -> connection.ElgasConnection:
+    return connection.ElgasConnection(
+        source_address_1=0,
+        source_address_2=0,
+        destination_address_1=0,
+        destination_address_2=0,
+        password="123456",
+        password_id=801,
+    )
+
+
+def test_need_data_until_frame_is_complete():
+    conn = make_connection()
+    conn.send(application.ReadTimeRequest())
+    for byte in read_time_response[:-1]:
+        conn.receive_data(bytes([byte]))
+        assert conn.next_event() is state.NEED_DATA
+    assert conn.scan_position == len(read_time_response) - 1
+
+    conn.receive_data(read_time_response[-1:])
+    assert isinstance(conn.next_event(), application.ReadTimeResponse)
+    assert conn.buffer == bytearray()
+
+
+def test_bytes_after_frame_are_kept():
+    conn = make_connection()
+    conn.send(application.ReadTimeRequest())
+    conn.receive_data(read_time_response + read_time_response[:5])
+    assert isinstance(conn.next_event(), application.ReadTimeResponse)
+    assert conn.buffer == bytearray(read_time_response[:5])
+
+
+def test_events_drains_all_frames():
+    conn = make_connection()
+    conn.receive_data(read_time_response * 3)
+    frames = list()
+    while True:
+        frame = conn.next_frame()
+        if frame is None:
+            break
+        frames.append(frame)
+    assert frames == [utils.return_characters(read_time_response)] * 3
+
+    conn.send(application.ReadTimeRequest())
+    conn.receive_data(read_time_response)
+    assert [type(event) for event in conn.events()] == [application.ReadTimeResponse]
+
+
+def test_invalid_frame_raises_framing_error_and_is_dropped():
+    conn = make_connection()
+    conn.send(application.ReadTimeRequest())
+    broken = bytearray(read_time_response)
+    broken[-2] ^= 0xFF  # DRC
+    conn.receive_data(bytes(broken) + read_time_response)
+    with pytest.raises(exceptions.FramingError):
+        conn.next_event()
+    assert isinstance(conn.next_event(), application.ReadTimeResponse)
+
+
+def test_wrong_length_field_is_framing_error():
+    conn = make_connection()
+    wrong_length = bytearray(read_time_response)
+    wrong_length[4] += 1
+    conn.receive_data(bytes(wrong_length))
+    with pytest.raises(exceptions.FramingError):
+        conn.next_event()
+    assert conn.next_event() is state.NEED_DATA
+
+
+def test_stray_end_char_is_ignored():
+    conn = make_connection()
+    conn.send(application.ReadTimeRequest())
+    conn.receive_data(b"\x0d" + read_time_response)
+    assert isinstance(conn.next_event(), application.ReadTimeResponse)
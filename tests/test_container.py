@@ -0,0 +1,60 @@
+import pytest
+
+from elgas import container, parser
+from elgas.parameters.enumerations import ParameterObjectType
+from tests.fixtures import parameter_data
+
+
+def test_open_container(tmp_path):
+    path = tmp_path / "device.elgp"
+    container.write(path, parameter_data)
+
+    with container.ParameterContainer.open(path, verify=True) as opened:
+        assert opened.version == container.VERSION
+        assert opened.parameter_crc == 39397
+        assert opened.service_version == 16
+        assert opened.serial_number == 1946100061
+        assert opened.data == parameter_data
+        assert opened.parameters.decoded == 0
+        assert opened.parameters.by_id(3).name == "Primary volume Vm"
+        assert opened.parameters.decoded == 1
+        parameters = list(opened.parameters)
+        assert parameters == parser.ScadaParameterParser().parse(parameter_data)
+
+    # Decoded objects do not refer to the mapped file.
+    assert parameters[0].object_type == ParameterObjectType.SYSTEM_PARAMETER
+
+
+def test_close_while_data_is_used(tmp_path):
+    path = tmp_path / "device.elgp"
+    container.write(path, parameter_data)
+
+    opened = container.ParameterContainer.open(path, verify=True)
+    data = opened.data
+    view = memoryview(data)[10:20]
+    primary_volume = opened.parameters.by_id(3)
+    opened.close()
+
+    assert view.tobytes() == parameter_data[10:20]
+    assert primary_volume.name == "Primary volume Vm"
+    with pytest.raises(ValueError):
+        opened.data
+    with pytest.raises(ValueError):
+        opened.parameters.by_id(7)
+
+
+def test_invalid_containers():
+    packed = container.pack(parameter_data)
+    assert len(container.ParameterContainer.from_bytes(packed).parameters) == 26
+
+    with pytest.raises(container.ContainerError):
+        container.ParameterContainer.from_bytes(b"JSON" + packed[4:])
+    with pytest.raises(container.ContainerError):
+        container.ParameterContainer.from_bytes(packed[:4] + b"\x02\x00" + packed[6:])
+    with pytest.raises(container.ContainerError):
+        container.ParameterContainer.from_bytes(packed[:-1])
+
+    corrupted = packed[:-1] + bytes([packed[-1] ^ 0xFF])
+    container.ParameterContainer.from_bytes(corrupted)
+    with pytest.raises(container.ContainerError):
+        container.ParameterContainer.from_bytes(corrupted, verify=True)
@@ -0,0 +1,83 @@
+import io
+from datetime import datetime
+
+import pytest
+
+from elgas import application, archive, constants, export, parser
+from tests.fixtures import parameter_data
+
+pa = pytest.importorskip("pyarrow")
+ds = pytest.importorskip("pyarrow.dataset")
+
+# Records every 6 hours from 2021-12-31 12:00, over three days.
+TIMESTAMPS = [694_267_200 + index * 6 * 3600 for index in range(10)]
+
+
+def make_plan():
+    parameters = parser.ScadaParameterParser().parse(parameter_data)
+    return archive.ArchiveRecordPlan.from_parameters(parameters)
+
+
+def make_page(plan, oldest_record_id, timestamps):
+    data = b"".join(
+        plan.record_struct.pack(
+            timestamp, *[index + 1 for index, _ in enumerate(plan.channels)]
+        )
+        for timestamp in timestamps
+    )
+    return application.ReadArchiveResponse(
+        archive=constants.Archive.DATA, oldest_record_id=oldest_record_id, data=data
+    )
+
+
+def test_record_batch_matches_decoded_records():
+    plan = make_plan()
+    page = make_page(plan, 100, TIMESTAMPS)
+    batch = export.to_record_batch(plan, page)
+
+    assert batch.num_rows == 10
+    assert batch.column("record_id").to_pylist() == list(range(100, 110))
+    rows = batch.to_pylist()
+    for row, record in zip(rows, plan.iter_records(page.data)):
+        assert row.pop("record_id")
+        assert row == record
+    assert rows[0]["timestamp"] == datetime(2021, 12, 31, 12)
+
+    pressure = batch.schema.field("Pressure p G      +++")
+    assert pressure.type == pa.float64()
+    assert pressure.metadata[b"unit"] == b"bar"
+    assert pressure.metadata[b"digit"] == b"0.0011749"
+    assert batch.schema.metadata[b"archive"] == b"DATA"
+
+    status = batch.schema.field("Status St1 Closed bit 7")
+    assert status.type == pa.bool_()
+    assert status.metadata[b"bit_order"] == str(78 * 8 + 7).encode()
+
+
+def test_write_stream():
+    plan = make_plan()
+    pages = [make_page(plan, 1, TIMESTAMPS[:5]), make_page(plan, 6, TIMESTAMPS[5:])]
+    sink = io.BytesIO()
+    assert export.write_stream(sink, plan, pages, {"device": "1234"}) == 10
+    table = pa.ipc.open_stream(sink.getvalue()).read_all()
+    assert table.num_rows == 10
+    assert table.schema.metadata[b"device"] == b"1234"
+
+
+def test_parquet_partitions(tmp_path):
+    plan = make_plan()
+    with export.ParquetArchiveWriter(tmp_path, "gas/1", plan) as writer:
+        writer.write(make_page(plan, 1, TIMESTAMPS[:3]))
+        writer.write(make_page(plan, 4, TIMESTAMPS[3:]))
+    assert writer.written == 10
+
+    files = sorted(
+        str(path.relative_to(tmp_path)) for path in tmp_path.rglob("*.parquet")
+    )
+    assert files == [
+        "device=gas_1/archive=DATA/day=2021-12-31/1.parquet",
+        "device=gas_1/archive=DATA/day=2022-01-01/3.parquet",
+        "device=gas_1/archive=DATA/day=2022-01-02/7.parquet",
+    ]
+    table = ds.dataset(tmp_path, partitioning="hive").to_table()
+    assert sorted(table.column("record_id").to_pylist()) == list(range(1, 11))
@@ -0,0 +1,120 @@
+import asyncio
+
+from elgas import exceptions, fleet
+from tests.test_async_client import serve
+from tests.test_connection import read_time_response
+
+
+def make_targets(port, count):
+    return [
+        fleet.DeviceTarget(
+            name=f"meter-{index}",
+            host="127.0.0.1",
+            port=port,
+            password="0000",
+            password_id=801,
+        )
+        for index in range(count)
+    ]
+
+
+def test_results_for_all_targets_and_jobs():
+    async def main():
+        server, port = await serve(lambda request: read_time_response)
+        async with server:
+            poller = fleet.FleetPoller(max_sessions=4, max_sessions_per_host=2)
+            results = list()
+            summary = await poller.run(
+                make_targets(port, 10),
+                [fleet.ReadTime(), fleet.ReadTime()],
+                results.append,
+            )
+        return results, summary
+
+    results, summary = asyncio.run(main())
+    assert len(results) == 20
+    assert all(result.ok for result in results)
+    assert summary.devices == 10
+    assert summary.jobs == 20
+    assert summary.devices_failed == 0
+    assert summary.bytes_received == 20 * len(read_time_response)
+    assert summary.devices_per_minute > 0
+
+
+def test_deadline_fails_rest_of_session():
+    async def main():
+        server, port = await serve(lambda request: None)
+        async with server:
+            poller = fleet.FleetPoller()
+            return [
+                result
+                async for result in poller.results(
+                    make_targets(port, 2),
+                    [fleet.ReadTime(timeout=0.05), fleet.ReadTime()],
+                )
+            ], poller.summary
+
+    results, summary = asyncio.run(main())
+    assert len(results) == 4
+    assert all(
+        isinstance(result.error, exceptions.DeadlineExceeded) for result in results
+    )
+    assert summary.devices_failed == 2
+
+
+def test_unreachable_device():
+    async def main():
+        server, port = await serve(lambda request: None)
+        server.close()
+        await server.wait_closed()
+        poller = fleet.FleetPoller()
+        return [
+            result
+            async for result in poller.results(
+                make_targets(port, 1), [fleet.ReadTime()]
+            )
+        ]
+
+    (result,) = asyncio.run(main())
+    assert isinstance(result.error, exceptions.CommunicationError)
+
+
+def test_stopping_iteration_cancels_sessions():
+    async def main():
+        server, port = await serve(lambda request: read_time_response)
+        async with server:
+            poller = fleet.FleetPoller(max_sessions=1)
+            results = poller.results(make_targets(port, 5), [fleet.ReadTime()])
+            first = await results.__anext__()
+            await results.aclose()
+        return first, poller.summary
+
+    first, summary = asyncio.run(main())
+    assert first.ok
+    assert summary.devices < 5
+
+
+class BrokenTarget(fleet.DeviceTarget):
+    def make_transport(self):
+        raise RuntimeError("No transport")
+
+
+def test_unexpected_session_error_fails_jobs():
+    async def main():
+        poller = fleet.FleetPoller()
+        target = BrokenTarget(
+            name="broken", host="127.0.0.1", port=1, password="0000", password_id=801
+        )
+        results = [
+            result
+            async for result in poller.results(
+                [target], [fleet.ReadTime(), fleet.ReadParameters()]
+            )
+        ]
+        return results, poller.summary
+
+    results, summary = asyncio.run(asyncio.wait_for(main(), 5))
+    assert [result.job.name for result in results] == ["read_time", "read_parameters"]
+    assert all(isinstance(result.error, RuntimeError) for result in results)
+    assert summary.jobs_failed == 2
+    assert summary.devices_failed == 1
@@ -1,7 +1,29 @@
-from elgas import frames, utils
+from elgas import constants, frames, utils
+from tests.fixtures import call_to_dispatch_frame
 
 
 def test_failing_lrc():
     data = b'\x02\xfe\x87}\x92\x03\x00\x00\x00\x01\x00\x00u\x03\x03\x00\x1a\xfc\x06`\xa4\x9cG]\x9f\xa4LX[\xa0-\xff\xe2\x8f\x02\xcd\xea\xe6\xeb0\xb7c\xa1\x95\x17\x19\xda\x91\xea\xe0\xbf\x08\x19{\xf5s\x9e\xe4\x0fRq\xce\xdb\x0br\x0c)\x94\x97|N\xf2#\xc8\xa4\x0c\x896<\x9b\xfa\xc3C4\x97\xc8\xbf\x0e\x12\xfaN\xbd|\x97m\xec\x9f\x08x\xdd|\x91\xc0\xf0*s\x84\x18\xc0:\t\xd3\xd5\xcc\xcfm\xcc`N\xdc\xdc\x04L6\x96\xfa\x1d\xfe\xb8\x80\xb8v`\x88\x8c\xcf\xc9F\xca\x9a\x05\xe1\xb49\xaa\x85\x1e\xdd\xb6v\x85\x89a\x95(\xa4\xb8\xa0\x0bS\xaesYvS\x81\xcfv\n\xc2R\xf5V\xad\x8e\xe8\x82\xeae,\x07\xbcc\xae\xf7\x87\x9c\x1aX6\x13);\x92\x98\x1b\x0f\x16W\x01?c\xde\xf5\xaa\x9f\xfc\x02\xacqY\xe8<\xd0\xac\xf2\xc3/\xaa\x9cE\xf7\x16\x82o\xba=\x11\x01\xd1z\xe74N\xfb\x8e\xf6"\xf2q=\xe1#\xc4&[\x9bDjF;\x92_\x1e\xa0\xf3\x91[\xaf\x96_)\xc9^~\x1b\x1b\x12>L9\xdf\xa9\x1fS\xc1M\x9bz\xd2\x10\xde\xff\xe9d\xf2&N\xd2L1\xf2k)\xc2S\xbc\xed\x84\x15\xafwa \x15\nC\xd2\x02\xdaS\\\x9f\xaa\xf6\x9d\xc8\xda\x18p1\x83\xb0\xc5l\x11\x9c\xdb(C>\x80\x9c\xfeM$`\xda\x10Q\xd9\x9a\xe8k\xddo\xcc\xe8<\x85\xa1u\x1b\x0f<\xe1\xc1fn\x13\xed\x8a\x00\xccv\xc05\x9f"U\x9bt\x02\xb4q\xd4\xafrw\x90\x87\xec~5\xa2\xfd~+\xe9\xe6\xcd\x00>!\x83/\xb5\x1c@\xf5\xbcj\xe1\xb6\x02c\xfe\xe0$Y\xee\x98}G\xb8\x1a\x99\x04\x7f\x95\xe7\x12\xae\x07\xb2e6\x11b\x11\x7f\xbcH]5\xae\xab\x11\xbf\xa4\x18u+\x9f\'\x9d\x9b\xac\xce\xb5{{\xc8\xca6\xa9\xf1\xc4=\x1e\x9c\xa0\x18\x17\xb2\x02b\xc1\xc1=V\xa6\x99\xf9ZWLo*\xe0F\x08\x1a\xe7\xdcc\x7fa&\x8bt\xb5\xf1\xce8\x9f\xc1\x9d\x83\x1a\x15\xca\x02\xce}\xb3H\x07\x8fo\xbc.\x0c\xb5b\x1b\x1b\x0e\xb3\x9e\xb1\x90\xc1n\xb8\xd1?-:\xd5\xd8\xd8\x1b\x1b\x08\xbd\xc5\xb2\x9b*P\x1f\x08\xb1\\\xf7<L\x1b\x0ej\xea\x81\x9f\xbcS7\x1b\x1b\xbbI\xd9\x7f\x8ac p\xbe\xad^\x05\\\x08{\xf5"\xbb/$=\xb3\xbb\xb5\xf7\xec\xdd\xfe\x82\x8a\x10\xa8\x0e\x18`\xc0\x9b\x84Yc\xc6\x03\xdb\xc4\xfc\xd0=5ez\x99\xc1PX\xa4\xd4=E\x0b\xd1o\x80\x08#\xd0\x82r\x7fl\xc9P\xc5\xc0\xcc\x0e\x06"Y\xf7\xf08\xb3\xdb\xd1\x03~\xae\xd2\x9c\xe1\x80y\x18\x08\xf1\x14![(t\x9aG=poNyp\xc4K$oS^\xd2h\x08\xb8)^<sG\xa7\x10*[\x1b\x0fr\xcc\xc9\xac!\xbe\xbf\xe2u^82\xce\xd9\xa6HS\xf3\x0e\x07\x9f\x86\x9c\xd6\xbb\x84\xdbF\x11m\xadt\xb7\t%\x10\x03\xd1V\xb3\x87\x8e\x06\x9a\xb20Wo\xee\xcal\x90\xe1c\xcc\xf9\xcd\xa7\xee\xfaA|E\x8b\x8e\xde\xf3\x95u\xac7\xccb\xa2\xe0@\x07\xfd\x19%\'\x99_\xf2#\xc3\x07\xc5!.\xc8\x93\x1fGO\xb5fz\t\xdf\x15\xb7!\xdby\'\xd6\x85\xd4\xf1\xa1\xdc\xb2\xd0\x93\x19\x80\x9eO\x0b\x1c\xb7\x18C\xdf\xb9r`\xcd\x92\xf4OMR\x90\x87(\xa7\x81\xf6\x91NL\xe8i1;\xc3Uu\x9c\xec\x1b\x0f`kg\x8a\x8al\xf9\xb0\xfaw\xc8B9\x17\xf19\x8f\xfe\xd7v\x96\xf99\x00\xe2\xba\x1d\xe1v\x0b\x00\xd7\xdf\x0c\x07\x83\x99>\x17\x83\xf2\x16\xee\xcc\xf2\x9a]"\xd6\xf7\x87S\xad\x85\xc1\xa7\xa8\xb5\x89\\\x1cp$+\xe1K\xef/\x97\x97r\x07OPQU\xbd&O\xe1d\r'
 
     frames.EncryptedResponse.from_bytes(utils.return_characters(data))
+
+
+def test_request_addresses_are_little_endian():
+    request = frames.Request(
+        service=constants.ServiceNumber.READ_DEVICE_TIME,
+        destination_address_1=0x0102,
+        destination_address_2=3,
+        source_address_1=0x0405,
+        source_address_2=6,
+        data=b"",
+    )
+    data = request.to_bytes()
+
+    assert data[6:12] == b"\x02\x01\x03\x05\x04\x06"
+    assert frames.Request.from_bytes(data) == request
+
+
+def test_request_addresses_of_call_to_dispatch_frame():
+    request = frames.Request.from_bytes(utils.return_characters(call_to_dispatch_frame))
+    assert request.source_address_1 == 1
+    assert request.to_bytes()[9:11] == b"\x01\x00"
@@ -1,10 +1,15 @@
+import struct
 from pprint import pprint
 
+import attr
+import pytest
+
 import elgas.parameters.analog_quantity
 import elgas.parameters.binary
 import elgas.parameters.compressibility
 import elgas.parameters.conversion_coefficient
 import elgas.parameters.counter
+import elgas.parameters.device_error
 import elgas.parameters.diagnostics
 import elgas.parameters.error_counter
 import elgas.parameters.error_standard_counter
@@ -16,6 +21,7 @@ import elgas.parameters.system_parameters
 import elgas.parameters.time_window
 from elgas import parameters
 from elgas.application import ReadDeviceParametersResponse
+from elgas.parameters.layout import LayoutError
 
 
 def test_parameter_0():
@@ -221,3 +227,79 @@ def test_parameter_type_141():
     )
     modem = elgas.parameters.modem.Modem.from_bytes(data1)
     print(modem)
+
+
+def test_optional_decimals_are_none_when_not_sent():
+    data1 = bytearray(
+        b"\x00\x00\x04\x002\x006\x00\x8bFlow Q\x00  B3} 3}!A} } } m3/h\x00\x00\x00\x00\x9c\x02\x00\x00\x00\x00.\x00\x00\x00\x01"
+    )
+    flow_rate = elgas.parameters.flow_rate.FlowRate.from_bytes(data1)
+    assert flow_rate.decimals == 1
+    assert flow_rate.name == "Flow Q"
+    assert flow_rate.unit == "m3/h"
+    assert flow_rate.in_data_archive
+    without_decimals = elgas.parameters.flow_rate.FlowRate.from_bytes(data1[:-1])
+    assert without_decimals.decimals is None
+    assert without_decimals.name == flow_rate.name
+
+
+def test_layout_decodes_from_offset_in_larger_buffer():
+    data1 = bytearray(
+        b"\x00\x00\n\x006\x00:\x00\x83Base flow Qb\x00}?}#} }<} m3/h\x00\x00\x00\x00\x00\x002\x00\x00\x00\x01"
+    )
+    klass = elgas.parameters.flow_rate.StandardFlowRate
+    in_buffer = klass.layout.decode(klass, memoryview(b"\xff" * 7 + data1), 7)
+    assert in_buffer == klass.from_bytes(data1)
+
+
+def test_layout_sets_slots_of_frozen_objects():
+    data1 = bytearray(
+        b"\x00\x00\n\x006\x00:\x00\x83Base flow Qb\x00}?}#} }<} m3/h\x00\x00\x00\x00\x00\x002\x00\x00\x00\x01"
+    )
+    klass = elgas.parameters.flow_rate.StandardFlowRate
+    flow_rate = klass.from_bytes(data1)
+    assert flow_rate == klass(**attr.asdict(flow_rate, recurse=False))
+    assert flow_rate.name == "Base flow Qb"
+    with pytest.raises(attr.exceptions.FrozenInstanceError):
+        flow_rate.name = "Other"
+
+    values = klass.layout.decode(dict, data1)
+    assert values == attr.asdict(flow_rate, recurse=False)
+
+
+def test_strict_layout_rejects_extra_data():
+    data1 = bytearray(
+        b"\x00\x00\xa0\x00\x90\x02\x00\x00P\x00\x81Cover B1\x00\x00\x00\x00\x00\x04B\x00;\x00\x00'\x00J\x00\x9c\x02\x00\x00\x00\x00\x00      Closed\x00      Opened\x00"
+    )
+    with pytest.raises(LayoutError):
+        elgas.parameters.binary.Binary.from_bytes(data1 + b"\x00")
+
+
+def test_partial_optional_group_is_an_error():
+    data1 = bytearray(
+        b"\x00\x00\xa0\x00\x90\x02\x00\x00P\x00\x81Cover B1\x00\x00\x00\x00\x00\x04B\x00;\x00\x00'\x00J\x00\x9c\x02\x00\x00\x00\x00\x00      Closed\x00      Opened\x00"
+    )
+    with pytest.raises(LayoutError):
+        elgas.parameters.binary.Binary.from_bytes(data1[:-5])
+
+
+def test_device_error():
+    data = (
+        struct.pack("<5H", 0, 60, 1, 2, 3)
+        + b"\x03"
+        + b"Low battery\x00".ljust(23, b"\x00")
+        + struct.pack("<3H", 4, 5, 6)
+    )
+    device_error = elgas.parameters.device_error.DeviceError.from_bytes(data)
+    assert device_error.id == 60
+    assert device_error.name == "Low battery"
+    assert device_error.in_binary_archive
+    assert device_error.in_data_archive
+    assert device_error.error_bit_order_in_data_archive_record == 6
+    assert device_error.text_log_0 is None
+
+    with_texts = data + b"\x01" + b"Ok\x00".rjust(13) + b"Low\x00".rjust(13)
+    device_error = elgas.parameters.device_error.DeviceError.from_bytes(with_texts)
+    assert device_error.action_during_change == 1
+    assert device_error.text_log_0 == "Ok"
+    assert device_error.text_log_1 == "Low"
@@ -1,6 +1,10 @@
 import json
 from pprint import pprint
 
+import attr
+import marshmallow
+import pytest
+
 from elgas.integration import (
     ConfigurationObject,
     ConfigurationObjectSchema,
@@ -9,6 +13,7 @@ from elgas.integration import (
     UtilitarianConfigurationObjectSchema,
     UtilitarianConfigurationSchema,
 )
+from elgas.parameters import serializer
 from elgas.parameters.analog_quantity import AnalogQuantity, AnalogQuantitySchema
 from elgas.parameters.binary import Binary
 from elgas.parameters.compressibility import (
@@ -29,6 +34,8 @@ from elgas.parameters.setpoint import SetPoint
 from elgas.parameters.standard_counter import StandardCounter
 from elgas.parameters.system_parameters import SystemParameters
 from elgas.parameters.time_window import TimeWindow
+from elgas.parser import ScadaParameterParser
+from tests.fixtures import parameter_data
 
 
 def test_analog_quantity_schema():
@@ -696,3 +703,89 @@ def test_all():
     print(serialized)
 
     json.loads(serialized)
+
+
+def schema_dumps(parameters):
+    objects = [
+        UtilitarianConfigurationObjectSchema().dump(
+            UtilitarianConfigurationObject(
+                parameter_type=int(param.object_type),
+                data=ParameterSchemaFactory.by_parameter_id(param.object_type)().dump(
+                    param
+                ),
+            )
+        )
+        for param in parameters
+    ]
+    return UtilitarianConfigurationSchema().dumps(
+        UtilitarianConfiguration(objects=objects)
+    )
+
+
+def test_serializer_output_is_the_same_as_the_schemas():
+    parameters = ScadaParameterParser(parameter_data).parse()
+    for param in parameters:
+        schema = ParameterSchemaFactory.by_parameter_id(param.object_type)
+        expected = schema().dump(param)
+        dumped = serializer.dump(param)
+        assert dumped == expected
+        assert list(dumped) == list(expected)
+
+    assert serializer.to_json(parameters) == schema_dumps(parameters)
+
+
+def test_serializer_round_trip():
+    parameters = ScadaParameterParser(parameter_data).parse()
+    loaded = serializer.from_json(serializer.to_json(parameters))
+    assert loaded == parameters
+    assert [type(param) for param in loaded] == [type(param) for param in parameters]
+
+    pytest.importorskip("msgpack")
+    assert serializer.from_msgpack(serializer.to_msgpack(parameters)) == parameters
+
+
+def test_serializer_falls_back_to_the_schema():
+    quantity = AnalogQuantitySchema().load(
+        {
+            "address_in_actual_values": 16,
+            "address_in_daily_archive_record": 0,
+            "address_in_data_archive_record": 20,
+            "address_in_monthly_archive_record": 0,
+            "bit_control": 129,
+            "decimals": 0,
+            "digit": 0.0015259,
+            "error_bit_order_in_actual_values": 668,
+            "error_bit_order_in_binary_archive": 0,
+            "error_bit_order_in_data_archive": 0,
+            "id": 26,
+            "in_daily_archive": False,
+            "in_data_archive": True,
+            "in_fast_archive_1": False,
+            "in_fast_archvie_2": False,
+            "in_monthly_archive": False,
+            "is_metrological_quantity": False,
+            "lower_limit_measuring_range": 0.0,
+            "name": "GSM signal A6",
+            "number": 5,
+            "offset": 0.0,
+            "samples_in_fast_archive": 0,
+            "serial_number_transducer": 0,
+            "unit": "%",
+            "upper_limit_measuring_range": 100.0,
+        }
+    )
+    unusual = attr.evolve(quantity, id=26.0, in_data_archive=1, offset=0)
+    dumped = serializer.dump(unusual)
+    assert dumped == AnalogQuantitySchema().dump(unusual)
+    assert dumped["id"] == 26 and dumped["in_data_archive"] is True
+
+    as_strings = dict(dumped, id="26", digit="0.0015259")
+    assert serializer.load(unusual.object_type, as_strings) == quantity
+
+    with pytest.raises(marshmallow.ValidationError):
+        serializer.load(unusual.object_type, dict(dumped, unknown=1))
+    with pytest.raises(marshmallow.ValidationError):
+        serializer.load(
+            unusual.object_type,
+            {key: value for key, value in dumped.items() if key != "name"},
+        )
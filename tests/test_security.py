@@ -1,3 +1,4 @@
+import pytest
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
 from elgas import application, frames, security, utils
@@ -165,3 +166,66 @@ def test_security_cbc():
     print(padded_data.hex())
     print(decrypted.hex())
     assert decrypted == padded_data
+
+
+KEY = b"\x33" * 16
+
+
+def test_cipher_context_round_trip():
+    context = security.CipherContext(security.EncryptionKeyId.ADMINISTRATOR, KEY)
+    for length in (0, 1, 14, 15, 16, 30, 100):
+        data = bytes(range(length))
+        encrypted = context.encrypt(data)
+        assert (len(encrypted) - 3) % 16 == 0
+        assert context.decrypt(encrypted) == data
+
+
+def test_cipher_context_decrypts_like_cbc():
+    context = security.CipherContext(security.EncryptionKeyId.ADMINISTRATOR, KEY)
+    encrypted = context.encrypt(b"\x01\x02\x03" * 20)
+    decrypted = security.decrypt(encrypted[3:], KEY, KEY)
+    assert decrypted[:60] == b"\x01\x02\x03" * 20
+
+
+def test_cipher_context_decrypt_many():
+    context = security.CipherContext(security.EncryptionKeyId.ADMINISTRATOR, KEY)
+    datas = [bytes([i]) * i for i in range(40)]
+    encrypted = [context.encrypt(data) for data in datas]
+    assert context.decrypt_many(encrypted) == datas
+    assert context.decrypt_many([]) == []
+
+
+def test_cipher_context_rejects_wrong_crc():
+    context = security.CipherContext(security.EncryptionKeyId.ADMINISTRATOR, KEY)
+    encrypted = bytearray(context.encrypt(b"data"))
+    encrypted[-1] ^= 0xFF
+    with pytest.raises(ValueError):
+        context.decrypt(bytes(encrypted))
+
+
+def test_cipher_context_rejects_other_key_id():
+    context = security.CipherContext(security.EncryptionKeyId.ADMINISTRATOR, KEY)
+    other = security.CipherContext(security.EncryptionKeyId.USER_1, KEY)
+    with pytest.raises(ValueError):
+        context.decrypt(other.encrypt(b"data"))
+
+
+def test_cipher_context_rejects_partial_block():
+    context = security.CipherContext(security.EncryptionKeyId.ADMINISTRATOR, KEY)
+    with pytest.raises(ValueError):
+        context.decrypt(context.encrypt(b"data")[:-1])
+
+
+def test_cipher_context_checks_header_once(monkeypatch):
+    context = security.CipherContext(security.EncryptionKeyId.ADMINISTRATOR, KEY)
+    encrypted = [context.encrypt(b"data"), context.encrypt(b"more data")]
+    checked = list()
+    check_header = context._check_header
+    monkeypatch.setattr(
+        context,
+        "_check_header",
+        lambda view: checked.append(view) or check_header(view),
+    )
+    assert context.decrypt(encrypted[0]) == b"data"
+    assert context.decrypt_many(encrypted) == [b"data", b"more data"]
+    assert len(checked) == 3
@@ -0,0 +1,211 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from elgas import (
+    async_client,
+    async_transport,
+    call_to_dispatch,
+    client,
+    constants,
+    exceptions,
+    simulator,
+    transport,
+)
+from elgas.archive import ArchiveRecordPlan
+from tests.fixtures import parameter_data
+
+KEY = b"\x33" * 16
+
+
+def make_client(address, **kwargs):
+    host, port = address
+    return async_client.AsyncElgasClient(
+        transport=async_transport.AsyncTcpTransport(host, port),
+        password="000000",
+        password_id=801,
+        **kwargs,
+    )
+
+
+def test_archive_records_are_generated_from_the_plan():
+    device = simulator.SimulatedDevice(parameter_data, archive_records=100)
+    daily = device.archives[constants.Archive.DAILY]
+    assert daily.timestamp(100) == datetime(2022, 1, 1)
+    assert daily.record_id_at(datetime(2021, 12, 31, 12)) == 100
+    assert daily.record_id_at(datetime(2000, 1, 1)) == 1
+    first, records = daily.records(95, 10)
+    assert first == 95
+    assert daily.plan.record_count(records) == 6
+    assert daily.records(95, 10) == (first, records)
+
+
+def test_call_request_round_trip():
+    device = simulator.SimulatedDevice(parameter_data, address_1=42)
+    call = device.call_request()
+    assert call.from_bytes(call.to_bytes()) == call
+    assert call.station_id == "SIM0000000000042"
+
+
+def test_read_device_over_pty():
+    pytest.importorskip("termios")
+    device = simulator.SimulatedDevice(parameter_data, archive_records=30)
+    with simulator.PtyDevice(device) as pty:
+        elgas_client = client.ElgasClient(
+            transport=transport.SerialTransport(pty.port, baud_rate=9600, timeout=2),
+            password="000000",
+            password_id=801,
+        )
+        elgas_client.connect()
+        try:
+            parameters = elgas_client.read_parameters()
+            assert elgas_client.read_parameter_crc() == 39397
+            first_snapshot = elgas_client.read_snapshot()
+            requests = device.requests
+            second_snapshot = elgas_client.read_snapshot()
+            # The plan is cached, only the instantaneous values are read again.
+            assert device.requests == requests + 1
+            plan = ArchiveRecordPlan.from_parameters(
+                parameters, constants.Archive.DAILY
+            )
+            records = list(elgas_client.iter_archive_records(plan, 0, amount=8))
+        finally:
+            elgas_client.disconnect()
+
+    assert len(parameters) == 26
+    assert first_snapshot.parameter_crc == second_snapshot.parameter_crc == 39397
+    assert "Primary volume Vm" in second_snapshot.values
+    assert len(records) == 30
+    assert records[-1]["timestamp"] == datetime(2022, 1, 1)
+
+
+def test_read_simulated_units():
+    async def main():
+        async with simulator.DeviceSimulator.with_units(
+            3, parameter_data, archive_records=50
+        ) as simulated:
+            results = list()
+            for address in simulated.addresses:
+                elgas_client = make_client(address)
+                await elgas_client.connect()
+                parameters = await elgas_client.read_parameters()
+                snapshot = await elgas_client.read_snapshot()
+                archive_plan = ArchiveRecordPlan.from_parameters(parameters)
+                pages = [
+                    page
+                    async for page in elgas_client.iter_archive_pages(
+                        archive_plan, datetime(2021, 12, 31, 22)
+                    )
+                ]
+                await elgas_client.write_time(datetime(2030, 1, 1))
+                device_time = await elgas_client.read_time()
+                await elgas_client.disconnect()
+                results.append((snapshot, pages, device_time))
+            return simulated.devices, results
+
+    devices, results = asyncio.run(main())
+    for snapshot, pages, device_time in results:
+        assert snapshot.parameter_crc == 39397
+        assert [page.oldest_record_id for page in pages] == [48]
+        assert device_time.year == 2030
+    assert all(device.requests > 5 for device in devices)
+
+
+def test_read_units_on_a_shared_port():
+    async def main():
+        async with simulator.DeviceSimulator.with_units(
+            3, parameter_data, shared_port=True
+        ) as simulated:
+            assert len(set(simulated.addresses)) == 1
+            for address in (2, 3):
+                elgas_client = make_client(simulated.addresses[0])
+                elgas_client.elgas_connection.destination_address_1 = address
+                await elgas_client.connect()
+                await elgas_client.read_time()
+                await elgas_client.disconnect()
+
+            elgas_client = make_client(simulated.addresses[0], timeout=0.2)
+            elgas_client.elgas_connection.destination_address_1 = 4
+            await elgas_client.connect()
+            try:
+                with pytest.raises(exceptions.DeadlineExceeded):
+                    await elgas_client.read_time()
+            finally:
+                await elgas_client.disconnect()
+            return [device.requests for device in simulated.devices]
+
+    assert asyncio.run(main()) == [0, 1, 1]
+
+
+def test_encrypted_requests():
+    async def main():
+        async with simulator.DeviceSimulator.with_units(
+            1, parameter_data, encryption_keys={3: KEY}
+        ) as simulated:
+            elgas_client = make_client(
+                simulated.addresses[0], encryption_key=KEY, encryption_key_id=3
+            )
+            await elgas_client.connect()
+            try:
+                return await elgas_client.read_parameter_crc()
+            finally:
+                await elgas_client.disconnect()
+
+    assert asyncio.run(main()) == 39397
+
+
+def test_wrong_password():
+    async def main():
+        async with simulator.DeviceSimulator.with_units(
+            1, parameter_data, password="123456"
+        ) as simulated:
+            elgas_client = make_client(simulated.addresses[0])
+            await elgas_client.connect()
+            try:
+                await elgas_client.read_instantaneous_values()
+            finally:
+                await elgas_client.disconnect()
+
+    with pytest.raises(exceptions.WrongPasswordError):
+        asyncio.run(main())
+
+
+def test_lost_frames_exceed_the_deadline():
+    async def main():
+        async with simulator.DeviceSimulator.with_units(
+            1, parameter_data, link=simulator.Link(latency=0.01, loss=1.0)
+        ) as simulated:
+            elgas_client = make_client(simulated.addresses[0], timeout=0.2)
+            await elgas_client.connect()
+            await elgas_client.read_time()
+
+    with pytest.raises(exceptions.DeadlineExceeded):
+        asyncio.run(main())
+
+
+def test_call_burst():
+    device_times = list()
+
+    async def handler(call, call_transport):
+        elgas_client = async_client.AsyncElgasClient(
+            transport=call_transport, password="000000", password_id=801
+        )
+        device_times.append((call.address_1, await elgas_client.read_time()))
+
+    async def main():
+        server = call_to_dispatch.CallToDispatchServer(handler)
+        listening = await server.start("127.0.0.1", 0)
+        port = listening.sockets[0].getsockname()[1]
+        devices = [
+            simulator.SimulatedDevice(parameter_data, address_1=address)
+            for address in range(1, 51)
+        ]
+        async with listening:
+            answered = await simulator.call_burst(devices, "127.0.0.1", port)
+        return server, answered
+
+    server, answered = asyncio.run(main())
+    assert answered == 50
+    assert server.calls == 50
+    assert sorted(address for address, _ in device_times) == list(range(1, 51))
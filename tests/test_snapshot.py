@@ -0,0 +1,112 @@
+import struct
+from datetime import datetime
+
+import pytest
+
+from elgas import application, parser, snapshot, utils
+from tests.fixtures import make_response, parameter_data
+
+
+@pytest.fixture
+def parameters():
+    return parser.ScadaParameterParser().parse(parameter_data)
+
+
+@pytest.fixture
+def plan(parameters):
+    return snapshot.SnapshotPlan.from_parameters(parameters)
+
+
+def test_plan_from_parameters(plan):
+    assert plan.parameter_crc == 39397
+    assert len(plan.channels) == 17
+    # Values from address 6 up to the bit fields in byte 82..84 of the response.
+    assert plan.values_struct.size == 85 - snapshot.DATA_OFFSET
+    assert plan.first_bit == 656
+
+
+def test_decode(plan):
+    raw_values = [index + 1 for index in range(len(plan.channels))]
+    raw_values[6] = 127722.5  # Primary volume Vm, a double
+    response = make_response(plan, raw_values, bit_orders=(656, 670))
+    result = plan.decode(response)
+
+    assert result.time == datetime(2022, 2, 10, 6, 0, 15)
+    assert result.parameter_crc == 39397
+    pressure = plan.channels[0]
+    assert pressure.name == "Pressure p G      +++"
+    assert result.values[pressure.name] == pytest.approx(1 * pressure.digit)
+    temperature = plan.channels[1]
+    assert result.values[temperature.name] == pytest.approx(
+        2 * temperature.digit + temperature.value_offset
+    )
+    assert result.values["Primary volume Vm"] == 127722.5
+    assert result.values["Status St1 Closed"] == 17
+
+    assert result.errors["Pressure p G      +++"] is True
+    assert result.errors["Temperature t . Vbs"] is False
+    assert result.states["Cover B1     \x04B ;  ' J"] is True
+    assert result.states["Call window B2  B2 2"] is False
+
+
+def test_decode_values_at_addresses_of_device(parameters, plan):
+    # Built from the parameters of the device without the plan: values are at
+    # address_in_actual_values and flags at bit_order_in_actual_values and
+    # error_bit_order_in_actual_values, counted from the start of the response, which
+    # starts with the 6 bytes of device time.
+    response = bytearray(utils.datetime_to_bytes(datetime(2022, 2, 10, 6, 0, 15)))
+    response += bytes(80)
+    struct.pack_into("<H", response, 6, 3750)  # Pressure p G      +++
+    struct.pack_into("<d", response, 18, 127722.46)  # Primary volume Vm
+    struct.pack_into("<Q", response, 74, 0xD000000020000080)  # Status St1 Closed
+    response[656 // 8] |= 1 << (656 % 8)  # Cover B1, state
+    response[670 // 8] |= 1 << (670 % 8)  # Pressure p G      +++, error
+    response += b"\x01" + bytes(16) + (39397).to_bytes(2, "little")
+
+    result = plan.decode(
+        application.ReadInstantaneousValuesResponse.from_bytes(bytes(response))
+    )
+    pressure = next(item for item in parameters if getattr(item, "id", None) == 1)
+    assert result.values[pressure.name] == pytest.approx(3750 * pressure.digit)
+    assert result.values["Primary volume Vm"] == 127722.46
+    assert result.values["Status St1 Closed"] == 0xD000000020000080
+    assert result.states["Cover B1     \x04B ;  ' J"] is True
+    assert [name for name, error in result.errors.items() if error] == [pressure.name]
+    # The first value is right after the device time.
+    assert (
+        min(
+            item.address_in_actual_values
+            for item in parameters
+            if getattr(item, "address_in_actual_values", 0)
+        )
+        == snapshot.DATA_OFFSET
+    )
+
+
+def test_plan_cache(parameters):
+    plans = snapshot.SnapshotPlanCache(maxsize=1)
+    assert plans.get(39397) is None
+    plan = plans.plan_for(parameters)
+    assert plans.get(39397) is plan
+    assert plans.plan_for(parameters) is plan
+    assert len(plans) == 1
+
+
+def test_decode_rejects_other_parameters(plan):
+    response = make_response(
+        plan, [0] * len(plan.channels), parameter_crc=plan.parameter_crc ^ 1
+    )
+    with pytest.raises(ValueError):
+        plan.decode(response)
+
+
+def test_decode_rejects_short_data(plan):
+    response = make_response(plan, [0] * len(plan.channels))
+    response.data = response.data[:40]
+    with pytest.raises(ValueError):
+        plan.decode(response)
+
+
+def test_plan_needs_system_parameters(parameters):
+    with pytest.raises(ValueError):
+        snapshot.SnapshotPlan.from_parameters(parameters[1:])
@@ -0,0 +1,110 @@
+from datetime import datetime
+
+import pytest
+
+from elgas import sync
+from tests.fixtures import FIRST_RECORD_ID, RECORD_COUNT
+
+
+@pytest.fixture(params=["memory", "json", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "json":
+        return sync.JsonCheckpointStore(tmp_path / "checkpoints.json")
+    if request.param == "sqlite":
+        return sync.SqliteCheckpointStore(tmp_path / "checkpoints.db")
+    return sync.MemoryCheckpointStore()
+
+
+def make_sync(elgas_client, plan, store, **kwargs):
+    return sync.ArchiveSync(
+        client=elgas_client, plan=plan, store=store, device="1234", **kwargs
+    )
+
+
+def test_first_sync_reads_everything_and_stores_checkpoint(elgas_client, plan, store):
+    batches = list()
+    result = make_sync(elgas_client, plan, store, amount=10).run(batches.append)
+    assert result.records == RECORD_COUNT
+    assert result.batches == 3
+    assert result.gaps == []
+    checkpoint = store.get("1234", plan.archive)
+    assert checkpoint.record_id == FIRST_RECORD_ID + RECORD_COUNT - 1
+    assert checkpoint.timestamp == datetime(2022, 2, 25, 6, 0)
+
+    # Nothing new on the next run.
+    assert make_sync(elgas_client, plan, store).run(batches.append).records == 0
+    assert len(batches) == 3
+
+
+def test_resume_after_failed_batch(elgas_client, plan, store):
+    handled = list()
+
+    def fail_on_second(page):
+        if handled:
+            raise RuntimeError("Database down")
+        handled.append(page.oldest_record_id)
+
+    with pytest.raises(RuntimeError):
+        make_sync(elgas_client, plan, store, amount=10).run(fail_on_second)
+    assert store.get("1234", plan.archive).record_id == FIRST_RECORD_ID + 9
+
+    pages = list()
+    result = make_sync(elgas_client, plan, store, amount=10).run(pages.append)
+    assert pages[0].oldest_record_id == FIRST_RECORD_ID + 10
+    assert result.records == RECORD_COUNT - 10
+
+
+def test_records_sent_again_are_skipped(elgas_client, plan, store, monkeypatch):
+    store.set(
+        sync.Checkpoint(
+            device="1234",
+            archive=plan.archive,
+            record_id=FIRST_RECORD_ID + 4,
+            timestamp=datetime(2022, 2, 5, 6, 0),
+        )
+    )
+    read_archive = elgas_client.read_archive
+
+    def read_from_checkpoint(archive, amount, oldest_record_id):
+        # The device sends the checkpointed record again with the first page.
+        if oldest_record_id == FIRST_RECORD_ID + 5:
+            oldest_record_id -= 1
+        return read_archive(archive, amount, oldest_record_id)
+
+    monkeypatch.setattr(elgas_client, "read_archive", read_from_checkpoint)
+    record_ids = list()
+    result = make_sync(elgas_client, plan, store, amount=10).run(
+        lambda page: record_ids.extend(
+            range(
+                page.oldest_record_id,
+                page.oldest_record_id + plan.record_count(page.data),
+            )
+        )
+    )
+    assert result.gaps == []
+    assert record_ids == list(
+        range(FIRST_RECORD_ID + 5, FIRST_RECORD_ID + RECORD_COUNT)
+    )
+    assert result.records == RECORD_COUNT - 5
+
+
+def test_overwritten_records_are_reported_as_gap(elgas_client, plan, store):
+    store.set(
+        sync.Checkpoint(
+            device="1234",
+            archive=plan.archive,
+            record_id=FIRST_RECORD_ID - 10,
+            timestamp=datetime(2022, 1, 22, 6, 0),
+        )
+    )
+    result = make_sync(elgas_client, plan, store).run(lambda page: None)
+    assert result.gaps == [
+        sync.Gap(
+            device="1234",
+            archive=plan.archive,
+            first_record_id=FIRST_RECORD_ID - 9,
+            last_record_id=FIRST_RECORD_ID - 1,
+        )
+    ]
+    assert result.gaps[0].records == 9
+    assert result.records == RECORD_COUNT
@@ -0,0 +1,81 @@
+import os
+import socket
+import threading
+
+import pytest
+
+from elgas import client, exceptions, transport
+from tests.test_connection import read_time_response
+
+
+@pytest.fixture
+def tcp():
+    ours, theirs = socket.socketpair()
+    tcp_transport = transport.BlockingTcpTransport(host="localhost", port=0, timeout=1)
+    tcp_transport.tcp_socket = ours
+    yield tcp_transport, theirs
+    ours.close()
+    theirs.close()
+
+
+def test_tcp_frames_from_one_read_are_returned_one_by_one(tcp):
+    tcp_transport, device = tcp
+    device.sendall(read_time_response * 3 + read_time_response[:5])
+    for _ in range(3):
+        assert tcp_transport.recv() == read_time_response
+    assert tcp_transport.read_buffer == bytearray(read_time_response[:5])
+
+    device.sendall(read_time_response[5:])
+    assert tcp_transport.recv() == read_time_response
+    assert tcp_transport.read_buffer == bytearray()
+
+
+def test_tcp_recv_until_size(tcp):
+    tcp_transport, device = tcp
+    device.sendall(read_time_response)
+    assert tcp_transport.recv_until(size=4) == read_time_response[:4]
+    assert tcp_transport.recv_until() == read_time_response[4:]
+
+
+def test_tcp_connection_closed_in_a_frame(tcp):
+    tcp_transport, device = tcp
+    device.sendall(read_time_response + read_time_response[:5])
+    device.close()
+    assert tcp_transport.recv() == read_time_response
+    with pytest.raises(exceptions.CommunicationError):
+        tcp_transport.recv()
+
+
+def test_client_does_not_wait_for_a_closed_connection(tcp):
+    tcp_transport, device = tcp
+    elgas_client = client.ElgasClient(
+        transport=tcp_transport, password="000000", password_id=801
+    )
+
+    def answer_and_close():
+        device.recv(1024)
+        device.sendall(b"\x02\xfe")
+        device.close()
+
+    closing = threading.Thread(target=answer_and_close)
+    closing.start()
+    with pytest.raises(exceptions.CommunicationError, match="closed by remote"):
+        elgas_client.read_time()
+    closing.join()
+
+
+def test_serial_frames_are_returned_one_by_one():
+    pytest.importorskip("termios")
+    controller, device_side = os.openpty()
+    serial_transport = transport.SerialTransport(
+        port=os.ttyname(device_side), baud_rate=9600, timeout=1
+    )
+    serial_transport.connect()
+    try:
+        os.write(controller, read_time_response * 2)
+        assert serial_transport.recv() == read_time_response
+        assert serial_transport.recv() == read_time_response
+    finally:
+        serial_transport.disconnect()
+        os.close(controller)
+        os.close(device_side)
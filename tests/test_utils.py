@@ -1,3 +1,4 @@
+import random
 from datetime import datetime
 
 import pytest
@@ -72,6 +73,46 @@ def test_return_characters():
     assert drc == output[-2]
 
 
+def test_return_characters_single_pass():
+    assert utils.return_characters(b"\x1b\x1b\x0e\x0d") == b"\x1b\x0e\x0d"
+    assert utils.return_characters(b"\x1b\x1b\x1b\x0e\x0d") == b"\x1b\x0d\x0d"
+    assert utils.return_characters(b"\x1b\x0f\x1b\x41\x0d") == b"\x8d\x1b\x41\x0d"
+
+
+def test_return_characters_incomplete_escape():
+    with pytest.raises(ValueError):
+        utils.return_characters(b"\x02\x1b\x1b\x1b")
+
+
+def test_character_returner_keeps_escape_between_chunks():
+    escaped = bytes.fromhex(
+        "02FE866435000000000200021033123005061B0F9256183901000000000000000000"
+        "000000A6217E08A80B6E3FC101000C2D47E767BB0D"
+    )
+    expected = utils.return_characters(escaped)
+    for split_at in range(len(escaped) + 1):
+        returner = utils.CharacterReturner()
+        out = bytearray()
+        returner.feed(escaped[:split_at], out)
+        returner.feed(escaped[split_at:], out)
+        assert bytes(out) == expected
+        assert not returner.pending_escape
+
+
+def test_character_returner_pending_escape():
+    returner = utils.CharacterReturner()
+    assert returner.feed(b"\x41\x1b") == b"\x41"
+    assert returner.pending_escape
+    assert returner.feed(b"\x0e") == b"\x0d"
+    assert returner.feed(b"\x1b\x1b") == b"\x1b"
+    assert not returner.pending_escape
+
+
+def test_escape_and_return_round_trip():
+    data = bytes(range(256)) * 4 + b"\x0d"
+    assert utils.return_characters(utils.escape_characters(data)) == data
+
+
 def test_escape_characters():
     input = b"\x02\xfe\x84d\x19\x00\x00\x00\x00\x00\x00\x00\xea\x03\x89\xa3?%\xabAwi*H\xf8\r"
     output = utils.escape_characters(input)
@@ -127,3 +168,56 @@ def test_return_characters_2():
     data = b"\x1b\x1b\x0e"
     out = utils.return_characters(data)
     assert out == b"\x1b\x0e"
+
+
+def test_byte_reader():
+    data = bytes.fromhex("01" "0200" "0003" "04000000" "00000005" "0000803f" "1033")
+    reader = utils.ByteReader(data)
+    assert reader.u8() == 1
+    assert reader.u16() == 2
+    assert reader.u16_be() == 3
+    assert reader.u32() == 4
+    assert reader.u32_be() == 5
+    assert reader.f32() == 1.0
+    assert reader.bcd(2) == 1033
+    assert reader.remaining == 0
+
+    with pytest.raises(ValueError):
+        reader.u8()
+
+
+def test_byte_reader_text_and_time():
+    data = b" Pressure p\x00\x00\x00\x00" + (24 * 3600).to_bytes(4, "little")
+    reader = utils.ByteReader(data)
+    assert reader.text(15) == "Pressure p"
+    assert reader.seconds_since_2000().isoformat() == "2000-01-02T00:00:00"
+    assert reader.offset == len(data)
+
+
+def test_byte_reader_does_not_copy():
+    data = bytearray(b"\x01\x02\x03\x04")
+    reader = utils.ByteReader(data)
+    reader.skip(1)
+    view = reader.view(2)
+    data[1] = 0xFF
+    assert view[0] == 0xFF
+    assert reader.rest() == b"\x04"
+
+
+def test_calculate_redundancy_matches_separate_calculations():
+    for length in list(range(0, 20)) + [255, 1024]:
+        data = bytes(random.getrandbits(8) for _ in range(length))
+        assert utils.calculate_redundancy(data) == (
+            utils.calculate_lrc(data),
+            utils.calculate_checksum(data),
+            utils.calculate_drc(data),
+        )
+
+
+def test_calculate_crc_sliced_matches_bytewise():
+    for length in list(range(0, 20)) + [1024]:
+        data = bytes(random.getrandbits(8) for _ in range(length))
+        crc = 0xFFFF
+        for byte in data:
+            crc = (crc >> 8) ^ utils.crc16_table[(crc ^ byte) & 0xFF]
+        assert utils.calculate_crc(data) == ((crc << 8) & 0xFF00) | (crc >> 8)